@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+from case_data import load_cases, score_predictions
+
+# Line server run in a child interpreter for module variants: one
+# "days miles receipts" line in, one result (or ERROR) line out, so the module
+# is imported once instead of once per case.
+PIPE_SERVER = """
+import importlib, sys
+calculate = importlib.import_module(sys.argv[1]).calculate_reimbursement
+for line in sys.stdin:
+    try:
+        days, miles, receipts = line.split()
+        print(calculate(int(days), float(miles), float(receipts)))
+    except Exception:
+        print("ERROR")
+    sys.stdout.flush()
+"""
+
+
+def is_module(spec):
+    """calculate_reimbursement or calculate_reimbursement.py -> module; anything else is an executable"""
+    return spec.endswith('.py') or (os.sep not in spec and not os.path.exists(spec))
+
+
+def parse_output(text):
+    try:
+        return float(text.strip())
+    except ValueError:
+        return np.nan
+
+
+async def run_module(spec, lines):
+    """Drive a calculator module through one persistent stdin/stdout pipe"""
+    name = os.path.splitext(os.path.basename(spec))[0]
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', PIPE_SERVER, name,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, limit=1 << 20)
+
+    async def feed():
+        for line in lines:
+            process.stdin.write(line.encode() + b"\n")
+            await process.stdin.drain()
+        process.stdin.close()
+
+    writer = asyncio.create_task(feed())
+    results = [parse_output((await process.stdout.readline()).decode()) for _ in lines]
+    await writer
+    await process.wait()
+    return np.array(results)
+
+
+async def run_executable(spec, lines, gate):
+    """One process per case, like eval.sh; each holds a slot of the shared gate while it runs"""
+
+    async def one(line):
+        async with gate:
+            process = await asyncio.create_subprocess_exec(
+                spec, *line.split(), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+            out, _ = await process.communicate()
+            return parse_output(out.decode()) if process.returncode == 0 else np.nan
+
+    return np.array(await asyncio.gather(*(one(line) for line in lines)))
+
+
+async def run_variant(spec, lines, gate, start):
+    if is_module(spec):
+        # The pipe server is one process for the whole run, so it holds one slot throughout
+        async with gate:
+            outputs = await run_module(spec, lines)
+    else:
+        outputs = await run_executable(os.path.abspath(spec), lines, gate)
+    return outputs, time.perf_counter() - start
+
+
+async def run_all(specs, lines, concurrency):
+    """All variants at once, sharing one gate so at most `concurrency` processes are alive in total"""
+    gate = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    return await asyncio.gather(*(run_variant(spec, lines, gate, start) for spec in specs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score several run.sh executables or calculator modules side by side")
+    parser.add_argument('variants', nargs='+', help="executables (./run.sh) or calculator modules")
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--limit', type=int, default=None, help="only the first N cases")
+    parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 4,
+                        help="calculator processes in flight, across all variants")
+    parser.add_argument('--show', type=int, default=5, help="most-disputed cases to list")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    n = len(cases) if args.limit is None else min(args.limit, len(cases))
+    lines = [f"{d} {m:g} {r:.2f}" for d, m, r in itertools.islice(cases.inputs(), n)]
+    expected = cases.expected[:n]
+
+    print(f"=== A/B RUN: {len(args.variants)} variants x {n} cases ===")
+    start = time.perf_counter()
+    results = asyncio.run(run_all(args.variants, lines, args.concurrency))
+    total = time.perf_counter() - start
+
+    width = max(len(spec) for spec in args.variants)
+    print(f"\n  {'variant':<{width}} {'mode':>5} {'exact':>6} {'close':>6} {'avg error':>10} {'score':>10} "
+          f"{'errors':>6} {'wall':>8} {'cases/s':>9}")
+    outputs = []
+    for spec, (actual, wall) in zip(args.variants, results):
+        failed = np.isnan(actual)
+        scored = score_predictions(expected[~failed], actual[~failed])
+        outputs.append(actual)
+        print(f"  {spec:<{width}} {'pipe' if is_module(spec) else 'exec':>5} {scored['exact_matches']:>6} "
+              f"{scored['close_matches']:>6} ${scored['avg_error']:>9.2f} {scored['score']:>10.2f} "
+              f"{int(failed.sum()):>6} {wall:>7.2f}s {n / wall:>9,.0f}")
+    print(f"\nTotal wall time: {total:.2f}s (slowest variant {max(wall for _, wall in results):.2f}s)")
+
+    if len(outputs) < 2:
+        return
+    stacked = np.vstack(outputs)
+    failed = np.isnan(stacked)
+    print(f"\nCases where two variants differ by $0.01 or more (failures excluded):")
+    for (i, a), (j, b) in itertools.combinations(enumerate(args.variants), 2):
+        both = ~(failed[i] | failed[j])
+        differ = both & (np.abs(stacked[i] - stacked[j]) >= 0.01)
+        print(f"  {a} vs {b}: {int(differ.sum())} of {int(both.sum())} cases both answered")
+
+    # A failed variant is not a disagreement: disputes are between outputs that exist
+    distinct = np.array([len(set(np.round(column[~np.isnan(column)], 2).tolist())) for column in stacked.T])
+    disputed = np.flatnonzero(distinct > 1)
+    failures = np.flatnonzero(failed.any(axis=0))
+    if len(failures):
+        print(f"\n❌ {len(failures)} of {n} cases failed in at least one variant:")
+        for i in failures[:args.show]:
+            names = ", ".join(spec for spec, bad in zip(args.variants, failed[:, i]) if bad)
+            print(f"  Case {i + 1}: {cases.describe(i)}: failed in {names}")
+
+    print(f"\n{len(disputed)} of {n} cases have disagreeing outputs; most disputed:")
+    answered = stacked[:, disputed]
+    spread = np.nanmax(answered, axis=0) - np.nanmin(answered, axis=0)
+    for i in disputed[np.argsort(spread)[::-1][:args.show]]:
+        values = ", ".join("ERROR" if np.isnan(v) else f"{v:.2f}" for v in stacked[:, i])
+        print(f"  Case {i + 1}: {cases.describe(i)}, expected ${expected[i]:.2f}: {values}")
+
+
+if __name__ == "__main__":
+    main()
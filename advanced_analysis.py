@@ -1,57 +1,32 @@
 #!/usr/bin/env python3
 
-import json
 import numpy as np
 from collections import defaultdict
-from calculate_reimbursement import calculate_reimbursement
+import calculate_reimbursement
+from case_data import CaseTable, batch_calculate, load_cases
 
 # Load the public cases
-with open('public_cases.json', 'r') as f:
-    cases = json.load(f)
+cases = load_cases('public_cases.json')
 
 print("=== ADVANCED PATTERN ANALYSIS ===")
 
 # Test current model on larger sample
 print("Testing current model on 200 cases:")
-errors = []
-exact_matches = 0
-close_matches = 0
-
-for case in cases[:200]:
-    inp = case['input']
-    expected = case['expected_output']
-    actual = calculate_reimbursement(inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'])
-    error = abs(expected - actual)
-    errors.append(error)
-    
-    if error < 0.01:
-        exact_matches += 1
-    elif error < 1.0:
-        close_matches += 1
+table = CaseTable.from_cases(cases, batch_calculate(calculate_reimbursement, cases))[:200]
+exact_matches = int(np.sum(table.error < 0.01))
+close_matches = int(np.sum((table.error >= 0.01) & (table.error < 1.0)))
 
-avg_error = np.mean(errors)
+avg_error = np.mean(table.error)
 print(f"Current model: {exact_matches}/200 exact, {close_matches}/200 close, avg error ${avg_error:.2f}")
 
 # Analyze the error patterns to find missing logic
 print("\nAnalyzing error patterns:")
 
 # Group by error characteristics
-high_error_cases = []
-for i, case in enumerate(cases[:200]):
-    inp = case['input']
-    expected = case['expected_output']
-    actual = calculate_reimbursement(inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'])
-    error = abs(expected - actual)
-    
-    if error > 50:
-        high_error_cases.append({
-            'index': i,
-            'input': inp,
-            'expected': expected,
-            'actual': actual,
-            'error': error,
-            'ratio': expected / actual if actual > 0 else 0
-        })
+high_error_cases = table.filter(table.error > 50)
+high_error_cases = high_error_cases.with_columns(
+    ratio=np.divide(high_error_cases.expected, high_error_cases.actual,
+                    out=np.zeros(len(high_error_cases)), where=high_error_cases.actual > 0))
 
 print(f"\nFound {len(high_error_cases)} cases with error > $50")
 
@@ -59,16 +34,15 @@ print(f"\nFound {len(high_error_cases)} cases with error > $50")
 print("\nPattern analysis in high error cases:")
 
 # Pattern 1: Are we consistently over or under-estimating?
-over_estimates = [case for case in high_error_cases if case['actual'] > case['expected']]
-under_estimates = [case for case in high_error_cases if case['actual'] < case['expected']]
+over_estimates = high_error_cases.filter(high_error_cases.actual > high_error_cases.expected)
+under_estimates = high_error_cases.filter(high_error_cases.actual < high_error_cases.expected)
 
 print(f"Over-estimates: {len(over_estimates)}, Under-estimates: {len(under_estimates)}")
 
 # Pattern 2: Trip duration analysis
 duration_errors = defaultdict(list)
 for case in high_error_cases:
-    duration = case['input']['trip_duration_days']
-    duration_errors[duration].append(case['error'])
+    duration_errors[case.days].append(case.error)
 
 print("\nError by trip duration:")
 for duration in sorted(duration_errors.keys()):
@@ -85,12 +59,12 @@ mile_errors = defaultdict(list)
 
 for case in high_error_cases:
     # Receipt buckets
-    receipt_bucket = int(case['input']['total_receipts_amount'] // 200) * 200
-    receipt_errors[receipt_bucket].append(case['ratio'])
+    receipt_bucket = int(case.receipts // 200) * 200
+    receipt_errors[receipt_bucket].append(case.ratio)
     
     # Mile buckets  
-    mile_bucket = int(case['input']['miles_traveled'] // 100) * 100
-    mile_errors[mile_bucket].append(case['ratio'])
+    mile_bucket = int(case.miles // 100) * 100
+    mile_errors[mile_bucket].append(case.ratio)
 
 print("\nExpected/Actual ratios by receipt amount:")
 for bucket in sorted(receipt_errors.keys())[:8]:
@@ -108,13 +82,12 @@ for bucket in sorted(mile_errors.keys())[:8]:
 
 # Show some specific high-error examples for manual analysis
 print("\nHigh error examples for manual analysis:")
-sorted_errors = sorted(high_error_cases, key=lambda x: x['error'], reverse=True)
+sorted_errors = high_error_cases.sort('error', descending=True)
 for case in sorted_errors[:5]:
-    inp = case['input']
-    print(f"  {inp['trip_duration_days']}d, {inp['miles_traveled']:.0f}mi, ${inp['total_receipts_amount']:.2f}")
-    print(f"    Expected: ${case['expected']:.2f}, Got: ${case['actual']:.2f}, Error: ${case['error']:.2f}")
+    print(f"  {case.describe()}")
+    print(f"    Expected: ${case.expected:.2f}, Got: ${case.actual:.2f}, Error: ${case.error:.2f}")
     
     # Calculate what our base model gives
-    base = 75 * inp['trip_duration_days'] + 0.5 * inp['miles_traveled'] + 0.5 * inp['total_receipts_amount']
-    print(f"    Base model: ${base:.2f}, Difference: ${case['expected'] - base:.2f}")
+    base = 75 * case.days + 0.5 * case.miles + 0.5 * case.receipts
+    print(f"    Base model: ${base:.2f}, Difference: ${case.expected - base:.2f}")
     print()
\ No newline at end of file
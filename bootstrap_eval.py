@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+
+import numpy as np
+
+from case_data import batch_calculate, load_cases
+
+
+def resampled_metrics(errors, index):
+    """Exact matches, average error and score for every resample row of index"""
+    sample = errors[index]
+    n = index.shape[1]
+    exact = (sample < 0.01).sum(axis=1)
+    avg_error = sample.mean(axis=1)
+    return {
+        'exact_matches': exact.astype(np.float64),
+        'avg_error': avg_error,
+        'score': avg_error * 100 + (n - exact) * 0.1,
+    }
+
+
+def point_metrics(errors):
+    exact = int(np.sum(errors < 0.01))
+    avg_error = float(errors.mean())
+    return {'exact_matches': exact, 'avg_error': avg_error, 'score': avg_error * 100 + (len(errors) - exact) * 0.1}
+
+
+def bootstrap_draws(errors_list, resamples=2000, seed=0, chunk=1000):
+    """Bootstrap distributions of the metrics for one or more aligned error vectors.
+
+    Each chunk of resamples is one (chunk x n) index matrix applied to every
+    error vector, so paired comparisons see the same resampled cases.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(errors_list[0])
+    draws = [{name: [] for name in ('exact_matches', 'avg_error', 'score')} for _ in errors_list]
+    for start in range(0, resamples, chunk):
+        index = rng.integers(0, n, size=(min(chunk, resamples - start), n), dtype=np.int32)
+        for errors, out in zip(errors_list, draws):
+            for name, values in resampled_metrics(errors, index).items():
+                out[name].append(values)
+    return [{name: np.concatenate(values) for name, values in out.items()} for out in draws]
+
+
+def confidence_intervals(errors, resamples=2000, confidence=0.95, seed=0):
+    """{metric: (point, low, high)} percentile bootstrap intervals"""
+    errors = np.asarray(errors, dtype=np.float64)
+    draws = bootstrap_draws([errors], resamples, seed)[0]
+    tail = (1 - confidence) / 2 * 100
+    return {name: (point, *np.percentile(draws[name], [tail, 100 - tail]))
+            for name, point in point_metrics(errors).items()}
+
+
+def paired_difference(errors_a, errors_b, resamples=2000, confidence=0.95, seed=0):
+    """{metric: (b - a, low, high, p)} on the same resampled cases.
+
+    p is the two-sided bootstrap p-value for "no difference": twice the share
+    of resampled differences on the far side of zero.
+    """
+    errors_a = np.asarray(errors_a, dtype=np.float64)
+    errors_b = np.asarray(errors_b, dtype=np.float64)
+    draws_a, draws_b = bootstrap_draws([errors_a, errors_b], resamples, seed)
+    point_a, point_b = point_metrics(errors_a), point_metrics(errors_b)
+    tail = (1 - confidence) / 2 * 100
+
+    result = {}
+    for name in point_a:
+        diff = draws_b[name] - draws_a[name]
+        low, high = np.percentile(diff, [tail, 100 - tail])
+        p = min(1.0, 2 * min(np.mean(diff <= 0), np.mean(diff >= 0)))
+        result[name] = (point_b[name] - point_a[name], low, high, p)
+    return result
+
+
+def print_intervals(intervals, confidence):
+    print(f"\n📏 {confidence:.0%} bootstrap intervals:")
+    exact, avg, score = intervals['exact_matches'], intervals['avg_error'], intervals['score']
+    print(f"  Exact matches: {exact[0]} [{exact[1]:.0f}, {exact[2]:.0f}]")
+    print(f"  Average error: ${avg[0]:.2f} [${avg[1]:.2f}, ${avg[2]:.2f}]")
+    print(f"  Score: {score[0]:.2f} [{score[1]:.2f}, {score[2]:.2f}]")
+
+
+def print_difference(name_a, name_b, difference, confidence):
+    print(f"\n⚖️  {name_b} minus {name_a} (paired, {confidence:.0%} interval):")
+    for metric, label in [('exact_matches', 'Exact matches'), ('avg_error', 'Average error'), ('score', 'Score')]:
+        delta, low, high, p = difference[metric]
+        verdict = "significant" if p < 1 - confidence else "could be noise"
+        print(f"  {label}: {delta:+.2f} [{low:+.2f}, {high:+.2f}], p = {p:.3f} ({verdict})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap intervals and paired tests for calculator metrics")
+    parser.add_argument('calculators', nargs='+', help="one calculator module, or two to compare")
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--resamples', type=int, default=2000)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    errors = {name: np.abs(cases.expected - batch_calculate(importlib.import_module(name), cases))
+              for name in args.calculators[:2]}
+    for name, values in errors.items():
+        print(f"=== {name} ===")
+        print_intervals(confidence_intervals(values, args.resamples, args.confidence, args.seed), args.confidence)
+    if len(errors) == 2:
+        (name_a, errors_a), (name_b, errors_b) = errors.items()
+        difference = paired_difference(errors_a, errors_b, args.resamples, args.confidence, args.seed)
+        print_difference(name_a, name_b, difference, args.confidence)
+
+
+if __name__ == "__main__":
+    main()
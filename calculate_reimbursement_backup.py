@@ -3,6 +3,9 @@
 import sys
 import math
 
+# Set to a list to record how each call was served (see telemetry.py)
+ROUTE_LOG = None
+
 def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """
     Reverse-engineered reimbursement calculation 
@@ -17,8 +20,24 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     # Best formula discovered through exhaustive grid search
     reimbursement = 86 * days + 0.76 * miles + 0.350 * receipts
     
+    if ROUTE_LOG is not None:
+        ROUTE_LOG.append('linear')
     return round(max(reimbursement, 50), 2)
 
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """
+    Vectorized calculate_reimbursement over arrays of inputs, matching it row for row
+    """
+    import numpy as np
+    
+    days = np.asarray(trip_duration_days).astype(np.int64)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    reimbursement = 86 * days + 0.76 * miles + 0.350 * receipts
+    
+    return np.array([round(value, 2) for value in np.maximum(reimbursement, 50).tolist()], dtype=np.float64)
+
 if __name__ == "__main__":
     if len(sys.argv) != 4:
         print("Usage: python3 calculate_reimbursement.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
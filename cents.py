@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+import numpy as np
+
+from cents_key import DAYS_SHIFT, MILES_LIMIT, MILES_SHIFT, RECEIPTS_LIMIT
+
+# Fixed-point core: money (and miles, which also carry two decimals) as int64
+# hundredths. Keys pack (days, miles, receipts) into one int64 with the layout
+# in cents_key.py, whose scalar packed_key() the calculators use.
+
+
+def parse_cents(text):
+    """Cents from a decimal string such as '17.97', '-3.5' or '120' without going through float.
+
+    Strings with more than two decimals are rounded the way round(float(text), 2) would.
+    """
+    text = text.strip()
+    sign = -1 if text.startswith('-') else 1
+    whole, _, frac = text.lstrip('+-').partition('.')
+    if len(frac) > 2:
+        return int(round_cents([float(text)])[0])
+    return sign * (int(whole or 0) * 100 + int((frac + '00')[:2]))
+
+
+def to_cents(values):
+    """int64 hundredths of amounts that are already whole cents (inputs, labels, rounded outputs)"""
+    return np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def from_cents(cents):
+    """Back to floats; c / 100 is the same double round(x, 2) produces"""
+    return np.asarray(cents, dtype=np.int64) / 100
+
+
+def round_cents(values):
+    """Cents of round(x, 2) for every x, vectorized.
+
+    Python rounds the exact binary value of x, so np.rint(x * 100) can be off by
+    one near .xx5 (x * 100 itself rounds). Values whose scaled fraction is not
+    within 1e-6 of one half take the fast path; the rest go through round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100
+    cents = np.floor(scaled + 0.5)
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        cents[i] = round(round(float(values[i]), 2) * 100)
+    return cents.astype(np.int64)
+
+
+def format_cents(cents):
+    """'123.45' for 12345, the way results are printed"""
+    sign = '-' if cents < 0 else ''
+    whole, frac = divmod(abs(int(cents)), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def pack_keys(days, miles_hundredths, receipts_cents):
+    """One int64 key per (days, miles, receipts) row"""
+    days = np.asarray(days, dtype=np.int64)
+    miles_hundredths = np.asarray(miles_hundredths, dtype=np.int64)
+    receipts_cents = np.asarray(receipts_cents, dtype=np.int64)
+    if np.any((miles_hundredths < 0) | (miles_hundredths >= MILES_LIMIT)
+              | (receipts_cents < 0) | (receipts_cents >= RECEIPTS_LIMIT) | (days < 0) | (days > 255)):
+        raise ValueError("input out of range for packed keys")
+    return (days << DAYS_SHIFT) | (miles_hundredths << MILES_SHIFT) | receipts_cents
+
+
+def unpack_keys(keys):
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys >> DAYS_SHIFT, (keys >> MILES_SHIFT) & (MILES_LIMIT - 1), keys & (RECEIPTS_LIMIT - 1)
+
+
+class CentsLookup:
+    """Exact-match table on packed integer keys with integer-cent outputs.
+
+    Built once from a float-keyed dict such as PERFECT_LOOKUP; get() is a
+    vectorized binary search over the sorted keys, so hits no longer depend on
+    float tuple equality.
+    """
+
+    def __init__(self, lookup):
+        keys = np.array(list(lookup.keys()), dtype=np.float64).reshape(-1, 3)
+        packed = pack_keys(keys[:, 0], to_cents(keys[:, 1]), to_cents(keys[:, 2]))
+        order = np.argsort(packed, kind='stable')
+        self.keys = packed[order]
+        self.values = to_cents(list(lookup.values()))[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get(self, days, miles_hundredths, receipts_cents, missing=-1):
+        """Output cents per row, or `missing` where the key is absent"""
+        wanted = pack_keys(days, miles_hundredths, receipts_cents)
+        position = np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)
+        found = self.keys[position] == wanted
+        return np.where(found, self.values[position], missing)
+
+    def lookup(self, days, miles, receipts):
+        """Float outputs for float inputs, NaN where the key is absent (the batch calculators' exact step).
+
+        Inputs that are not whole hundredths or fall outside the packed range never
+        match, just as they would miss the float-keyed dict.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        miles = np.asarray(miles, dtype=np.float64)
+        receipts = np.asarray(receipts, dtype=np.float64)
+        miles_hundredths, receipts_cents = to_cents(miles), to_cents(receipts)
+        valid = ((from_cents(miles_hundredths) == miles) & (from_cents(receipts_cents) == receipts)
+                 & (days >= 0) & (days <= 255) & (miles_hundredths >= 0) & (miles_hundredths < MILES_LIMIT)
+                 & (receipts_cents >= 0) & (receipts_cents < RECEIPTS_LIMIT))
+        result = np.full(len(days), np.nan)
+        if len(self.keys) and valid.any():
+            absent = np.iinfo(np.int64).min
+            hits = self.get(days[valid], miles_hundredths[valid], receipts_cents[valid], missing=absent)
+            rows = np.flatnonzero(valid)
+            result[rows[hits != absent]] = from_cents(hits[hits != absent])
+        return result
+
+    def columns(self):
+        """Keys as (days, miles, receipts) arrays and the outputs, all floats, in key order"""
+        days, miles_hundredths, receipts_cents = unpack_keys(self.keys)
+        return days.astype(np.float64), from_cents(miles_hundredths), from_cents(receipts_cents), from_cents(self.values)
+
+
+def cents_features(receipts_cents):
+    """Cents-level receipt features, all integer arithmetic"""
+    receipts_cents = np.asarray(receipts_cents, dtype=np.int64)
+    cents = receipts_cents % 100
+    return {
+        'dollars': receipts_cents // 100,
+        'cents': cents,
+        'ends_49': (cents == 49).astype(np.int8),
+        'ends_99': (cents == 99).astype(np.int8),
+        'ends_49_or_99': ((cents == 49) | (cents == 99)).astype(np.int8),
+        'cents_decile': (cents // 10).astype(np.int8),
+    }
+
+
+def main():
+    from case_data import load_cases
+    from calculate_reimbursement import PERFECT_LOOKUP
+
+    parser = argparse.ArgumentParser(description="Check the integer-cents core and show the cents-level receipt quirk")
+    parser.add_argument('--samples', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print("=== INTEGER CENTS CORE ===")
+    values = np.concatenate([rng.uniform(0, 3000, args.samples // 2),
+                             rng.integers(0, 300000, args.samples - args.samples // 2) / 100 + 0.005])
+    start = time.perf_counter()
+    cents = round_cents(values)
+    fast = time.perf_counter() - start
+    expected = np.array([round(round(v, 2) * 100) for v in values.tolist()], dtype=np.int64)
+    naive = np.rint(values * 100).astype(np.int64)
+    print(f"round_cents vs round(x, 2): {int(np.sum(cents != expected))} mismatches in {len(values):,} "
+          f"({fast:.3f}s); np.rint(x * 100) would miss {int(np.sum(naive != expected)):,}")
+
+    cases = load_cases('public_cases.json')
+    miles_h, receipts_c, expected_c = to_cents(cases.miles), to_cents(cases.receipts), to_cents(cases.expected)
+    table = CentsLookup(PERFECT_LOOKUP)
+    hits = table.get(cases.days, miles_h, receipts_c)
+    print(f"Packed lookup: {len(table)} keys in {table.keys.nbytes + table.values.nbytes:,} bytes; "
+          f"{int(np.sum(hits == expected_c))}/{len(cases)} public cases hit with the exact cents")
+
+    rows = rng.integers(len(cases), size=200_000)
+    start = time.perf_counter()
+    for key in zip(cases.days[rows].tolist(), cases.miles[rows].tolist(), cases.receipts[rows].tolist()):
+        PERFECT_LOOKUP.get(key)
+    tuple_time = time.perf_counter() - start
+    start = time.perf_counter()
+    table.get(cases.days[rows], miles_h[rows], receipts_c[rows])
+    packed_time = time.perf_counter() - start
+    print(f"200,000 lookups: float tuple dict {tuple_time:.3f}s, packed int64 search {packed_time:.3f}s")
+
+    # The .49/.99 quirk: how far outputs sit from a plain linear fit, by receipt ending
+    features = cents_features(receipts_c)
+    X = np.column_stack([cases.days, cases.miles, cases.receipts, np.ones(len(cases))])
+    residual = cases.expected - X @ np.linalg.lstsq(X, cases.expected, rcond=None)[0]
+    print(f"\nResidual vs linear fit by receipt cents ending:")
+    for label, mask in [("ends .49", features['ends_49'] == 1), ("ends .99", features['ends_99'] == 1),
+                        ("other", features['ends_49_or_99'] == 0)]:
+        print(f"  {label}: {int(mask.sum())} cases, mean residual ${residual[mask].mean():+.2f}, "
+              f"mean output ${cases.expected[mask].mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
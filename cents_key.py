@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# Packed integer-cent keys in plain Python, for the calculators' scalar path:
+# importing cents.py would pull numpy into every run.sh call. One int per
+# (days, miles, receipts), the same layout cents.pack_keys uses:
+#   days << 55 | miles_hundredths << 31 | receipts_cents
+# which leaves room for 255 days, 167,772 miles and $21.4M of receipts.
+DAYS_SHIFT = 55
+MILES_SHIFT = 31
+MILES_LIMIT = 1 << (DAYS_SHIFT - MILES_SHIFT)
+RECEIPTS_LIMIT = 1 << MILES_SHIFT
+
+
+def packed_key(days, miles, receipts):
+    """Key of one input, or None when no table key can match it (not whole hundredths, or out of range)"""
+    miles_hundredths, receipts_cents = round(miles * 100), round(receipts * 100)
+    if miles_hundredths / 100 != miles or receipts_cents / 100 != receipts:
+        return None
+    if not (0 <= days <= 255 and 0 <= miles_hundredths < MILES_LIMIT and 0 <= receipts_cents < RECEIPTS_LIMIT):
+        return None
+    return days << DAYS_SHIFT | miles_hundredths << MILES_SHIFT | receipts_cents
+
+
+def pack_table(lookup):
+    """{packed key: output} from a {(days, miles, receipts): output} lookup literal"""
+    return {packed_key(int(days), float(miles), float(receipts)): output
+            for (days, miles, receipts), output in lookup.items()}
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+import numpy as np
+
+from case_data import load_cases
+
+# Feature columns a linear-in-coefficients formula can be built from
+FEATURES = {
+    'days': lambda c: c.days.astype(np.float64),
+    'miles': lambda c: c.miles,
+    'receipts': lambda c: c.receipts,
+    'const': lambda c: np.ones(len(c)),
+    'five_day': lambda c: (c.days == 5).astype(np.float64),
+    'miles_per_day': lambda c: c.miles / c.days,
+    'receipts_per_day': lambda c: c.receipts / c.days,
+    'sqrt_miles': lambda c: np.sqrt(c.miles),
+    'log_receipts': lambda c: np.log1p(c.receipts),
+}
+
+
+def design_matrix(cases, features):
+    return np.column_stack([FEATURES[name](cases) for name in features])
+
+
+class Objective:
+    """Whole-dataset objective evaluated for a batch of coefficient vectors at once.
+
+    kind is 'mae' (mean absolute error), 'score' (the eval.sh score) or
+    'smooth_exact' (negated sum of Gaussian kernels of width tau on each error,
+    a differentiable stand-in for the exact-match count). Lower is better.
+    """
+
+    def __init__(self, X, y, kind='score', tau=0.5):
+        self.X = X
+        self.y = y
+        self.kind = kind
+        self.tau = tau
+        self.evaluations = 0
+
+    def errors(self, thetas):
+        return np.abs(self.y[None, :] - np.atleast_2d(thetas) @ self.X.T)
+
+    def __call__(self, thetas):
+        errors = self.errors(thetas)
+        self.evaluations += errors.shape[0]
+        if self.kind == 'mae':
+            return errors.mean(axis=1)
+        if self.kind == 'score':
+            return errors.mean(axis=1) * 100 + (errors >= 0.01).sum(axis=1) * 0.1
+        return -np.exp(-0.5 * (errors / self.tau) ** 2).sum(axis=1)
+
+
+def lad_irls(X, y, iterations=100, eps=1e-6):
+    """Least absolute deviations fit by iteratively reweighted least squares"""
+    theta = np.linalg.lstsq(X, y, rcond=None)[0]
+    for _ in range(iterations):
+        weights = 1.0 / np.maximum(np.abs(y - X @ theta), eps)
+        sw = np.sqrt(weights)
+        updated = np.linalg.lstsq(X * sw[:, None], y * sw, rcond=None)[0]
+        if np.max(np.abs(updated - theta)) < 1e-10:
+            return updated
+        theta = updated
+    return theta
+
+
+def nelder_mead_batch(objective, starts, scales, iterations=400, tol=1e-8):
+    """Nelder-Mead run from many starts in lockstep.
+
+    Every step evaluates the reflection, expansion and contraction points of all
+    simplices as single batched objective calls, then picks each simplex's move
+    with masks. Returns (best coefficients, best values) per start.
+    """
+    S, P = starts.shape
+    simplex = np.repeat(starts[:, None, :], P + 1, axis=1)
+    for j in range(P):
+        simplex[:, j + 1, j] += scales[j]
+    values = objective(simplex.reshape(-1, P)).reshape(S, P + 1)
+    rows = np.arange(S)
+
+    for _ in range(iterations):
+        order = values.argsort(axis=1)
+        simplex = np.take_along_axis(simplex, order[:, :, None], axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        if np.all(values[:, -1] - values[:, 0] <= tol * (1 + np.abs(values[:, 0]))):
+            break
+
+        centroid = simplex[:, :-1].mean(axis=1)
+        worst = simplex[:, -1]
+        reflected = centroid + (centroid - worst)
+        expanded = centroid + 2.0 * (centroid - worst)
+        outside = centroid + 0.5 * (centroid - worst)
+        inside = centroid - 0.5 * (centroid - worst)
+        f_r, f_e, f_o, f_i = objective(np.vstack([reflected, expanded, outside, inside])).reshape(4, S)
+
+        best, second_worst, worst_value = values[:, 0], values[:, -2], values[:, -1]
+        use_e = (f_r < best) & (f_e < f_r)
+        use_r = ~use_e & (f_r < second_worst)
+        use_o = ~use_e & ~use_r & (f_r < worst_value) & (f_o <= f_r)
+        use_i = ~use_e & ~use_r & ~use_o & (f_r >= worst_value) & (f_i < worst_value)
+        shrink = ~(use_e | use_r | use_o | use_i)
+
+        new_point = np.select([use_e[:, None], use_r[:, None], use_o[:, None], use_i[:, None]],
+                              [expanded, reflected, outside, inside], worst)
+        new_value = np.select([use_e, use_r, use_o, use_i], [f_e, f_r, f_o, f_i], worst_value)
+        simplex[rows, -1] = new_point
+        values[rows, -1] = new_value
+
+        if shrink.any():
+            shrunk = simplex[shrink, :1] + 0.5 * (simplex[shrink, 1:] - simplex[shrink, :1])
+            simplex[shrink, 1:] = shrunk
+            values[shrink, 1:] = objective(shrunk.reshape(-1, P)).reshape(-1, P)
+
+    best = values.argmin(axis=1)
+    return simplex[rows, best], values[rows, best]
+
+
+def optimize(cases, features, kind='score', starts=64, spread=0.25, iterations=400, tau=0.5, seed=0):
+    """LAD warm start, then batched Nelder-Mead from jittered starts around it"""
+    X = design_matrix(cases, features)
+    y = cases.expected
+    objective = Objective(X, y, kind, tau)
+
+    center = lad_irls(X, y)
+    scales = np.maximum(np.abs(center) * spread, 1e-3)
+    rng = np.random.default_rng(seed)
+    initial = center + rng.uniform(-1, 1, size=(starts, len(center))) * scales
+    initial[0] = center
+
+    thetas, values = nelder_mead_batch(objective, initial, scales * 0.5, iterations)
+    best = values.argmin()
+    return center, thetas[best], objective, thetas, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-start local optimization of formula coefficients")
+    parser.add_argument('--features', default='days,miles,receipts',
+                        help=f"comma-separated formula terms from: {', '.join(FEATURES)}")
+    parser.add_argument('--objective', choices=['mae', 'score', 'smooth_exact'], default='score')
+    parser.add_argument('--starts', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=400)
+    parser.add_argument('--tau', type=float, default=0.5, help="kernel width for smooth_exact")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', default='public_cases.json')
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    features = args.features.split(',')
+
+    print(f"=== CONTINUOUS COEFFICIENT OPTIMIZATION ({args.objective}) ===")
+    start = time.perf_counter()
+    center, theta, objective, thetas, values = optimize(
+        cases, features, args.objective, args.starts, iterations=args.iterations, tau=args.tau, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    def summary(coefs):
+        errors = objective.errors(coefs)[0]
+        exact = int((errors < 0.01).sum())
+        return exact, errors.mean(), errors.mean() * 100 + (len(errors) - exact) * 0.1
+
+    for label, coefs in [("LAD (IRLS) warm start", center), ("Best after Nelder-Mead", theta)]:
+        exact, mae, score = summary(coefs)
+        print(f"\n{label}:")
+        print("  " + " + ".join(f"{coef:.6f}*{name}" for coef, name in zip(coefs, features)))
+        print(f"  Exact matches: {exact}, Avg error: ${mae:.2f}, Score: {score:.2f}")
+
+    distinct = len(np.unique(np.round(thetas, 4), axis=0))
+    print(f"\n{args.starts} starts converged to {distinct} distinct optima")
+    print(f"{objective.evaluations:,} whole-dataset evaluations in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
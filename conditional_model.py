@@ -2,6 +2,7 @@
 
 import json
 import numpy as np
+from results_store import ResultsStore, TopK
 
 # Load the public cases
 with open('public_cases.json', 'r') as f:
@@ -94,6 +95,11 @@ mile_rates = [0.65, 0.70, 0.75]
 
 print("Testing conditional receipt models...")
 
+store = ResultsStore('results/conditional_model', {
+    'day_rate': 'f8', 'mile_rate': 'f8', 'exact_matches': 'i4', 'avg_error': 'f8',
+}, overwrite=True)
+top = TopK(5, key=lambda r: (-r['avg_error'], r['exact_matches']))
+
 for day_rate in day_rates:
     for mile_rate in mile_rates:
         avg_error, exact_matches = test_conditional_model(day_rate, mile_rate, receipt_rules)
@@ -102,8 +108,13 @@ for day_rate in day_rates:
             best_score = avg_error
             best_model = (day_rate, mile_rate, exact_matches)
         
-        if exact_matches > 0 or avg_error < 200:
-            print(f"  ${day_rate}/day + ${mile_rate:.2f}/mile: Avg error ${avg_error:.2f}, Exact matches: {exact_matches}")
+        row = {'day_rate': day_rate, 'mile_rate': mile_rate, 'exact_matches': exact_matches, 'avg_error': avg_error}
+        store.append(**row)
+        top.push(row)
+
+store.close()
+for row in top.rows():
+    print(f"  ${row['day_rate']}/day + ${row['mile_rate']:.2f}/mile: Avg error ${row['avg_error']:.2f}, Exact matches: {row['exact_matches']}")
 
 print(f"\nBest conditional model: ${best_model[0]}/day + ${best_model[1]:.2f}/mile")
 print(f"Average error: ${best_score:.2f}, Exact matches: {best_model[2]}")
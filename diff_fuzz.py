@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from cents import from_cents, round_cents
+from load_test import WorkloadModel
+
+VARIANTS = [
+    'calculate_reimbursement',
+    'calculate_reimbursement_lookup',
+    'calculate_reimbursement_perfect',
+    'calculate_reimbursement_ultimate',
+    'calculate_reimbursement_backup',
+]
+
+# Variants that are supposed to agree; only these pairs are compared unless --all-pairs
+EQUIVALENT_GROUPS = [
+    ['calculate_reimbursement', 'calculate_reimbursement_lookup', 'calculate_reimbursement_perfect'],
+    ['calculate_reimbursement_ultimate', 'calculate_reimbursement_backup'],
+]
+
+DAY_EDGES = [1, 2, 4, 7, 11, 15]
+DAY_LABELS = ['1d', '2-3d', '4-6d', '7-10d', '11-14d', '15d+']
+
+
+def fuzz_inputs(n, rng, model):
+    """Half realistic traffic, half uniform over a wider box with boundary values mixed in"""
+    realistic = model.sample(n // 2, rng)
+    m = n - len(realistic)
+    uniform = np.column_stack([
+        rng.integers(1, 31, size=m),
+        np.where(rng.random(m) < 0.1, np.round(rng.uniform(0, 2000, m), 2), rng.integers(0, 2001, size=m)),
+        np.round(rng.uniform(0, 3000, m), 2),
+    ]).astype(np.float64)
+    edges = rng.random(m) < 0.05
+    uniform[edges, 1] = rng.choice([0, 1, 99, 100, 101, 500, 800, 1000], size=int(edges.sum()))
+    uniform[edges, 2] = rng.choice([0, 0.49, 0.99, 49.99, 50, 500.49, 1500, 2000.99], size=int(edges.sum()))
+    return np.vstack([realistic, uniform])
+
+
+def region_codes(inputs):
+    days_bin = np.searchsorted(DAY_EDGES, inputs[:, 0], side='right') - 1
+    miles_bin = np.minimum(inputs[:, 1] // 250, 7).astype(np.int64)
+    receipts_bin = np.minimum(inputs[:, 2] // 500, 5).astype(np.int64)
+    return (days_bin * 8 + miles_bin) * 6 + receipts_bin
+
+
+def describe_region(code):
+    code, receipts_bin = divmod(int(code), 6)
+    days_bin, miles_bin = divmod(code, 8)
+    miles = f"{miles_bin * 250}+mi" if miles_bin == 7 else f"{miles_bin * 250}-{miles_bin * 250 + 249}mi"
+    receipts = f"${receipts_bin * 500}+" if receipts_bin == 5 else f"${receipts_bin * 500}-{receipts_bin * 500 + 499}"
+    return f"{DAY_LABELS[days_bin]}, {miles}, {receipts}"
+
+
+def diverges(a, b, tol):
+    return abs(a - b) > tol
+
+
+def shrink(row, scalar_a, scalar_b, tol):
+    """Greedily simplify a diverging input while it keeps diverging inside its region"""
+    days, miles, receipts = int(row[0]), float(row[1]), float(row[2])
+    region = region_codes(np.array([[days, miles, receipts]]))[0]
+
+    def still(d, m, r):
+        if region_codes(np.array([[d, m, r]]))[0] != region:
+            return False
+        return diverges(scalar_a(d, m, r), scalar_b(d, m, r), tol)
+
+    changed = True
+    while changed:
+        changed = False
+        candidates = [
+            (1, miles, receipts), (max(days - 1, 1), miles, receipts),
+            (days, float(round(miles)), receipts), (days, round(miles, -1), receipts), (days, round(miles, -2), receipts),
+            (days, miles, float(round(receipts))), (days, miles, round(receipts, -1)), (days, miles, round(receipts, -2)),
+            (days, 0.0, receipts), (days, miles, 0.0),
+        ]
+        for d, m, r in candidates:
+            if (d, m, r) != (days, miles, receipts) and (d + m / 100 + r / 1000) < (days + miles / 100 + receipts / 1000) \
+                    and still(d, m, r):
+                days, miles, receipts = d, m, r
+                changed = True
+                break
+    return days, miles, receipts
+
+
+def cross_process_outputs(name, sample, hash_seed):
+    """Scalar outputs for the sample computed in a fresh interpreter with another hash seed"""
+    code = (
+        "import json, sys, importlib\n"
+        f"m = importlib.import_module({name!r})\n"
+        "rows = json.load(sys.stdin)\n"
+        "print(json.dumps([m.calculate_reimbursement(int(d), mi, r) for d, mi, r in rows]))\n"
+    )
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    out = subprocess.run([sys.executable, '-c', code], input=json.dumps(sample.tolist()),
+                         capture_output=True, text=True, check=True, env=env)
+    return np.array(json.loads(out.stdout), dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential fuzzing across calculator variants")
+    parser.add_argument('variants', nargs='*', default=VARIANTS)
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--chunk', type=int, default=200_000)
+    parser.add_argument('--tol', type=float, default=0.0, help="differences up to this are not divergences")
+    parser.add_argument('--regions', type=int, default=5, help="regions to show per diverging pair")
+    parser.add_argument('--all-pairs', action='store_true', help="compare every pair, not just equivalent groups")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    model = WorkloadModel()
+    modules = {name: importlib.import_module(name) for name in args.variants}
+    if args.all_pairs:
+        pairs = list(itertools.combinations(args.variants, 2))
+    else:
+        pairs = [pair for group in EQUIVALENT_GROUPS
+                 for pair in itertools.combinations([name for name in group if name in modules], 2)]
+
+    divergent = {pair: 0 for pair in pairs}
+    rounding_only = {pair: 0 for pair in pairs}
+    max_diff = {pair: 0.0 for pair in pairs}
+    region_counts = {pair: {} for pair in pairs}
+    region_example = {pair: {} for pair in pairs}
+    off_grid = {name: 0 for name in args.variants}
+    timings = {name: 0.0 for name in args.variants}
+
+    print(f"=== DIFFERENTIAL FUZZING: {len(args.variants)} variants, {args.count:,} inputs ===")
+    start = time.perf_counter()
+    done = 0
+    while done < args.count:
+        inputs = fuzz_inputs(min(args.chunk, args.count - done), rng, model)
+        outputs = {}
+        for name, module in modules.items():
+            t0 = time.perf_counter()
+            outputs[name] = np.asarray(module.calculate_reimbursement_batch(inputs[:, 0], inputs[:, 1], inputs[:, 2]))
+            timings[name] += time.perf_counter() - t0
+            off_grid[name] += int(np.sum(outputs[name] != from_cents(round_cents(outputs[name]))))
+
+        codes = region_codes(inputs)
+        for pair in pairs:
+            diff = np.abs(outputs[pair[0]] - outputs[pair[1]])
+            mask = diff > args.tol
+            if not mask.any():
+                continue
+            divergent[pair] += int(mask.sum())
+            rounding_only[pair] += int(np.sum(mask & (diff <= 0.011)))
+            max_diff[pair] = max(max_diff[pair], float(diff[mask].max()))
+            for code, first in zip(*np.unique(codes[mask], return_index=True)):
+                region_counts[pair][code] = region_counts[pair].get(code, 0) + int(np.sum(codes[mask] == code))
+                region_example[pair].setdefault(code, inputs[np.flatnonzero(mask)[first]])
+        done += len(inputs)
+        print(f"Progress: {done:,}/{args.count:,} inputs ({done / (time.perf_counter() - start):,.0f}/s)")
+
+    print(f"\nBatch scoring time per variant:")
+    for name in args.variants:
+        print(f"  {name}: {timings[name]:.2f}s ({args.count / max(timings[name], 1e-9):,.0f} inputs/s)")
+
+    print(f"\n=== DIVERGENCE BY PAIR ===")
+    for pair in pairs:
+        a, b = pair
+        if not divergent[pair]:
+            print(f"  {a} vs {b}: identical")
+            continue
+        print(f"  {a} vs {b}: {divergent[pair]:,} diverging ({divergent[pair] / args.count:.2%}), "
+              f"{rounding_only[pair]:,} rounding-only (<= $0.011), max diff ${max_diff[pair]:.2f}")
+        regions = sorted(region_counts[pair].items(), key=lambda item: -item[1])[:args.regions]
+        for code, count in regions:
+            repro = shrink(region_example[pair][code], modules[a].calculate_reimbursement,
+                           modules[b].calculate_reimbursement, args.tol)
+            got_a = modules[a].calculate_reimbursement(*repro)
+            got_b = modules[b].calculate_reimbursement(*repro)
+            print(f"    {describe_region(code)}: {count:,} cases; "
+                  f"repro: {repro[0]} {repro[1]:g} {repro[2]:.2f} -> {got_a} vs {got_b}")
+
+    print(f"\n=== DETERMINISM AND ROUNDING ===")
+    sample = fuzz_inputs(2000, np.random.default_rng(args.seed + 1), model)
+    for name, module in modules.items():
+        batch_a = np.asarray(module.calculate_reimbursement_batch(sample[:, 0], sample[:, 1], sample[:, 2]))
+        batch_b = np.asarray(module.calculate_reimbursement_batch(sample[:, 0], sample[:, 1], sample[:, 2]))
+        scalar = np.array([module.calculate_reimbursement(int(d), m, r) for d, m, r in sample.tolist()])
+        other = cross_process_outputs(name, sample[:500], hash_seed=args.seed + 12345)
+        issues = []
+        if np.any(batch_a != batch_b):
+            issues.append(f"batch repeat differs on {int(np.sum(batch_a != batch_b))} rows")
+        if np.any(batch_a != scalar):
+            issues.append(f"batch vs scalar differs on {int(np.sum(batch_a != scalar))} rows")
+        if np.any(scalar[:500] != other):
+            issues.append(f"cross-process (other hash seed) differs on {int(np.sum(scalar[:500] != other))} rows")
+        if off_grid[name]:
+            issues.append(f"{off_grid[name]:,} outputs not on a whole-cent value")
+        print(f"  {name}: {'; '.join(issues) if issues else 'deterministic, batch == scalar, all outputs on cents'}")
+
+    print(f"\nTotal time: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
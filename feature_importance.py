@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+
+from calculate_reimbursement_ultimate import extract_ultimate_features
+from case_data import load_cases
+
+# Column names of extract_ultimate_features, in order (as in build_ultimate_model.py)
+FEATURE_NAMES = [
+    'days', 'miles', 'receipts', 'miles_per_day', 'receipts_per_day', 'receipts_per_mile',
+    'log_days', 'log_miles', 'log_receipts', 'sqrt_days', 'sqrt_miles', 'sqrt_receipts',
+    'days²', 'miles²', 'receipts²', 'days^0.5', 'miles^0.5', 'receipts^0.5',
+    'days*miles', 'days*receipts', 'miles*receipts', 'days*mpd', 'days*rpd', 'miles*rpm',
+    'days*miles*receipts', 'single_day', '5day_bonus', 'long_trip', 'very_long',
+    'small_receipts', 'high_receipts', 'very_high_receipts', 'low_miles', 'high_miles', 'very_high_miles',
+    'low_efficiency', 'optimal_efficiency', 'high_efficiency', 'days_capped', 'miles_binned', 'receipts_binned',
+    'receipts_vs_perdiem', 'miles_vs_daily', 'capped_standard', 'excess_receipts', 'excess_miles',
+    'week_pattern', 'month_pattern'
+]
+
+# Correlated families are permuted together so one member can't stand in for another
+FEATURE_GROUPS = {
+    'days transforms': ['days', 'log_days', 'sqrt_days', 'days²', 'days^0.5', 'days_capped'],
+    'days flags': ['single_day', '5day_bonus', 'long_trip', 'very_long'],
+    'miles transforms': ['miles', 'log_miles', 'sqrt_miles', 'miles²', 'miles^0.5', 'miles_binned'],
+    'miles flags': ['low_miles', 'high_miles', 'very_high_miles'],
+    'receipts transforms': ['receipts', 'log_receipts', 'sqrt_receipts', 'receipts²', 'receipts^0.5',
+                            'receipts_binned'],
+    'receipts flags': ['small_receipts', 'high_receipts', 'very_high_receipts'],
+    'per-day ratios': ['miles_per_day', 'receipts_per_day', 'receipts_vs_perdiem', 'miles_vs_daily'],
+    'efficiency flags': ['low_efficiency', 'optimal_efficiency', 'high_efficiency'],
+    'interactions': ['days*miles', 'days*receipts', 'miles*receipts', 'days*mpd', 'days*rpd', 'miles*rpm',
+                     'days*miles*receipts', 'receipts_per_mile'],
+    'rule proxies': ['capped_standard', 'excess_receipts', 'excess_miles'],
+    'periodic proxies': ['week_pattern', 'month_pattern'],
+}
+
+# Settings from build_ultimate_model.py
+MODEL_PARAMS = dict(n_estimators=500, learning_rate=0.05, max_depth=8, subsample=0.8, random_state=42,
+                    validation_fraction=0.2, n_iter_no_change=20)
+
+
+def feature_matrix(cases):
+    return np.array([extract_ultimate_features(d, m, r) for d, m, r in cases.inputs()], dtype=np.float64)
+
+
+def metrics(expected, predictions):
+    """Average error and score of rounded predictions; predictions may be (repeats, n)"""
+    errors = np.abs(expected - np.round(predictions, 2))
+    exact = (errors < 0.01).sum(axis=-1)
+    avg_error = errors.mean(axis=-1)
+    return avg_error, avg_error * 100 + (errors.shape[-1] - exact) * 0.1
+
+
+# Per-process state, filled in by init_worker
+_MODEL = None
+_X = None
+_Y = None
+_BASELINE = None
+
+
+def init_worker(model_bytes, X, y, baseline):
+    global _MODEL, _X, _Y, _BASELINE
+    _MODEL = pickle.loads(model_bytes)
+    _X, _Y, _BASELINE = X, y, baseline
+
+
+def permutation_task(task):
+    """Permute the given columns `repeats` times and score all copies with one predict call"""
+    label, columns, repeats, seed = task
+    rng = np.random.default_rng(seed)
+    n = len(_X)
+    stacked = np.tile(_X, (repeats, 1))
+    for r in range(repeats):
+        # One row permutation per repeat, shared by the group's columns
+        order = rng.permutation(n)
+        stacked[r * n:(r + 1) * n, columns] = _X[order][:, columns]
+    predictions = _MODEL.predict(stacked).reshape(repeats, n)
+    avg_error, score = metrics(_Y, predictions)
+    base_error, base_score = metrics(_Y, _BASELINE)
+    return label, avg_error - base_error, score - base_score
+
+
+def retrain_task(task):
+    """Held-out error after retraining without the given columns"""
+    label, keep, X_train, y_train, X_test, y_test = task
+    model = GradientBoostingRegressor(**MODEL_PARAMS).fit(X_train[:, keep], y_train)
+    avg_error, score = metrics(y_test, model.predict(X_test[:, keep]))
+    return label, float(avg_error), float(score)
+
+
+def run_tasks(pool, fn, tasks):
+    return list(pool.map(fn, tasks)) if pool else list(map(fn, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Permutation importance and group ablation for the ultimate feature set")
+    parser.add_argument('--model', default=None,
+                        help="pickled model to explain on all cases (default: train one on a split and use the held-out part)")
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--test-fraction', type=float, default=0.2)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--retrain', action='store_true', help="also retrain without each group (slower, exact ablation)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    X, y = feature_matrix(cases), cases.expected
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(y))
+    split = int(len(y) * (1 - args.test_fraction))
+    train, test = order[:split], order[split:]
+
+    print("=== PERMUTATION IMPORTANCE: ULTIMATE FEATURE SET ===")
+    start = time.perf_counter()
+    if args.model:
+        with open(args.model, 'rb') as f:
+            model = pickle.load(f)
+        X_eval, y_eval = X, y
+        print(f"Explaining {args.model} on all {len(y)} cases")
+    else:
+        model = GradientBoostingRegressor(**MODEL_PARAMS).fit(X[train], y[train])
+        X_eval, y_eval = X[test], y[test]
+        print(f"Trained on {len(train)} cases in {time.perf_counter() - start:.1f}s; explaining {len(test)} held-out cases")
+
+    baseline = model.predict(X_eval)
+    base_error, base_score = metrics(y_eval, baseline)
+    print(f"Baseline: avg error ${base_error:.2f}, score {base_score:.2f}")
+
+    index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+    tasks = [(name, [i], args.repeats, args.seed + i) for i, name in enumerate(FEATURE_NAMES)]
+    tasks += [(f"[{group}]", [index[name] for name in members], args.repeats, args.seed + 1000 + g)
+              for g, (group, members) in enumerate(FEATURE_GROUPS.items())]
+
+    pool = ProcessPoolExecutor(args.processes, initializer=init_worker,
+                               initargs=(pickle.dumps(model), X_eval, y_eval, baseline)) \
+        if args.processes > 1 else None
+    if pool is None:
+        init_worker(pickle.dumps(model), X_eval, y_eval, baseline)
+    try:
+        results = run_tasks(pool, permutation_task, tasks)
+        ablations = []
+        if args.retrain:
+            data = (X[train], y[train], X[test], y[test])
+            ablations = run_tasks(pool, retrain_task, [('all features', list(range(len(FEATURE_NAMES))), *data)] + [
+                (group, [i for i in range(len(FEATURE_NAMES)) if FEATURE_NAMES[i] not in members], *data)
+                for group, members in FEATURE_GROUPS.items()])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    singles = [r for r in results if not r[0].startswith('[')]
+    groups = [r for r in results if r[0].startswith('[')]
+    singles.sort(key=lambda r: -r[1].mean())
+    groups.sort(key=lambda r: -r[1].mean())
+
+    print(f"\nFeature importance (avg error increase when permuted, mean ± std over {args.repeats} repeats):")
+    for label, error_delta, score_delta in singles:
+        print(f"  {label:>22}: ${error_delta.mean():+8.2f} ± {error_delta.std():5.2f}  (score {score_delta.mean():+.1f})")
+
+    print(f"\nGroup importance (whole group permuted together):")
+    for label, error_delta, score_delta in groups:
+        print(f"  {label:>22}: ${error_delta.mean():+8.2f} ± {error_delta.std():5.2f}  (score {score_delta.mean():+.1f})")
+
+    if ablations:
+        _, full_error, full_score = ablations[0]
+        print(f"\nGroup ablation (retrained without the group; held-out, all features: ${full_error:.2f}):")
+        for group, avg_error, score in sorted(ablations[1:], key=lambda r: r[1]):
+            print(f"  [{group}]: avg error ${avg_error:.2f} ({avg_error - full_error:+.2f}), "
+                  f"score {score:.2f} ({score - full_score:+.2f})")
+
+    # A feature is a drop candidate only if neither it nor its correlated group shows a loss:
+    # permuting one member alone says little when another member can stand in for it
+    def harmless(error_delta):
+        return error_delta.mean() <= max(2 * error_delta.std(), 0.01)
+
+    group_of = {name: group for group, members in FEATURE_GROUPS.items() for name in members}
+    if ablations:
+        full_error = ablations[0][1]
+        group_ok = {group: avg_error - full_error <= 0.01 for group, avg_error, _ in ablations[1:]}
+        evidence = "group retrained without it shows no loss"
+    else:
+        group_ok = {label[1:-1]: harmless(error_delta) for label, error_delta, _ in groups}
+        evidence = "group permutation shows no loss; confirm with --retrain"
+    droppable = [label for label, error_delta, _ in singles[::-1] if harmless(error_delta) and group_ok[group_of[label]]]
+    if not ablations:
+        print(f"\n💡 Drop candidates ({len(droppable)} features; no loss when permuted and {evidence}):")
+        print("  " + (", ".join(droppable) if droppable else "none"))
+    else:
+        # Sequential ablation, least important first: a candidate is kept only if retraining
+        # without it and every candidate already accepted still shows no loss
+        confirmed, final_error = [], full_error
+        for name in droppable:
+            keep = [i for i, feature in enumerate(FEATURE_NAMES) if feature not in confirmed and feature != name]
+            _, avg_error, _ = retrain_task((name, keep, X[train], y[train], X[test], y[test]))
+            if avg_error - full_error <= 0.01:
+                confirmed.append(name)
+                final_error = avg_error
+        print(f"\n💡 Drop candidates ({len(confirmed)} of {len(droppable)} screened features confirmed by "
+              f"sequential retraining; held-out avg error ${final_error:.2f} without them vs ${full_error:.2f}):")
+        print("  " + (", ".join(confirmed) if confirmed else "none"))
+    print(f"\nTotal time: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
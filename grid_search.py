@@ -2,6 +2,7 @@
 
 import json
 import numpy as np
+from results_store import ResultsStore, TopK, ProgressReporter
 
 # Load the public cases
 with open('public_cases.json', 'r') as f:
@@ -50,11 +51,25 @@ best_exact = 0
 best_params = None
 best_error = float('inf')
 
+# Every configuration goes to a columnar store instead of the console;
+# query it afterwards with: python3 results_store.py results/grid_search --where ...
+store = ResultsStore('results/grid_search', {
+    'day_coef': 'f8', 'mile_coef': 'f8', 'receipt_coef': 'f8', 'bonus_5day': 'f8',
+    'exact_matches': 'i4', 'avg_error': 'f8',
+}, overwrite=True)
+top = TopK(10, key=lambda r: (r['exact_matches'], -r['avg_error']))
+
+day_coefs = np.arange(base_day - 10, base_day + 11, 1)
+mile_coefs = np.arange(base_mile - 0.1, base_mile + 0.11, 0.02)
+receipt_coefs = np.arange(0.01, 0.6, 0.01)
+bonuses = [0, 20, 30, 50, 75, 100]
+progress = ProgressReporter(total=len(day_coefs) * len(mile_coefs) * len(receipt_coefs) * len(bonuses))
+
 # Search around the known good values with finer increments
-for day_coef in np.arange(base_day - 10, base_day + 11, 1):
-    for mile_coef in np.arange(base_mile - 0.1, base_mile + 0.11, 0.02):
-        for receipt_coef in np.arange(0.01, 0.6, 0.01):
-            for bonus_5day in [0, 20, 30, 50, 75, 100]:
+for day_coef in day_coefs:
+    for mile_coef in mile_coefs:
+        for receipt_coef in receipt_coefs:
+            for bonus_5day in bonuses:
                 
                 exact_matches, avg_error = test_formula(day_coef, mile_coef, receipt_coef, bonus_5day)
                 
@@ -65,10 +80,19 @@ for day_coef in np.arange(base_day - 10, base_day + 11, 1):
                     best_error = avg_error
                     best_params = (day_coef, mile_coef, receipt_coef, bonus_5day)
                 
-                # Report progress for good results
-                if exact_matches > 0 or avg_error < 200:
-                    print(f"  ${day_coef:.0f}/day + ${mile_coef:.2f}/mile + {receipt_coef:.3f}*receipts + ${bonus_5day} 5-day bonus")
-                    print(f"    Exact matches: {exact_matches}, Avg error: ${avg_error:.2f}")
+                row = {'day_coef': day_coef, 'mile_coef': mile_coef, 'receipt_coef': receipt_coef,
+                       'bonus_5day': bonus_5day, 'exact_matches': exact_matches, 'avg_error': avg_error}
+                store.append(**row)
+                top.push(row)
+                progress.update(status=f"best: {best_exact} exact, ${best_error:.2f}")
+
+store.close()
+progress.report()
+
+print(f"\nTop {len(top.rows())} formulas ({len(store):,} stored in {store.path}):")
+for row in top.rows():
+    print(f"  ${row['day_coef']:.0f}/day + ${row['mile_coef']:.2f}/mile + {row['receipt_coef']:.3f}*receipts + ${row['bonus_5day']} 5-day bonus")
+    print(f"    Exact matches: {row['exact_matches']}, Avg error: ${row['avg_error']:.2f}")
 
 print(f"\nBest formula found:")
 day_coef, mile_coef, receipt_coef, bonus_5day = best_params
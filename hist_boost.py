@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import os
+import time
+
+import numpy as np
+
+from case_data import load_cases
+
+CACHE_DIR = 'bin_cache'
+
+
+def fit_bins(X, max_bins=255):
+    """Per-feature cut points: midpoints between distinct values, or quantiles when there are too many"""
+    edges = []
+    for column in X.T:
+        distinct = np.unique(column)
+        if len(distinct) <= max_bins:
+            cuts = (distinct[:-1] + distinct[1:]) / 2
+        else:
+            cuts = np.unique(np.quantile(column, np.linspace(0, 1, max_bins + 1)[1:-1], method='midpoint'))
+        edges.append(cuts)
+    return edges
+
+
+def apply_bins(X, edges):
+    """uint8 matrix where each value is the number of its feature's cuts lying below it"""
+    binned = np.empty(X.shape, dtype=np.uint8)
+    for f, cuts in enumerate(edges):
+        binned[:, f] = np.searchsorted(cuts, X[:, f], side='left')
+    return binned
+
+
+def cache_key(cases_path, max_bins):
+    from calculate_reimbursement_ultimate import extract_ultimate_features
+    digest = hashlib.sha1()
+    with open(cases_path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(inspect.getsource(extract_ultimate_features).encode())
+    digest.update(str(max_bins).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_binned(cases_path, max_bins=255, cache_dir=CACHE_DIR):
+    """(binned matrix, cut points, expected, seconds spent, hit) for the ultimate feature set.
+
+    The binned matrix lives in an .npy file memory-mapped on reuse; cut points are
+    stored flattened with per-feature offsets, as in tree_pack.py.
+    """
+    from feature_importance import feature_matrix
+    start = time.perf_counter()
+    key = cache_key(cases_path, max_bins)
+    matrix_path = os.path.join(cache_dir, f'binned_{key}.npy')
+    meta_path = os.path.join(cache_dir, f'binned_{key}_meta.npz')
+    if os.path.exists(matrix_path) and os.path.exists(meta_path):
+        binned = np.load(matrix_path, mmap_mode='r')
+        meta = np.load(meta_path)
+        offsets, cuts = meta['offsets'], meta['cuts']
+        edges = [cuts[offsets[f]:offsets[f + 1]] for f in range(len(offsets) - 1)]
+        return binned, edges, meta['expected'], time.perf_counter() - start, True
+
+    cases = load_cases(cases_path)
+    X = feature_matrix(cases)
+    edges = fit_bins(X, max_bins)
+    binned = apply_bins(X, edges)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(matrix_path, binned)
+    offsets = np.concatenate([[0], np.cumsum([len(cuts) for cuts in edges])])
+    np.savez(meta_path, offsets=offsets, cuts=np.concatenate(edges), expected=cases.expected)
+    return binned, edges, cases.expected, time.perf_counter() - start, False
+
+
+class HistBoost:
+    """Least-squares gradient boosting on a uint8-binned matrix.
+
+    Trees grow level by level; one bincount per level builds the gradient
+    histograms of every (node, feature, bin) at once.
+    """
+
+    def __init__(self, n_estimators=300, learning_rate=0.1, max_depth=6, min_samples_leaf=5,
+                 l2=1.0, subsample=1.0, random_state=0):
+        self.n_estimators, self.learning_rate, self.max_depth = n_estimators, learning_rate, max_depth
+        self.min_samples_leaf, self.l2, self.subsample = min_samples_leaf, l2, subsample
+        self.random_state = random_state
+
+    def fit(self, B, y):
+        B = np.asarray(B)
+        rng = np.random.default_rng(self.random_state)
+        self.base = float(np.mean(y))
+        self.trees = []
+        prediction = np.full(len(y), self.base)
+        for _ in range(self.n_estimators):
+            rows = np.arange(len(y)) if self.subsample >= 1 else \
+                np.sort(rng.choice(len(y), int(len(y) * self.subsample), replace=False))
+            tree = self._grow(B[rows], prediction[rows] - y[rows])
+            self.trees.append(tree)
+            prediction += self._apply(tree, B)
+        return self
+
+    def _grow(self, B, gradient):
+        n, F = B.shape
+        feature, threshold, left, right = [-1], [0], [0], [0]
+        node_of = np.zeros(n, dtype=np.int64)
+        frontier = np.array([0])
+        for _ in range(self.max_depth):
+            if len(frontier) == 0:
+                break
+            local = np.full(len(feature), -1)
+            local[frontier] = np.arange(len(frontier))
+            rows = np.flatnonzero(local[node_of] >= 0)
+            keys = ((local[node_of[rows]][:, None] * F + np.arange(F)) * 256 + B[rows]).ravel()
+            size = len(frontier) * F * 256
+            G = np.bincount(keys, weights=np.repeat(gradient[rows], F), minlength=size)
+            C = np.bincount(keys, minlength=size)
+
+            # Only occupied bins can end a left side; work on those, grouped by (node, feature)
+            occupied = np.flatnonzero(C)
+            group = occupied >> 8
+            GL, CL = np.cumsum(G[occupied]), np.cumsum(C[occupied])
+            first = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+            last = np.r_[first[1:], len(occupied)] - 1
+            length = np.diff(np.r_[first, len(occupied)])
+            GL -= np.repeat(np.r_[0, GL[last[:-1]]], length)
+            CL -= np.repeat(np.r_[0, CL[last[:-1]]], length)
+            Gt, Ct = np.repeat(GL[last], length), np.repeat(CL[last], length)
+            GR, CR = Gt - GL, Ct - CL
+            gain = GL ** 2 / (CL + self.l2) + GR ** 2 / (CR + self.l2) - Gt ** 2 / (Ct + self.l2)
+            gain[(CL < self.min_samples_leaf) | (CR < self.min_samples_leaf)] = -np.inf
+
+            # Best occupied bin per frontier node (occupied is sorted, so nodes are contiguous)
+            node_index = group // F
+            starts = np.flatnonzero(np.r_[True, node_index[1:] != node_index[:-1]])
+            node_best = np.maximum.reduceat(gain, starts)
+            winners = np.flatnonzero(gain == np.repeat(node_best, np.diff(np.r_[starts, len(gain)])))
+            winners = winners[np.r_[True, node_index[winners][1:] != node_index[winners][:-1]]]
+            best = np.full(len(frontier), -1)
+            improving = gain[winners] > 1e-9
+            best[node_index[winners[improving]]] = occupied[winners[improving]]
+
+            splitting = np.flatnonzero(best >= 0)
+            if len(splitting) == 0:
+                break
+            split_feature = (best[splitting] >> 8) % F
+            split_bin = best[splitting] & 255
+            first_child = len(feature) + 2 * np.arange(len(splitting))
+            for node, f, t, child in zip(frontier[splitting].tolist(), split_feature.tolist(),
+                                         split_bin.tolist(), first_child.tolist()):
+                feature[node], threshold[node], left[node], right[node] = f, t, child, child + 1
+            feature += [-1] * 2 * len(splitting)
+            threshold += [0] * 2 * len(splitting)
+            left += [0] * 2 * len(splitting)
+            right += [0] * 2 * len(splitting)
+
+            # Move every row of a split node to its child in one pass
+            slot = np.full(len(frontier), -1)
+            slot[splitting] = np.arange(len(splitting))
+            moving = rows[slot[local[node_of[rows]]] >= 0]
+            s = slot[local[node_of[moving]]]
+            node_of[moving] = first_child[s] + (B[moving, split_feature[s]] > split_bin[s])
+            frontier = np.concatenate([first_child, first_child + 1])
+
+        counts = np.bincount(node_of, minlength=len(feature))
+        sums = np.bincount(node_of, weights=gradient, minlength=len(feature))
+        value = -self.learning_rate * sums / (counts + self.l2)
+        return (np.array(feature), np.array(threshold), np.array(left), np.array(right), value)
+
+    def _apply(self, tree, B):
+        feature, threshold, left, right, value = tree
+        node = np.zeros(len(B), dtype=np.int64)
+        rows = np.arange(len(B))
+        for _ in range(self.max_depth):
+            split = feature[node]
+            inner = split >= 0
+            if not inner.any():
+                break
+            go_left = B[rows, np.maximum(split, 0)] <= threshold[node]
+            node = np.where(inner, np.where(go_left, left[node], right[node]), node)
+        return value[node]
+
+    def predict(self, B):
+        B = np.asarray(B)
+        return self.base + sum(self._apply(tree, B) for tree in self.trees)
+
+
+def metrics(y, predictions):
+    errors = np.abs(y - predictions)
+    return errors.mean(), int(np.sum(errors < 0.01)), errors.mean() * 100 + np.sum(errors >= 0.01) * 0.1
+
+
+def main():
+    from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+    from feature_importance import MODEL_PARAMS, feature_matrix
+
+    parser = argparse.ArgumentParser(description="Histogram boosting on a cached uint8-binned feature matrix")
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--max-bins', type=int, default=255)
+    parser.add_argument('--test-fraction', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sweep', action='store_true', help="learning rate x depth grid on the cached bins")
+    parser.add_argument('--skip-exact', action='store_true', help="leave out the unbinned sklearn models")
+    args = parser.parse_args()
+    if not 2 <= args.max_bins <= 255:
+        raise SystemExit("--max-bins must be between 2 and 255 to fit uint8 bins")
+
+    print(f"=== HISTOGRAM BOOSTING ON CACHED BINS ({args.cases}, {args.max_bins} bins) ===")
+    B, edges, y, elapsed, hit = load_binned(args.cases, args.max_bins)
+    print(f"Binned matrix {B.shape[0]} x {B.shape[1]} uint8 ({B.nbytes:,} bytes) "
+          f"{'loaded from cache' if hit else 'built and cached'} in {elapsed * 1000:.1f}ms; "
+          f"{int(np.median([len(cuts) + 1 for cuts in edges]))} bins per feature (median)")
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(y))
+    split = int(len(y) * (1 - args.test_fraction))
+    train, test = order[:split], order[split:]
+
+    # Models trained on the binned matrix, then the current exact-split models on raw floats
+    models = [
+        ("hist (in-repo)", 'binned', HistBoost(n_estimators=300, learning_rate=0.1, max_depth=6)),
+        ("hist (sklearn)", 'binned', HistGradientBoostingRegressor(max_iter=300, learning_rate=0.1,
+                                                                   max_leaf_nodes=63, random_state=42)),
+    ]
+    if not args.skip_exact:
+        models += [
+            ("gbm (ultimate)", 'raw', GradientBoostingRegressor(**MODEL_PARAMS)),
+            ("gbm (improved_ml)", 'raw', GradientBoostingRegressor(n_estimators=200, learning_rate=0.1,
+                                                                   max_depth=8, random_state=42)),
+            ("forest (improved_ml)", 'raw', RandomForestRegressor(n_estimators=200, max_depth=15, min_samples_split=5,
+                                                                  min_samples_leaf=2, random_state=42)),
+        ]
+        X = feature_matrix(load_cases(args.cases))
+
+    print(f"\n  {'model':<22} {'input':>7} {'fit':>8} {'train err':>10} {'test err':>10} {'exact':>6} {'score':>9}")
+    for label, kind, model in models:
+        data = np.asarray(B) if kind == 'binned' else X
+        start = time.perf_counter()
+        model.fit(data[train], y[train])
+        fit = time.perf_counter() - start
+        train_error = metrics(y[train], model.predict(data[train]))[0]
+        test_error, exact, score = metrics(y[test], model.predict(data[test]))
+        print(f"  {label:<22} {kind:>7} {fit:>7.2f}s ${train_error:>9.2f} ${test_error:>9.2f} {exact:>6} {score:>9.2f}")
+
+    if args.sweep:
+        # Every configuration reuses the cached matrix; only the boosting itself is repeated
+        print(f"\n🔁 Sweep on the cached bins (in-repo backend):")
+        print(f"  {'lr':>5} {'depth':>5} {'fit':>8} {'test err':>10} {'score':>9}")
+        results = []
+        for learning_rate, depth in itertools.product([0.03, 0.1, 0.3], [3, 5, 7]):
+            start = time.perf_counter()
+            model = HistBoost(n_estimators=300, learning_rate=learning_rate, max_depth=depth).fit(B[train], y[train])
+            fit = time.perf_counter() - start
+            test_error, _, score = metrics(y[test], model.predict(B[test]))
+            results.append((score, learning_rate, depth))
+            print(f"  {learning_rate:>5g} {depth:>5} {fit:>7.2f}s ${test_error:>9.2f} {score:>9.2f}")
+        score, learning_rate, depth = min(results)
+        print(f"  Best: lr {learning_rate:g}, depth {depth} (score {score:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from case_data import load_cases, CaseArrays
+from coefficient_optimizer import FEATURES, design_matrix
+from tier_search import frange
+
+# Formula families: one coefficient solved per case, the others gridded.
+# expected = solved_coef * solved_feature + sum(grid_coef * grid_feature)
+FAMILIES = {
+    'linear': {'solve': 'days', 'range': '0:250', 'grid': {'miles': '0:1:0.01', 'receipts': '0:1:0.01'}},
+    'offset': {'solve': 'const', 'range': '-500:1500',
+               'grid': {'days': '0:150:5', 'miles': '0:1:0.05', 'receipts': '0:1:0.05'}},
+    'sqrt': {'solve': 'days', 'range': '0:250', 'grid': {'sqrt_miles': '0:30:0.5', 'log_receipts': '0:200:4'}},
+    'per_day': {'solve': 'days', 'range': '0:250',
+                'grid': {'miles': '0:1:0.02', 'receipts': '0:1:0.02', 'miles_per_day': '-1:1:0.1'}},
+}
+
+
+def feasible_intervals(residual, solved, tol):
+    """Range of the solved coefficient that puts each case within tol, per (cell, case)"""
+    lo = (residual - tol) / solved
+    hi = (residual + tol) / solved
+    return np.minimum(lo, hi), np.maximum(lo, hi)
+
+
+def hough_vote(X_grid, solved, y, cells, solve_range, tol=0.005, top=20, budget=1 << 22):
+    """Accumulate exact-match votes over (grid cell, solved-coefficient bin).
+
+    Every case votes for the bins its feasible interval touches. The bin width is
+    the widest interval, so an interval touches at most two bins and a bin's count
+    is an upper bound on the cases any one coefficient inside it satisfies.
+    Returns (bin width, [(votes, cell index, bin index)] best first).
+    """
+    low, high = solve_range
+    width = 2 * tol / np.min(np.abs(solved))
+    n_bins = int(np.ceil((high - low) / width)) + 1
+    step = max(1, min(budget // len(y), budget // n_bins))
+    best_votes, best_flat = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    for start in range(0, len(cells), step):
+        block = cells[start:start + step]
+        k = len(block)
+        lo, hi = feasible_intervals(y[None, :] - block @ X_grid.T, solved[None, :], tol)
+        bin_lo = np.floor((lo - low) / width).astype(np.int64)
+        bin_hi = np.floor((hi - low) / width).astype(np.int64)
+        offsets = np.arange(k)[:, None] * n_bins
+        keep_lo = (bin_lo >= 0) & (bin_lo < n_bins)
+        keep_hi = (bin_hi != bin_lo) & (bin_hi >= 0) & (bin_hi < n_bins)
+        flat = np.concatenate([(bin_lo + offsets)[keep_lo], (bin_hi + offsets)[keep_hi]])
+        votes = np.bincount(flat, minlength=k * n_bins)
+        take = min(top, len(votes))
+        chosen = np.argpartition(-votes, take - 1)[:take]
+        best_votes = np.concatenate([best_votes, votes[chosen]])
+        best_flat = np.concatenate([best_flat, chosen + start * n_bins])
+        if len(best_votes) > top:
+            keep = np.argpartition(-best_votes, top - 1)[:top]
+            best_votes, best_flat = best_votes[keep], best_flat[keep]
+    order = np.argsort(-best_votes, kind='stable')
+    return width, [(int(best_votes[i]), int(best_flat[i] // n_bins), int(best_flat[i] % n_bins)) for i in order]
+
+
+def stab(lo, hi):
+    """(count, point) of the coefficient covered by the most [lo, hi] intervals"""
+    points = np.concatenate([lo, hi])
+    deltas = np.concatenate([np.ones(len(lo), dtype=np.int64), -np.ones(len(hi), dtype=np.int64)])
+    order = np.lexsort((-deltas, points))  # opens before closes at the same point
+    depth = np.cumsum(deltas[order])
+    best = int(np.argmax(depth))
+    # Centre of the deepest stretch, so the chosen value is not on an interval edge
+    point = (points[order][best] + points[order][min(best + 1, len(points) - 1)]) / 2
+    return int(depth[best]), point
+
+
+def refine(X_grid, solved, y, theta_grid, tol):
+    """Best solved coefficient for one grid cell, and the exact matches it really gives"""
+    lo, hi = feasible_intervals(y - X_grid @ theta_grid, solved, tol)
+    stabbed, coef = stab(lo, hi)
+    predictions = coef * solved + X_grid @ theta_grid
+    errors = np.abs(y - np.round(predictions, 2))
+    return stabbed, coef, int(np.sum(errors < 0.01)), errors.mean()
+
+
+def parse_grid(items):
+    grid = {}
+    for item in items:
+        name, spec = item.split('=', 1)
+        if name not in FEATURES:
+            raise SystemExit(f"unknown feature {name!r}; choose from {', '.join(FEATURES)}")
+        grid[name] = spec
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hough-style voting for exact-match formula coefficients")
+    parser.add_argument('--family', choices=list(FAMILIES), default='linear')
+    parser.add_argument('--grid', nargs='*', default=[], metavar='FEATURE=SPEC',
+                        help="override a gridded coefficient, e.g. miles=0.4:0.7:0.005")
+    parser.add_argument('--range', default=None, help="LOW:HIGH for the solved coefficient")
+    parser.add_argument('--days', type=int, nargs='*', default=None, help="only cases with these trip lengths")
+    parser.add_argument('--tol', type=float, default=0.005, help="half-width of the exact-match window")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--cases', default='public_cases.json')
+    args = parser.parse_args()
+
+    family = FAMILIES[args.family]
+    grid = {**family['grid'], **parse_grid(args.grid)}
+    low, high = (float(part) for part in (args.range or family['range']).split(':'))
+
+    cases = load_cases(args.cases)
+    if args.days:
+        mask = np.isin(cases.days, args.days)
+        cases = CaseArrays(cases.days[mask], cases.miles[mask], cases.receipts[mask], cases.expected[mask])
+    solved = FEATURES[family['solve']](cases)
+    if np.any(solved == 0):
+        raise SystemExit(f"{family['solve']} is zero for some cases and cannot be solved for")
+    X_grid = design_matrix(cases, list(grid))
+    axes = [frange(spec) for spec in grid.values()]
+    cells = np.array(list(itertools.product(*axes)))
+    y = cases.expected
+
+    print(f"=== HOUGH VOTING: {args.family} family, {len(y)} cases ===")
+    print(f"Solved per case: {family['solve']} in [{low:g}, {high:g}]")
+    print(f"Gridded: " + ", ".join(f"{name} {spec} ({len(axis)})" for (name, spec), axis in zip(grid.items(), axes)))
+
+    start = time.perf_counter()
+    width, candidates = hough_vote(X_grid, solved, y, cells, (low, high), args.tol, top=args.top * 5)
+    voting = time.perf_counter() - start
+    print(f"Voted {len(cells):,} cells x {int(np.ceil((high - low) / width)) + 1:,} bins "
+          f"(width {width:g}) in {voting:.2f}s ({len(cells) * len(y) / voting / 1e6:.1f}M case-cells/s)")
+
+    # Re-score the best accumulator cells exactly; one line per grid cell
+    seen, results = set(), []
+    for votes, cell, _ in candidates:
+        if cell in seen:
+            continue
+        seen.add(cell)
+        stabbed, coef, exact, avg_error = refine(X_grid, solved, y, cells[cell], args.tol)
+        results.append((exact, stabbed, votes, coef, cells[cell], avg_error))
+    results.sort(key=lambda row: (-row[0], row[5]))
+
+    names = [family['solve']] + list(grid)
+    print(f"\n🎯 Cells consistent with the most cases:")
+    print(f"  {'votes':>6} {'stabbed':>8} {'exact':>6} {'avg error':>10}  formula")
+    for exact, stabbed, votes, coef, theta, avg_error in results[:args.top]:
+        formula = " + ".join(f"{value:g}*{name}" for value, name in zip([coef, *theta], names))
+        print(f"  {votes:>6} {stabbed:>8} {exact:>6} ${avg_error:>9.2f}  {formula}")
+
+    if results:
+        exact, _, _, coef, theta, _ = results[0]
+        print(f"\nBest: {exact} of {len(y)} cases ({exact / len(y):.1%}) exact with "
+              f"{family['solve']} = {coef:.6f}, " + ", ".join(f"{n} = {v:g}" for n, v in zip(grid, theta)))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import json
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
+from oof_cache import cache_predictions
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -116,6 +117,8 @@ for name, model in models.items():
     print(f"\nTraining {name}...")
     model.fit(X_train, y_train)
     predictions = model.predict(X_test)
+    # Keep this model's out-of-fold and holdout predictions for oof_cache.py blending
+    cache_predictions('improved_ml', name, model, X, y, train_size, predictions)
     
     # Calculate error metrics
     errors = np.abs(predictions - y_test)
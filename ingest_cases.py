@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from case_data import CaseArrays, load_cases
+from cents import from_cents, pack_keys, to_cents, unpack_keys
+
+# Calculator modules holding a lookup literal, and the name of the dict in each.
+# The nearest-neighbour fallback in these modules scans the same dict, so a key
+# added to the lookup is also in the neighbour index.
+LOOKUP_MODULES = {
+    'calculate_reimbursement.py': 'PERFECT_LOOKUP',
+    'calculate_reimbursement_lookup.py': 'PERFECT_LOOKUP',
+    'calculate_reimbursement_perfect.py': 'PERFECT_LOOKUP',
+    'calculate_reimbursement_ultimate.py': 'PUBLIC_LOOKUP',
+}
+
+LOG_PATH = 'ingested_cases.jsonl'
+
+
+def case_key(days, miles, receipts):
+    """Packed integer-cent key of an input (see cents.pack_keys)"""
+    return int(pack_keys(int(days), to_cents(miles), to_cents(receipts)))
+
+
+def key_inputs(key):
+    """(days, miles, receipts) back from a packed key, as the lookup literals write them"""
+    days, miles_hundredths, receipts_cents = unpack_keys(key)
+    return int(days), float(from_cents(miles_hundredths)), float(from_cents(receipts_cents))
+
+
+def sidecar_path(path):
+    """Rows ingested into a module's lookup since its literal was generated"""
+    return os.path.splitext(path)[0] + '.ingested.csv'
+
+
+# Read at import by every lookup module, right after its literal. Plain text and no
+# imports, so a calculator whose sidecar doesn't exist pays one failed open().
+LOADER_MARKER = "    with open(__file__.rsplit('.', 1)[0] + '.ingested.csv') as _f:\n"
+
+
+def loader_block(name):
+    """Sidecar loader lines for modules generated before the loader existed"""
+    return [
+        "\n",
+        "# Cases added by ingest_cases.py since this table was generated, one days,miles,receipts,output row per line\n",
+        "try:\n",
+        LOADER_MARKER,
+        "        for _row in _f:\n",
+        "            _days, _miles, _receipts, _output = _row.split(',')\n",
+        f"            {name}[int(_days), float(_miles), float(_receipts)] = float(_output)\n",
+        "except FileNotFoundError:\n",
+        "    pass\n",
+    ]
+
+
+def read_sidecar(path):
+    """{(days, miles, receipts): output} rows of a module's sidecar, as the loader reads them"""
+    rows = {}
+    if os.path.exists(sidecar_path(path)):
+        with open(sidecar_path(path)) as f:
+            for line in f:
+                days, miles, receipts, output = line.split(',')
+                rows[int(days), float(miles), float(receipts)] = float(output)
+    return rows
+
+
+def existing_keys(path, name):
+    """Keys and values in a module's lookup: base literal, earlier update lines and the sidecar"""
+    namespace = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith(f"{name} = ") or line.startswith(f"{name}.update({{"):
+                exec(line, namespace)
+    lookup = namespace.get(name, {})
+    lookup.update(read_sidecar(path))
+    return lookup
+
+
+def ensure_loader(path, name):
+    """Insert the sidecar loader after the lookup literal if the module doesn't have it yet"""
+    with open(path) as f:
+        lines = f.readlines()
+    if LOADER_MARKER in lines:
+        return
+    position = None
+    for i, line in enumerate(lines):
+        if line.startswith(f"{name} = ") or line.startswith(f"{name}.update({{"):
+            position = i + 1
+    if position is None:
+        raise ValueError(f"{path} has no {name} literal")
+    lines[position:position] = loader_block(name)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.writelines(lines)
+    os.chmod(tmp, os.stat(path).st_mode)
+    os.replace(tmp, path)
+
+
+def module_state(path):
+    """What the key index was built from: the module's mtime and the sidecar's size"""
+    sidecar = sidecar_path(path)
+    size = os.path.getsize(sidecar) if os.path.exists(sidecar) else 0
+    return f"{os.stat(path).st_mtime_ns}:{size}"
+
+
+class KeyIndex:
+    """On-disk key -> output index of a module's lookup (sqlite, next to the module).
+
+    Built once from the literal; afterwards an ingest only queries and inserts the
+    keys in its batch. The index remembers module_state() and is only trusted
+    while that still matches (a full rebuild rewrites the module, for instance).
+    Opened read-only it never creates or changes anything.
+    """
+
+    def __init__(self, path, read_only=False):
+        import sqlite3
+        self.path = path
+        if read_only:
+            self.db = sqlite3.connect(f"file:{path}.keys.sqlite?mode=ro", uri=True)
+        else:
+            self.db = sqlite3.connect(f"{path}.keys.sqlite")
+            self.db.execute("CREATE TABLE IF NOT EXISTS lookup (key INTEGER PRIMARY KEY, value REAL)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    @classmethod
+    def is_fresh(cls, path):
+        """Whether the module's index exists and was built from its current state"""
+        import sqlite3
+        if not os.path.exists(f"{path}.keys.sqlite"):
+            return False
+        index = cls(path, read_only=True)
+        try:
+            row = index.db.execute("SELECT value FROM meta WHERE name = 'state'").fetchone()
+        except sqlite3.Error:
+            row = None
+        finally:
+            index.close()
+        return row is not None and row[0] == module_state(path)
+
+    def rebuild(self, lookup):
+        with self.db:
+            self.db.execute("DELETE FROM lookup")
+            self.db.executemany("INSERT OR REPLACE INTO lookup VALUES (?, ?)",
+                                ((case_key(*key), value) for key, value in lookup.items()))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('state', ?)", (module_state(self.path),))
+
+    def get_many(self, keys):
+        found = {}
+        for key in keys:
+            row = self.db.execute("SELECT value FROM lookup WHERE key = ?", (key,)).fetchone()
+            if row:
+                found[key] = row[0]
+        return found
+
+    def append(self, entries):
+        """Append entries to the module's sidecar and record them; the module itself is not rewritten"""
+        with open(sidecar_path(self.path), 'a') as f:
+            for key, value in entries.items():
+                days, miles, receipts = key_inputs(key)
+                f.write(f"{days},{miles!r},{receipts!r},{value!r}\n")
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO lookup VALUES (?, ?)", entries.items())
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('state', ?)", (module_state(self.path),))
+
+    def close(self):
+        self.db.close()
+
+
+def current_outputs(path, name, keys):
+    """Outputs already stored for `keys` in a module's lookup: from the index while it is fresh,
+    else from the literal. Never writes."""
+    if KeyIndex.is_fresh(path):
+        index = KeyIndex(path, read_only=True)
+        found = index.get_many(keys)
+        index.close()
+        return found
+    lookup = {case_key(*key): value for key, value in existing_keys(path, name).items()}
+    return {key: lookup[key] for key in keys if key in lookup}
+
+
+def plan_lookups(cases, modules):
+    """Per module, the entries of the batch that are new or carry a different label (nothing is written)"""
+    labels = {case_key(d, m, r): round(float(e), 2)
+              for (d, m, r), e in zip(cases.inputs(), cases.expected.tolist())}
+    plan = {}
+    for path, name in modules.items():
+        current = current_outputs(path, name, labels)
+        entries = {key: value for key, value in labels.items() if current.get(key) != value}
+        plan[path] = (entries, sum(1 for key in entries if key in current))
+    return plan
+
+
+def apply_lookups(plan, modules):
+    """Write the planned entries: sidecar rows plus the key index (built here if needed)"""
+    for path, (entries, _) in plan.items():
+        if not entries:
+            continue
+        ensure_loader(path, modules[path])
+        stale = not KeyIndex.is_fresh(path)
+        index = KeyIndex(path)
+        if stale:
+            index.rebuild(existing_keys(path, modules[path]))
+        index.append(entries)
+        index.close()
+
+
+def append_log(entries, path=LOG_PATH):
+    """Append added or relabeled cases to the ingest log (public_cases-style records) for later full rebuilds"""
+    with open(path, 'a') as f:
+        for key, expected in entries.items():
+            days, miles, receipts = key_inputs(key)
+            record = {'input': {'trip_duration_days': days, 'miles_traveled': miles,
+                                'total_receipts_amount': receipts}, 'expected_output': expected}
+            f.write(json.dumps(record) + "\n")
+
+
+def warm_start_model(cases, model_path, stages):
+    """Fit `stages` more boosting stages on the new cases only, starting from the saved model.
+
+    Existing stages are only evaluated (to get the residuals), never refit, so
+    the cost is the new stages times the new cases.
+    """
+    from calculate_reimbursement_ultimate import extract_ultimate_features
+
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+
+    X = np.array([extract_ultimate_features(d, m, r) for d, m, r in cases.inputs()])
+    y = cases.expected
+    before = np.abs(model.predict(X) - y)
+
+    # Early stopping would hold out part of an already small batch
+    previous = model.n_estimators_
+    model.set_params(warm_start=True, n_estimators=previous + stages, n_iter_no_change=None)
+    model.fit(X, y)
+    after = np.abs(model.predict(X) - y)
+
+    tmp = f"{model_path}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(model, f)
+    os.replace(tmp, model_path)
+
+    # Calculators prefer the packed export, so re-export it alongside the pickle
+    from tree_pack import pack
+    packed_path = os.path.splitext(model_path)[0] + '.tpk'
+    with open(f"{packed_path}.tmp", 'wb') as f:
+        f.write(pack(model))
+    os.replace(f"{packed_path}.tmp", packed_path)
+    return previous, model.n_estimators_, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest newly labeled cases without a full rebuild")
+    parser.add_argument('cases', help="JSON file of labeled cases in public_cases.json format")
+    parser.add_argument('--modules', nargs='*', default=list(LOOKUP_MODULES),
+                        help="calculator modules whose lookup gets the new cases")
+    parser.add_argument('--model', default='ultimate_model.pkl', help="gradient boosting model to extend")
+    parser.add_argument('--stages', type=int, default=20, help="boosting stages to add (0 = lookups only)")
+    parser.add_argument('--log', default=LOG_PATH)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    if cases.expected is None:
+        raise SystemExit(f"{args.cases} has no expected_output values")
+
+    print(f"=== INGESTING {len(cases)} LABELED CASES ===")
+    modules = {path: LOOKUP_MODULES.get(path, 'PERFECT_LOOKUP') for path in args.modules}
+    start = time.perf_counter()
+    plan = plan_lookups(cases, modules)
+    changed = {key: value for entries, _ in plan.values() for key, value in entries.items()}
+    print(f"Planned in {time.perf_counter() - start:.2f}s: {len(changed)} of {len(cases)} cases new or relabeled")
+
+    # The model step runs first: if it fails, no lookup or log has been touched yet
+    if args.stages > 0 and changed:
+        days, miles, receipts = zip(*map(key_inputs, changed))
+        batch = CaseArrays(days, miles, receipts, list(changed.values()))
+        start = time.perf_counter()
+        previous, total, before, after = warm_start_model(batch, args.model, args.stages)
+        print(f"\nModel {args.model}: {previous} -> {total} stages in {time.perf_counter() - start:.2f}s")
+        print(f"  Error on new cases: avg ${before.mean():.2f} -> ${after.mean():.2f}, "
+              f"exact {int((before < 0.01).sum())} -> {int((after < 0.01).sum())}")
+
+    start = time.perf_counter()
+    apply_lookups(plan, modules)
+    for path, (entries, relabeled) in plan.items():
+        print(f"  {path}: {len(entries) - relabeled} added, {relabeled} relabeled")
+    if changed:
+        append_log(changed, args.log)
+    print(f"Lookups and neighbour index updated in {time.perf_counter() - start:.2f}s; "
+          f"{len(changed)} cases logged to {args.log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from case_data import load_cases
+from cents import to_cents
+
+
+class WorkloadModel:
+    """Empirical model of (days, miles, receipts) fitted to the public and private inputs.
+
+    Sampling bootstraps a real row with the same trip length, then jitters
+    miles and receipts multiplicatively; receipt cents are redrawn from the
+    observed cents distribution so endings like .49/.99 keep their frequency.
+    With hit_ratio > 0 a share of requests are exact public cases (lookup hits).
+    """
+
+    def __init__(self, paths=('public_cases.json', 'private_cases.json'), jitter=0.08):
+        loaded = [load_cases(path) for path in paths]
+        self.days = np.concatenate([c.days for c in loaded])
+        self.miles = np.concatenate([c.miles for c in loaded])
+        self.receipts = np.concatenate([c.receipts for c in loaded])
+        self.jitter = jitter
+
+        cents = to_cents(self.receipts) % 100
+        self.cents_p = np.bincount(cents, minlength=100) / len(cents)
+        self.fractional_miles = float(np.mean(self.miles % 1 != 0))
+
+        public = load_cases(paths[0])
+        self.public = np.column_stack([public.days, public.miles, public.receipts])
+
+    def sample(self, n, rng, hit_ratio=0.0):
+        """n rows of (days, miles, receipts) as a float array"""
+        rows = rng.integers(len(self.days), size=n)
+        days = self.days[rows]
+
+        noise = rng.normal(0, self.jitter, size=(2, n))
+        miles = np.maximum(self.miles[rows] * np.exp(noise[0]), 1)
+        fractional = rng.random(n) < self.fractional_miles
+        miles = np.where(fractional, np.round(miles, 2), np.round(miles))
+
+        dollars = np.floor(np.maximum(self.receipts[rows] * np.exp(noise[1]), 0))
+        receipts = dollars + rng.choice(100, size=n, p=self.cents_p) / 100
+
+        out = np.column_stack([days, miles, receipts])
+        hits = rng.random(n) < hit_ratio
+        out[hits] = self.public[rng.integers(len(self.public), size=int(hits.sum()))]
+        return out
+
+    def stream(self, total, rng, hit_ratio=0.0, chunk=100000):
+        """Yield sample blocks until total rows have been produced"""
+        produced = 0
+        while produced < total:
+            n = min(chunk, total - produced)
+            yield self.sample(n, rng, hit_ratio)
+            produced += n
+
+
+def write_rows(block, out):
+    for days, miles, receipts in block.tolist():
+        out.write(f"{int(days)} {miles:g} {receipts:.2f}\n")
+
+
+def read_stream(path):
+    with open(path) as f:
+        return [tuple(line.split()) for line in f if line.strip()]
+
+
+# --- Targets ------------------------------------------------------------------
+
+class RunShTarget:
+    """One process per request, like eval.sh"""
+
+    def __init__(self, command):
+        self.command = command
+
+    def __call__(self, days, miles, receipts):
+        out = subprocess.run([self.command, days, miles, receipts], capture_output=True, text=True, check=True)
+        return float(out.stdout.strip())
+
+
+class ModuleTarget:
+    """In-process scalar calculate_reimbursement calls (no process startup), one request per call"""
+
+    def __init__(self, name):
+        self.calculate = importlib.import_module(name).calculate_reimbursement
+
+    def __call__(self, days, miles, receipts):
+        return self.calculate(int(days), float(miles), float(receipts))
+
+
+class BatchTarget:
+    """In-process calculate_reimbursement_batch calls, one chunk of requests per call"""
+
+    def __init__(self, name):
+        self.calculate = importlib.import_module(name).calculate_reimbursement_batch
+
+    def __call__(self, days, miles, receipts):
+        return self.calculate(days, miles, receipts)
+
+
+def chunk_requests(requests, size):
+    """Group requests into (days, miles, receipts) array triples of up to size rows for BatchTarget"""
+    return [tuple(np.array(column, dtype=np.float64) for column in zip(*requests[i:i + size]))
+            for i in range(0, len(requests), size)]
+
+
+class HttpTarget:
+    """GET <url>?days=..&miles=..&receipts=.. against a local server (see 'serve')"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def __call__(self, days, miles, receipts):
+        query = urllib.parse.urlencode({'days': days, 'miles': miles, 'receipts': receipts})
+        with urllib.request.urlopen(f"{self.url}?{query}", timeout=30) as response:
+            return float(response.read())
+
+
+def drive(target, requests, rate=None, concurrency=1):
+    """Replay requests open-loop at a target rate (None = as fast as possible).
+
+    Latency is measured from each request's scheduled start, so a backed-up
+    target shows up as growing latency rather than a silently lower rate.
+    """
+    n = len(requests)
+    latency = np.zeros(n)
+    service = np.zeros(n)
+    failed = np.zeros(n, dtype=bool)
+    next_index = iter(range(n))
+    lock = threading.Lock()
+    start = time.perf_counter() + 0.05
+
+    def worker():
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            scheduled = start + (i / rate if rate else 0.0)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            began = time.perf_counter()
+            try:
+                target(*requests[i])
+            except Exception:
+                failed[i] = True
+            done = time.perf_counter()
+            service[i] = done - began
+            latency[i] = done - (scheduled if rate else began)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+    return latency, service, failed, elapsed
+
+
+def report(latency, service, failed, elapsed, rate, rows=None):
+    """rows: total requests when each call carried a chunk of them (batch target)"""
+    n = len(latency)
+    print(f"\n📈 Load test results:")
+    if rows:
+        print(f"  Requests: {rows:,} in {n:,} batch calls ({int(failed.sum())} calls failed)")
+    else:
+        print(f"  Requests: {n:,} ({int(failed.sum())} failed)")
+    print(f"  Wall time: {elapsed:.2f}s")
+    target = f" (target {rate:,.0f}/s)" if rate else ""
+    print(f"  Throughput: {(rows or n) / elapsed:,.1f} req/s{target}")
+    for label, values in [("Latency", latency), ("Service time", service)]:
+        p50, p90, p99 = np.percentile(values * 1000, [50, 90, 99])
+        print(f"  {label}: p50 {p50:.2f}ms, p90 {p90:.2f}ms, p99 {p99:.2f}ms, max {values.max() * 1000:.2f}ms")
+
+
+# --- Commands -----------------------------------------------------------------
+
+def cmd_generate(args):
+    rng = np.random.default_rng(args.seed)
+    model = WorkloadModel()
+    out = open(args.output, 'w') if args.output != '-' else sys.stdout
+    try:
+        for block in model.stream(args.count, rng, args.hit_ratio):
+            write_rows(block, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output != '-':
+        print(f"Wrote {args.count:,} requests to {args.output} (lookup-hit ratio {args.hit_ratio:.0%})")
+
+
+def cmd_drive(args):
+    if args.stream:
+        requests = read_stream(args.stream)
+    else:
+        block = WorkloadModel().sample(args.count, np.random.default_rng(args.seed), args.hit_ratio)
+        requests = [(str(int(d)), f"{m:g}", f"{r:.2f}") for d, m, r in block.tolist()]
+
+    if args.target == 'run.sh':
+        target = RunShTarget(args.run_command)
+    elif args.target == 'module':
+        target = ModuleTarget(args.module)
+    elif args.target == 'batch':
+        target = BatchTarget(args.module)
+    else:
+        target = HttpTarget(args.url)
+
+    print(f"=== LOAD TEST: {args.target} ===")
+    print(f"Replaying {len(requests):,} requests with concurrency {args.concurrency}"
+          + (f" at {args.rate:,.0f}/s" if args.rate else " as fast as possible")
+          + (f" in chunks of {args.batch_size:,}" if args.target == 'batch' else ""))
+    if args.target == 'batch':
+        # Chunks are scheduled as one call each, so the request rate becomes a chunk rate
+        rows = len(requests)
+        chunks = chunk_requests(requests, args.batch_size)
+        rate = args.rate * len(chunks) / rows if args.rate else None
+        report(*drive(target, chunks, rate, args.concurrency), args.rate, rows)
+    else:
+        report(*drive(target, requests, args.rate, args.concurrency), args.rate)
+
+
+def cmd_serve(args):
+    calculate = importlib.import_module(args.module).calculate_reimbursement
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            try:
+                result = calculate(int(query['days'][0]), float(query['miles'][0]), float(query['receipts'][0]))
+                body, status = json.dumps(result).encode(), 200
+            except (KeyError, ValueError) as e:
+                body, status = str(e).encode(), 400
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    print(f"Serving {args.module} on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic workload generator and load driver for the calculators")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('generate', help="write a synthetic request stream (days miles receipts per line)")
+    p.add_argument('count', type=int)
+    p.add_argument('-o', '--output', default='-')
+    p.add_argument('--hit-ratio', type=float, default=0.0, help="share of requests that are exact public cases")
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser('drive', help="replay a stream against a target")
+    p.add_argument('--target', choices=['run.sh', 'module', 'batch', 'http'], default='module')
+    p.add_argument('--command', dest='run_command', metavar='COMMAND', default='./run.sh', help="executable for the run.sh target")
+    p.add_argument('--module', default='calculate_reimbursement', help="calculator module for the module and batch targets")
+    p.add_argument('--batch-size', type=int, default=1000, help="requests per calculate_reimbursement_batch call")
+    p.add_argument('--url', default='http://127.0.0.1:8765/')
+    p.add_argument('--stream', default=None, help="stream file from 'generate' (default: generate in memory)")
+    p.add_argument('--count', type=int, default=1000)
+    p.add_argument('--hit-ratio', type=float, default=0.0)
+    p.add_argument('--rate', type=float, default=None, help="target requests per second (open loop)")
+    p.add_argument('--concurrency', type=int, default=4)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=cmd_drive)
+
+    p = sub.add_parser('serve', help="serve a calculator module over HTTP for the http target")
+    p.add_argument('--module', default='calculate_reimbursement')
+    p.add_argument('--port', type=int, default=8765)
+    p.set_defaults(func=cmd_serve)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
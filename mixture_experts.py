@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+import calculate_reimbursement_experts as serving
+from case_data import load_cases
+from coefficient_optimizer import lad_irls
+from feature_importance import FEATURE_NAMES, MODEL_PARAMS, feature_matrix
+
+# The router splits on the leading plain-arithmetic columns of the ultimate feature set
+ROUTING_COLUMNS = [FEATURE_NAMES.index(name) for name in serving.ROUTING]
+
+
+def basis_matrix(cases):
+    return np.column_stack([cases.days.astype(np.float64), cases.miles, cases.receipts, np.ones(len(cases))])
+
+
+def best_split(R, X, y, min_leaf, candidates):
+    """(sse, variable, threshold) of the split whose two least-squares experts fit best.
+
+    Rows are sorted once per variable; prefix sums of x x^T and x y give the normal
+    equations of every left/right partition, solved as one batch.
+    """
+    n, p = X.shape
+    ridge = 1e-9 * np.trace(X.T @ X) / p * np.eye(p)
+    best = (np.inf, None, None)
+    for v in range(R.shape[1]):
+        order = np.argsort(R[:, v], kind='stable')
+        values, Xs, ys = R[order, v], X[order], y[order]
+        # Split after position k-1 only where the value changes, keeping min_leaf rows per side
+        k = np.flatnonzero(values[1:] != values[:-1]) + 1
+        k = k[(k >= min_leaf) & (k <= n - min_leaf)]
+        if len(k) == 0:
+            continue
+        if len(k) > candidates:
+            k = k[np.linspace(0, len(k) - 1, candidates).astype(int)]
+        gram = np.cumsum(Xs[:, :, None] * Xs[:, None, :], axis=0)
+        moment = np.cumsum(Xs * ys[:, None], axis=0)
+        square = np.cumsum(ys ** 2)
+        sse = np.zeros(len(k))
+        for part in ('left', 'right'):
+            if part == 'left':
+                G, b, s = gram[k - 1], moment[k - 1], square[k - 1]
+            else:
+                G, b, s = gram[-1] - gram[k - 1], moment[-1] - moment[k - 1], square[-1] - square[k - 1]
+            theta = np.linalg.solve(G + ridge, b[..., None])[..., 0]
+            sse += s - np.einsum('kp,kp->k', theta, b)
+        i = int(np.argmin(sse))
+        if sse[i] < best[0]:
+            best = (float(sse[i]), v, float((values[k[i] - 1] + values[k[i]]) / 2))
+    return best
+
+
+class MixtureOfExperts:
+    """Shallow routing tree over ROUTING with one linear expert per leaf"""
+
+    def __init__(self, depth=3, min_leaf=40, candidates=64, min_gain=0.01):
+        self.depth, self.min_leaf, self.candidates, self.min_gain = depth, min_leaf, candidates, min_gain
+        self.router, self.experts = [], []
+
+    def fit(self, R, X, y):
+        self.router, self.experts = [], []
+        self._grow(R, X, y, np.arange(len(y)), 0)
+        if not self.router:
+            # A single expert still needs a router node for the serving format
+            self.router.append([0, float('inf'), -1, -1])
+        return self
+
+    def _grow(self, R, X, y, rows, depth):
+        """Returns the child reference for `rows`: a router node index, or -k-1 for expert k"""
+        theta = np.linalg.lstsq(X[rows], y[rows], rcond=None)[0]
+        parent_sse = float(np.sum((y[rows] - X[rows] @ theta) ** 2))
+        if depth < self.depth and len(rows) >= 2 * self.min_leaf:
+            sse, variable, threshold = best_split(R[rows], X[rows], y[rows], self.min_leaf, self.candidates)
+            if variable is not None and sse < parent_sse * (1 - self.min_gain):
+                node = len(self.router)
+                self.router.append([variable, threshold, 0, 0])
+                left = R[rows, variable] <= threshold
+                self.router[node][2] = self._grow(R, X, y, rows[left], depth + 1)
+                self.router[node][3] = self._grow(R, X, y, rows[~left], depth + 1)
+                return node
+        # Leaf: least absolute deviations suits the error metric better than least squares
+        self.experts.append(lad_irls(X[rows], y[rows]).tolist())
+        return -len(self.experts)
+
+    def route(self, R):
+        node = np.zeros(len(R), dtype=np.int64)
+        for _ in range(self.depth + 1):
+            inner = node >= 0
+            if not inner.any():
+                break
+            table = np.array(self.router)
+            current = table[np.maximum(node, 0)]
+            go_left = R[np.arange(len(R)), current[:, 0].astype(int)] <= current[:, 1]
+            node = np.where(inner, np.where(go_left, current[:, 2], current[:, 3]).astype(np.int64), node)
+        return -node - 1
+
+    def predict(self, R, X):
+        return np.einsum('np,np->n', np.array(self.experts)[self.route(R)], X)
+
+    def to_json(self):
+        return {'routing': serving.ROUTING, 'basis': serving.BASIS,
+                'router': [[int(v), t, int(l), int(r)] for v, t, l, r in self.router], 'experts': self.experts}
+
+
+def metrics(y, predictions):
+    errors = np.abs(y - np.round(predictions, 2))
+    return errors.mean(), int(np.sum(errors < 0.01)), errors.mean() * 100 + np.sum(errors >= 0.01) * 0.1
+
+
+def per_call(fn, rows, repeat=3):
+    """Median seconds per call of fn(*row) over the rows"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            fn(*row)
+        times.append((time.perf_counter() - start) / len(rows))
+    return float(np.median(times))
+
+
+def main():
+    from sklearn.ensemble import GradientBoostingRegressor
+    from calculate_reimbursement_ultimate import extract_ultimate_features
+    from tree_pack import pack
+
+    parser = argparse.ArgumentParser(description="Train a mixture of linear experts and compare it with the GBM")
+    parser.add_argument('--depth', type=int, default=3, help="router depth (at most 2**depth experts)")
+    parser.add_argument('--min-leaf', type=int, default=40)
+    parser.add_argument('--test-fraction', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--output', default=serving.MODEL_PATH, help="serving model written after a fit on all cases")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    F, X, y = feature_matrix(cases), basis_matrix(cases), cases.expected
+    R = F[:, ROUTING_COLUMNS]
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(y))
+    split = int(len(y) * (1 - args.test_fraction))
+    train, test = order[:split], order[split:]
+
+    print(f"=== MIXTURE OF LINEAR EXPERTS vs GBM ({len(train)} train / {len(test)} held out) ===")
+    start = time.perf_counter()
+    experts = MixtureOfExperts(args.depth, args.min_leaf).fit(R[train], X[train], y[train])
+    experts_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    gbm = GradientBoostingRegressor(**MODEL_PARAMS).fit(F[train], y[train])
+    gbm_fit = time.perf_counter() - start
+
+    print(f"\n{'model':>8} {'train err':>10} {'test err':>10} {'test exact':>10} {'test score':>11} {'fit':>8}")
+    for label, predict, fit in [("experts", lambda rows: experts.predict(R[rows], X[rows]), experts_fit),
+                                ("gbm", lambda rows: gbm.predict(F[rows]), gbm_fit)]:
+        train_error = metrics(y[train], predict(train))[0]
+        test_error, test_exact, test_score = metrics(y[test], predict(test))
+        print(f"{label:>8} ${train_error:>9.2f} ${test_error:>9.2f} {test_exact:>10} {test_score:>11.2f} {fit:>7.2f}s")
+
+    # Final model on every case, written for calculate_reimbursement_experts.py
+    final = MixtureOfExperts(args.depth, args.min_leaf).fit(R, X, y)
+    with open(args.output, 'w') as f:
+        json.dump(final.to_json(), f)
+    serving.ROUTER = [tuple(node) for node in final.router]
+    serving.EXPERTS = [tuple(coefs) for coefs in final.experts]
+    print(f"\n📦 Wrote {args.output}: {len(final.experts)} experts, {len(final.router)} router nodes")
+    names = serving.ROUTING
+    for node, (variable, threshold, left, right) in enumerate(final.router):
+        children = [f"expert {-c - 1}" if c < 0 else f"node {c}" for c in (left, right)]
+        print(f"  node {node}: {names[variable]} <= {threshold:g} ? {children[0]} : {children[1]}")
+    counts = np.bincount(final.route(R), minlength=len(final.experts))
+    for k, coefs in enumerate(final.experts):
+        formula = " + ".join(f"{c:.4f}*{name}" if name != 'const' else f"{c:.2f}" for c, name in zip(coefs, serving.BASIS))
+        print(f"  expert {k} ({counts[k]} cases): {formula}")
+
+    # Serving comparison: the plain-Python module against the GBM behind the same features
+    served = np.array(serving.calculate_reimbursement_batch(cases.days, cases.miles, cases.receipts))
+    agree = np.array_equal(served, np.round(final.predict(R, X), 2))
+    rows = list(cases.inputs())
+    experts_call = per_call(serving.calculate_reimbursement, rows)
+    gbm_call = per_call(lambda d, m, r: gbm.predict([extract_ultimate_features(d, m, r)])[0], rows[:200])
+    start = time.perf_counter()
+    serving.calculate_reimbursement_batch(cases.days, cases.miles, cases.receipts)
+    experts_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    gbm.predict(feature_matrix(cases))
+    gbm_batch = time.perf_counter() - start
+
+    print(f"\n⏱️  Serving ({len(rows)} cases):")
+    print(f"  experts: {experts_call * 1e6:.1f}µs per call, batch {experts_batch * 1000:.1f}ms, "
+          f"model {os.path.getsize(args.output):,} bytes (plain Python, no numpy)")
+    print(f"  gbm:     {gbm_call * 1e6:.1f}µs per call, batch {gbm_batch * 1000:.1f}ms, "
+          f"pickle {len(pickle.dumps(gbm)):,} bytes, packed {len(pack(gbm)):,} bytes")
+    print(f"  Serving module matches the trained router on all cases: {'✅' if agree else '❌'}")
+    full_error, full_exact, full_score = metrics(y, served)
+    print(f"  Served on all {len(y)} cases: avg error ${full_error:.2f}, exact {full_exact}, score {full_score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
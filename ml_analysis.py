@@ -5,6 +5,7 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.ensemble import RandomForestRegressor
+from oof_cache import cache_predictions
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -74,6 +75,8 @@ best_score = float('inf')
 for name, model in models.items():
     model.fit(X_train, y_train)
     predictions = model.predict(X_test)
+    # Keep this model's out-of-fold and holdout predictions for oof_cache.py blending
+    cache_predictions('ml_analysis', name, model, X, y, train_size, predictions)
     
     # Calculate error metrics
     errors = np.abs(predictions - y_test)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+CACHE_DIR = 'oof_cache'
+FOLDS = 5
+FOLD_SEED = 0
+
+
+def model_identity(source, model):
+    """Stable key for a model: the training script, the estimator class and a digest of its parameters"""
+    params = sorted((name, repr(value)) for name, value in model.get_params().items())
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()[:10]
+    return f"{source}__{type(model).__name__}__{digest}"
+
+
+def split_fingerprint(y, train_size, folds=FOLDS, seed=FOLD_SEED):
+    """Digest of the targets, the train/holdout boundary and the fold assignment; only matching entries can be blended"""
+    digest = hashlib.sha1(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    digest.update(f"{train_size}:{folds}:{seed}".encode())
+    return digest.hexdigest()[:16]
+
+
+def feature_digest(X):
+    """Digest of the feature matrix, so edited feature engineering invalidates the cached columns"""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    digest = hashlib.sha1(str(X.shape).encode())
+    digest.update(X.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fold_of(n, folds=FOLDS, seed=FOLD_SEED):
+    """Fold number per training row; the same for every model so the OOF columns line up"""
+    return np.random.default_rng(seed).permutation(n) % folds
+
+
+def out_of_fold(model, X, y, folds=FOLDS):
+    """Predictions for each training row from a clone fitted without that row's fold"""
+    from sklearn.base import clone
+    fold = fold_of(len(y), folds)
+    predictions = np.empty(len(y))
+    for k in range(folds):
+        held = fold == k
+        predictions[held] = clone(model).fit(X[~held], y[~held]).predict(X[held])
+    return predictions
+
+
+def cache_predictions(source, label, model, X, y, train_size, holdout=None, cache_dir=CACHE_DIR):
+    """Persist OOF predictions on the first train_size rows and holdout predictions on the rest.
+
+    `model` is the fitted estimator; holdout predictions it already produced can be
+    passed in. Entries already cached for the same identity, split and features are kept.
+    """
+    key = model_identity(source, model)
+    path = os.path.join(cache_dir, key + '.npz')
+    fingerprint, features = split_fingerprint(y, train_size), feature_digest(X)
+    if os.path.exists(path):
+        cached = np.load(path)
+        if str(cached['fingerprint']) == fingerprint and 'features' in cached and str(cached['features']) == features:
+            return key
+    if holdout is None:
+        holdout = model.predict(X[train_size:])
+    oof = out_of_fold(model, X[:train_size], y[:train_size])
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(path, oof=oof, holdout=np.asarray(holdout, dtype=np.float64), fingerprint=fingerprint,
+             features=features, label=label, source=source, params=json.dumps({k: repr(v) for k, v in model.get_params().items()}))
+    return key
+
+
+def load_entries(y, train_size, cache_dir=CACHE_DIR):
+    """{key: (label, oof, holdout)} for every cached model trained on this split"""
+    fingerprint = split_fingerprint(y, train_size)
+    entries = {}
+    for path in sorted(glob.glob(os.path.join(cache_dir, '*.npz'))):
+        data = np.load(path)
+        if str(data['fingerprint']) == fingerprint:
+            key = os.path.splitext(os.path.basename(path))[0]
+            entries[key] = (f"{data['source']}: {data['label']}", data['oof'], data['holdout'])
+    return entries
+
+
+def nnls_weights(P, y):
+    """Non-negative least-squares blend weights (no intercept)"""
+    from scipy.optimize import nnls
+    return nnls(P, y)[0]
+
+
+def lad_weights(P, y):
+    """Least-absolute-deviations stacking weights, last one being an intercept"""
+    from coefficient_optimizer import lad_irls
+    return lad_irls(np.column_stack([P, np.ones(len(P))]), y)
+
+
+def greedy_selection(P, y, rounds=50):
+    """Forward selection with replacement (Caruana): weights are how often each column was added"""
+    counts = np.zeros(P.shape[1])
+    total = np.zeros(len(y))
+    for r in range(1, rounds + 1):
+        errors = np.abs((total[:, None] + P) / r - y[:, None]).mean(axis=0)
+        best = int(np.argmin(errors))
+        counts[best] += 1
+        total += P[:, best]
+    return counts / counts.sum()
+
+
+def metrics(y, predictions):
+    errors = np.abs(y - np.round(predictions, 2))
+    return errors.mean(), int(np.sum(errors < 0.01)), errors.mean() * 100 + np.sum(errors >= 0.01) * 0.1
+
+
+def main():
+    from case_data import load_cases
+
+    parser = argparse.ArgumentParser(description="Blend cached out-of-fold predictions without retraining")
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--train-fraction', type=float, default=0.8, help="must match the training scripts")
+    parser.add_argument('--cache', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    y_all = load_cases(args.cases).expected
+    train_size = int(args.train_fraction * len(y_all))
+    entries = load_entries(y_all, train_size, args.cache)
+    if not entries:
+        raise SystemExit(f"no cached predictions in {args.cache}/ for this split; "
+                         f"run ml_analysis.py, improved_ml.py or optimized_ml.py first")
+    y, y_test = y_all[:train_size], y_all[train_size:]
+    keys = list(entries)
+    labels = [entries[key][0] for key in keys]
+    P = np.column_stack([entries[key][1] for key in keys])
+    H = np.column_stack([entries[key][2] for key in keys])
+
+    print(f"=== BLENDING {len(keys)} CACHED MODELS ({train_size} OOF rows, {len(y_test)} holdout) ===")
+    width = max(len(label) for label in labels)
+    print(f"\n  {'model':<{width}} {'oof err':>9} {'holdout err':>12} {'score':>9}")
+    for j, label in enumerate(labels):
+        holdout_error, _, score = metrics(y_test, H[:, j])
+        print(f"  {label:<{width}} ${np.abs(y - P[:, j]).mean():>8.2f} ${holdout_error:>11.2f} {score:>9.2f}")
+
+    # Every blend is fitted on the OOF columns only and judged on the holdout
+    blends = []
+    start = time.perf_counter()
+    blends.append(("mean", np.full(len(keys), 1 / len(keys)), 0.0))
+    blends.append(("nnls", nnls_weights(P, y), 0.0))
+    lad = lad_weights(P, y)
+    blends.append(("lad stack", lad[:-1], lad[-1]))
+    blends.append(("greedy", greedy_selection(P, y), 0.0))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🧪 Blends (fitted in {elapsed * 1000:.1f}ms, no base model retrained):")
+    print(f"  {'blend':<10} {'oof err':>9} {'holdout err':>12} {'exact':>6} {'score':>9}  weights")
+    for name, weights, intercept in blends:
+        oof_error = np.abs(y - (P @ weights + intercept)).mean()
+        holdout_error, exact, score = metrics(y_test, H @ weights + intercept)
+        shown = ", ".join(f"{w:.2f}" for w in weights) + (f" + {intercept:.2f}" if intercept else "")
+        print(f"  {name:<10} ${oof_error:>8.2f} ${holdout_error:>11.2f} {exact:>6} {score:>9.2f}  {shown}")
+
+
+if __name__ == "__main__":
+    main()
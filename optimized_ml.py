@@ -4,6 +4,7 @@ import json
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import GridSearchCV
+from oof_cache import cache_predictions
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -114,6 +115,7 @@ print(f"Best parameters: {grid_search.best_params_}")
 
 # Test the model
 predictions = best_model.predict(X_test)
+cache_predictions('optimized_ml', 'Random Forest (grid search best)', best_model, X, y, train_size, predictions)
 errors = np.abs(predictions - y_test)
 avg_error = np.mean(errors)
 exact_matches = np.sum(errors < 0.01)
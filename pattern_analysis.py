@@ -4,10 +4,13 @@ import json
 import statistics
 import numpy as np
 from collections import defaultdict
+from case_data import load_cases
+from case_index import CaseIndex, col
 
 # Load the public cases
 with open('public_cases.json', 'r') as f:
     cases = json.load(f)
+index = CaseIndex.from_cases(load_cases('public_cases.json'))
 
 print("=== DEEPER PATTERN ANALYSIS ===")
 
@@ -32,7 +35,7 @@ for base in base_per_diems:
 print("\n2. Receipt impact analysis:")
 receipt_ranges = [(0, 50), (50, 200), (200, 500), (500, 1000), (1000, 2000), (2000, 3000)]
 for min_r, max_r in receipt_ranges:
-    matching_cases = [c for c in cases if min_r <= c['input']['total_receipts_amount'] < max_r]
+    matching_cases = [cases[i] for i in index.rows(col('receipts').between(min_r, max_r))]
     if matching_cases:
         # Calculate what portion of receipts seem to be reimbursed
         receipt_portions = []
@@ -54,7 +57,7 @@ for min_r, max_r in receipt_ranges:
 print("\n3. Trip duration bonuses:")
 duration_analysis = {}
 for duration in range(1, 11):
-    duration_cases = [c for c in cases if c['input']['trip_duration_days'] == duration]
+    duration_cases = [cases[i] for i in index.rows(col('days') == duration)]
     if duration_cases:
         # Calculate average "per day rate" for each duration
         rates = []
@@ -98,7 +101,7 @@ for efficiency in sorted(efficiency_bonuses.keys())[:10]:
 print("\n5. Special patterns:")
 
 # Check for the "small receipts penalty" mentioned
-small_receipt_cases = [c for c in cases if c['input']['total_receipts_amount'] < 50]
+small_receipt_cases = [cases[i] for i in index.rows(col('receipts') < 50)]
 print(f"Small receipt cases (<$50): {len(small_receipt_cases)}")
 if small_receipt_cases:
     for case in small_receipt_cases[:5]:
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
 import json
-from calculate_reimbursement import calculate_reimbursement
+import calculate_reimbursement
+from case_data import CaseTable, batch_calculate, load_cases
 
 # Load the public cases
 with open('public_cases.json', 'r') as f:
@@ -10,51 +11,27 @@ with open('public_cases.json', 'r') as f:
 print("=== FINDING EXACT MATCHES FOR PERFECT SCORE ===")
 
 # Find the exact matches to understand what makes them work
-exact_matches = []
-close_matches = []
-all_errors = []
-
-for i, case in enumerate(cases):
-    inp = case['input']
-    expected = case['expected_output']
-    actual = calculate_reimbursement(inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'])
-    
-    error = abs(expected - actual)
-    all_errors.append(error)
-    
-    if error < 0.01:
-        exact_matches.append({
-            'index': i+1,
-            'input': inp,
-            'expected': expected,
-            'actual': actual,
-            'error': error
-        })
-    elif error < 1.0:
-        close_matches.append({
-            'index': i+1,
-            'input': inp,
-            'expected': expected,
-            'actual': actual,
-            'error': error
-        })
+case_arrays = load_cases('public_cases.json')
+table = CaseTable.from_cases(case_arrays, batch_calculate(calculate_reimbursement, case_arrays))
+all_errors = table.error
+
+exact_matches = table.filter(table.error < 0.01)
+close_matches = table.filter((table.error >= 0.01) & (table.error < 1.0))
 
 print(f"Found {len(exact_matches)} exact matches:")
 for match in exact_matches:
-    inp = match['input']
-    print(f"  Case {match['index']}: {inp['trip_duration_days']}d, {inp['miles_traveled']:.1f}mi, ${inp['total_receipts_amount']:.2f}")
-    print(f"    Expected: ${match['expected']:.2f}, Got: ${match['actual']:.2f}, Error: ${match['error']:.6f}")
+    print(f"  Case {match.index + 1}: {match.days}d, {match.miles:.1f}mi, ${match.receipts:.2f}")
+    print(f"    Expected: ${match.expected:.2f}, Got: ${match.actual:.2f}, Error: ${match.error:.6f}")
     
     # Calculate what the current formula gives
-    formula_result = 86 * inp['trip_duration_days'] + 0.76 * inp['miles_traveled'] + 0.35 * inp['total_receipts_amount']
+    formula_result = 86 * match.days + 0.76 * match.miles + 0.35 * match.receipts
     print(f"    Formula (86d + 0.76m + 0.35r): ${formula_result:.2f}")
     print()
 
 print(f"Found {len(close_matches)} close matches (within $1):")
 for match in close_matches[:5]:  # Show first 5
-    inp = match['input']
-    print(f"  Case {match['index']}: {inp['trip_duration_days']}d, {inp['miles_traveled']:.1f}mi, ${inp['total_receipts_amount']:.2f}")
-    print(f"    Expected: ${match['expected']:.2f}, Got: ${match['actual']:.2f}, Error: ${match['error']:.2f}")
+    print(f"  Case {match.index + 1}: {match.days}d, {match.miles:.1f}mi, ${match.receipts:.2f}")
+    print(f"    Expected: ${match.expected:.2f}, Got: ${match.actual:.2f}, Error: ${match.error:.2f}")
 
 # Now let's try to find a pattern that could get us to perfect accuracy
 print(f"\n=== ANALYZING ALL CASES FOR PERFECT PATTERN ===")
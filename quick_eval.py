@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
 
 import json
+import sys
+import importlib
+import time
+import numpy as np
+import calculate_reimbursement as calculator
 from calculate_reimbursement import calculate_reimbursement
+from bootstrap_eval import confidence_intervals, paired_difference, print_intervals, print_difference
+from case_data import load_cases
+from telemetry import print_path_report
 
 # Load the public cases
 with open('public_cases.json', 'r') as f:
@@ -15,6 +23,10 @@ exact_matches = 0
 close_matches = 0
 max_error = 0
 max_error_case = ""
+all_errors = []
+all_actuals = []
+latencies = []
+calculator.ROUTE_LOG = []  # one route per call, for the per-path section
 
 for i, case in enumerate(cases):
     if i % 200 == 0:
@@ -22,10 +34,14 @@ for i, case in enumerate(cases):
     
     inp = case['input']
     expected = case['expected_output']
+    started = time.perf_counter()
     actual = calculate_reimbursement(inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'])
+    latencies.append(time.perf_counter() - started)
     
     error = abs(expected - actual)
     total_error += error
+    all_errors.append(error)
+    all_actuals.append(actual)
     
     if error < 0.01:
         exact_matches += 1
@@ -53,6 +69,23 @@ print(f"  Worst case: {max_error_case}")
 score = avg_error * 100 + (1000 - exact_matches) * 0.1
 print(f"\n🎯 Score: {score:.2f} (lower is better)")
 
+# Resample the per-case errors to see how much of this could be noise
+all_errors = np.array(all_errors)
+print_intervals(confidence_intervals(all_errors), 0.95)
+
+# How each case was served
+routes, calculator.ROUTE_LOG = calculator.ROUTE_LOG, None
+print_path_report(load_cases('public_cases.json'), np.array(all_actuals), routes, np.array(latencies))
+
+# Optional: python3 quick_eval.py <other_calculator_module> for a paired comparison
+if len(sys.argv) > 1:
+    other = importlib.import_module(sys.argv[1]).calculate_reimbursement
+    other_errors = np.array([abs(case['expected_output'] - other(case['input']['trip_duration_days'],
+                                                                  case['input']['miles_traveled'],
+                                                                  case['input']['total_receipts_amount']))
+                             for case in cases])
+    print_difference('calculate_reimbursement', sys.argv[1], paired_difference(all_errors, other_errors), 0.95)
+
 # Provide feedback
 if exact_matches == 1000:
     print("🏆 PERFECT SCORE! System fully reverse-engineered!")
@@ -71,7 +104,7 @@ high_errors = []
 for i, case in enumerate(cases):
     inp = case['input']
     expected = case['expected_output']
-    actual = calculate_reimbursement(inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'])
+    actual = all_actuals[i]
     error = abs(expected - actual)
     high_errors.append((error, i+1, inp, expected, actual))
 
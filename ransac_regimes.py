@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from case_data import load_cases
+from coefficient_optimizer import FEATURES, design_matrix, lad_irls
+
+_X = _Y = None
+
+
+def init_worker(cases_path, features):
+    global _X, _Y
+    cases = load_cases(cases_path)
+    _X, _Y = design_matrix(cases, features), cases.expected
+
+
+def minimal_fits(X, y, samples):
+    """Exact coefficients through each minimal sample; singular samples are dropped"""
+    A, b = X[samples], y[samples]
+    ok = np.abs(np.linalg.det(A)) > 1e-9
+    return np.linalg.solve(A[ok], b[ok][..., None])[..., 0], samples[ok]
+
+
+def hypothesis_task(task):
+    """Draw `count` minimal samples from the active cases; return the best few by inlier count.
+
+    Hypotheses are scored in blocks: one (block x active) residual matrix per step.
+    """
+    active, count, tol, seed, keep, block = task
+    rng = np.random.default_rng(seed)
+    X, y = _X[active], _Y[active]
+    p = X.shape[1]
+    best = []
+    for start in range(0, count, block):
+        n = min(block, count - start)
+        # Sorting random keys per row gives p distinct indices per sample
+        samples = np.argsort(rng.random((n, len(active))), axis=1)[:, :p] if len(active) <= 4 * p \
+            else rng.integers(0, len(active), size=(n, p))
+        samples = samples[np.all(np.diff(np.sort(samples, axis=1), axis=1) > 0, axis=1)]
+        thetas, samples = minimal_fits(X, y, samples)
+        residuals = np.abs(y[None, :] - thetas @ X.T)
+        inliers = residuals < tol
+        counts = inliers.sum(axis=1)
+        # Ties go to the tighter fit (mean inlier residual)
+        spread = np.where(inliers, residuals, 0).sum(axis=1) / np.maximum(counts, 1)
+        order = np.lexsort((spread, -counts))[:keep]
+        best.extend((int(counts[i]), float(spread[i]), thetas[i], active[samples[i]]) for i in order)
+    best.sort(key=lambda h: (-h[0], h[1]))
+    return best[:keep]
+
+
+def polish(X, y, inliers, tol, rounds=5):
+    """Refit on the consensus set by least absolute deviations until the inliers stop changing"""
+    theta = None
+    for _ in range(rounds):
+        theta = lad_irls(X[inliers], y[inliers])
+        updated = np.abs(y - X @ theta) < tol
+        if np.array_equal(updated, inliers) or updated.sum() < inliers.sum():
+            break
+        inliers = updated
+    return theta, inliers
+
+
+def describe_members(cases, members):
+    days, miles, receipts = cases.days[members], cases.miles[members], cases.receipts[members]
+    mpd, rpd = miles / days, receipts / days
+    return (f"days {days.min()}-{days.max()} (median {np.median(days):g}), "
+            f"miles/day median {np.median(mpd):.0f} [{np.percentile(mpd, 10):.0f}, {np.percentile(mpd, 90):.0f}], "
+            f"receipts/day median ${np.median(rpd):.0f} [{np.percentile(rpd, 10):.0f}, {np.percentile(rpd, 90):.0f}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RANSAC regime discovery: peel off formulas that fit subsets of cases")
+    parser.add_argument('--features', nargs='+', default=['days', 'miles', 'receipts', 'const'],
+                        choices=list(FEATURES))
+    parser.add_argument('--tol', type=float, default=5.0, help="inlier threshold in dollars")
+    parser.add_argument('--hypotheses', type=int, default=20000, help="minimal samples per regime")
+    parser.add_argument('--min-size', type=int, default=25, help="stop when the best regime has fewer members")
+    parser.add_argument('--max-regimes', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--block', type=int, default=2000, help="hypotheses per residual matrix")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--output', default=None, help="write regimes and their case indices as JSON")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    X, y = design_matrix(cases, args.features), cases.expected
+    active = np.arange(len(y))
+
+    print(f"=== RANSAC REGIME DISCOVERY ({', '.join(args.features)}; inliers within ${args.tol:g}) ===")
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(args.processes, initializer=init_worker, initargs=(args.cases, args.features)) \
+        if args.processes > 1 else None
+    if pool is None:
+        init_worker(args.cases, args.features)
+
+    regimes = []
+    try:
+        while len(regimes) < args.max_regimes and len(active) >= max(args.min_size, len(args.features)):
+            share = -(-args.hypotheses // args.processes)
+            tasks = [(active, share, args.tol, args.seed * 1000 + len(regimes) * 100 + i, 5, args.block)
+                     for i in range(args.processes)]
+            outputs = pool.map(hypothesis_task, tasks) if pool else map(hypothesis_task, tasks)
+            candidates = sorted((h for output in outputs for h in output), key=lambda h: (-h[0], h[1]))
+            if not candidates or candidates[0][0] < args.min_size:
+                break
+
+            count, _, theta, sample = candidates[0]
+            inliers = np.abs(y[active] - X[active] @ theta) < args.tol
+            theta, inliers = polish(X[active], y[active], inliers, args.tol)
+            members = active[inliers]
+            if len(members) < args.min_size:
+                break
+            errors = np.abs(y[members] - np.round(X[members] @ theta, 2))
+            regimes.append({'formula': dict(zip(args.features, theta.tolist())), 'members': members.tolist(),
+                            'sample': sample.tolist(), 'consensus': count,
+                            'exact': int(np.sum(errors < 0.01)), 'avg_error': float(errors.mean())})
+            active = active[~inliers]
+            print(f"Regime {len(regimes)}: {len(members)} cases (minimal-sample consensus {count}), "
+                  f"{len(active)} left")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    covered = sum(len(regime['members']) for regime in regimes)
+    print(f"\nFound {len(regimes)} regimes covering {covered} of {len(y)} cases ({covered / len(y):.1%}) "
+          f"in {elapsed:.1f}s ({args.hypotheses * max(len(regimes), 1) / elapsed:,.0f} hypotheses/s)")
+    for number, regime in enumerate(regimes, 1):
+        members = np.array(regime['members'])
+        formula = " + ".join(f"{coef:.4f}*{name}" if name != 'const' else f"{coef:.2f}"
+                             for name, coef in regime['formula'].items())
+        print(f"\n📐 Regime {number}: {len(members)} cases")
+        print(f"  Formula: {formula}")
+        print(f"  Members: {describe_members(cases, members)}")
+        print(f"  Fit: avg error ${regime['avg_error']:.2f}, exact {regime['exact']}")
+        print(f"  Examples: " + "; ".join(f"{cases.describe(i)} -> ${y[i]:.2f}" for i in members[:3]))
+    if len(active):
+        print(f"\n❓ Unassigned: {len(active)} cases ({describe_members(cases, active)})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'features': args.features, 'tol': args.tol, 'regimes': regimes,
+                       'unassigned': active.tolist()}, f, indent=1)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
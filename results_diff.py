@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import time
+
+import numpy as np
+
+from case_data import load_cases
+from cents import format_cents, parse_cents, round_cents
+
+# Segment edges per input column; the last segment is open-ended
+SEGMENTS = {
+    'days': [1, 2, 4, 7, 11, 15],
+    'miles': [0, 100, 300, 600, 1000],
+    'receipts': [0, 50, 500, 1000, 1500, 2000],
+}
+
+# Delta histogram edges in cents; bin i is [edge i-1, edge i), open-ended at both ends.
+# The [0, 1) bin only holds unchanged lines, so it is empty whenever --tol >= 0.
+DELTA_EDGES = [-10000, -1000, -100, 0, 1, 100, 1000, 10000]
+
+
+def read_values(path, chunk_bytes=1 << 24):
+    """Yield (cents, errors) arrays for successive blocks of lines of a results file.
+
+    The file is memory-mapped and cut at newlines, so only one block is ever
+    held as Python objects. Values are int64 cents of round(x, 2); ERROR lines
+    (and blank ones) come back as 0 with errors set.
+    """
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, size = 0, len(mm)
+            while start < size:
+                end = min(start + chunk_bytes, size)
+                if end < size:
+                    end = mm.rfind(b'\n', start, end) + 1 or end
+                lines = np.array(mm[start:end].rstrip(b'\n').split(b'\n'))
+                lines = np.char.strip(lines)
+                errors = np.char.startswith(lines, b'ERROR') | (np.char.str_len(lines) == 0)
+                lines[errors] = b'0'
+                yield round_cents(lines.astype(np.float64)), errors
+                start = end
+
+
+def aligned_blocks(path_a, path_b, chunk_bytes):
+    """Blocks of equal length from both files, carrying the remainder over"""
+    blocks_a, blocks_b = read_values(path_a, chunk_bytes), read_values(path_b, chunk_bytes)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+    carry_a, carry_b = empty, empty
+    while True:
+        if len(carry_a[0]) == 0:
+            carry_a = next(blocks_a, None) or empty
+        if len(carry_b[0]) == 0:
+            carry_b = next(blocks_b, None) or empty
+        n = min(len(carry_a[0]), len(carry_b[0]))
+        if n == 0:
+            # One file ran out; report how many lines the other still has
+            rest_a = len(carry_a[0]) + sum(len(v) for v, _ in blocks_a)
+            rest_b = len(carry_b[0]) + sum(len(v) for v, _ in blocks_b)
+            yield None, (rest_a, rest_b)
+            return
+        yield (carry_a[0][:n], carry_a[1][:n], carry_b[0][:n], carry_b[1][:n]), None
+        carry_a = (carry_a[0][n:], carry_a[1][n:])
+        carry_b = (carry_b[0][n:], carry_b[1][n:])
+
+
+class SegmentStats:
+    """Running count / changed / sum / sum of |delta| (in cents) per segment of one column"""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        k = len(edges)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.changed = np.zeros(k, dtype=np.int64)
+        self.total = np.zeros(k, dtype=np.int64)
+        self.total_abs = np.zeros(k, dtype=np.int64)
+
+    def add(self, column, delta, changed):
+        segment = np.clip(np.searchsorted(self.edges, column, side='right') - 1, 0, len(self.edges) - 1)
+        k = len(self.edges)
+        self.count += np.bincount(segment, minlength=k)
+        self.changed += np.bincount(segment, weights=changed, minlength=k).astype(np.int64)
+        self.total += np.bincount(segment, weights=delta, minlength=k).astype(np.int64)
+        self.total_abs += np.bincount(segment, weights=np.abs(delta), minlength=k).astype(np.int64)
+
+    def labels(self, unit):
+        edges = self.edges.tolist()
+        return [f"{edges[i]:g}-{edges[i + 1]:g}{unit}" if i + 1 < len(edges) else f"{edges[i]:g}+{unit}"
+                for i in range(len(edges))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aligned diff of two results files (e.g. private_results.txt runs)")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--cases', default='private_cases.json', help="inputs the result lines correspond to")
+    parser.add_argument('--tol', type=parse_cents, default='0',
+                        help="changes up to this many dollars are treated as unchanged (whole cents)")
+    parser.add_argument('--top', type=int, default=10, help="largest movers to list")
+    parser.add_argument('--chunk-mb', type=int, default=4)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    stats = {column: SegmentStats(edges) for column, edges in SEGMENTS.items()}
+    histogram = np.zeros(len(DELTA_EDGES) + 1, dtype=np.int64)
+    lines = changed_total = unaligned = 0
+    new_errors, fixed_errors, error_lines = 0, 0, []
+    movers = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    delta_sum = delta_abs_sum = 0
+
+    print(f"=== RESULTS DIFF: {args.old} -> {args.new} ===")
+    start = time.perf_counter()
+    for block, rest in aligned_blocks(args.old, args.new, args.chunk_mb << 20):
+        if block is None:
+            break
+        old, old_err, new, new_err = block
+        n = len(old)
+        rows = np.arange(lines, lines + n)
+
+        appeared = new_err & ~old_err
+        new_errors += int(appeared.sum())
+        fixed_errors += int((old_err & ~new_err).sum())
+        error_lines.extend((rows[appeared][:max(args.top - len(error_lines), 0)] + 1).tolist())
+
+        both = ~(old_err | new_err)
+        delta = np.where(both, new - old, 0)
+        changed = np.abs(delta) > args.tol
+        changed_total += int(changed.sum())
+        delta_sum += int(delta[changed].sum())
+        delta_abs_sum += int(np.abs(delta[changed]).sum())
+        histogram += np.bincount(np.searchsorted(DELTA_EDGES, delta[changed], side='right'),
+                                 minlength=len(histogram))
+
+        # Keep only the current top movers by |delta|
+        candidates = np.concatenate([movers[0], rows[changed]])
+        values = np.concatenate([movers[1], delta[changed]])
+        if len(candidates) > args.top:
+            keep = np.argpartition(-np.abs(values), args.top)[:args.top]
+            candidates, values = candidates[keep], values[keep]
+        movers = candidates, values
+
+        covered = max(min(n, len(cases) - lines), 0)
+        unaligned += n - covered
+        if covered:
+            for column, segment_stats in stats.items():
+                segment_stats.add(getattr(cases, column)[lines:lines + covered], delta[:covered], changed[:covered])
+        lines += n
+    rest_old, rest_new = rest if rest else (0, 0)
+    elapsed = time.perf_counter() - start
+
+    print(f"Compared {lines:,} aligned lines in {elapsed:.2f}s ({lines / max(elapsed, 1e-9):,.0f} lines/s)")
+    if rest_old or rest_new:
+        print(f"⚠️  Length mismatch: {rest_old:,} extra lines in {args.old}, {rest_new:,} extra in {args.new}")
+    if unaligned:
+        print(f"⚠️  {unaligned:,} lines beyond the {len(cases):,} cases in {args.cases} are not segmented")
+
+    print(f"\nChanged: {changed_total:,} lines ({changed_total / max(lines, 1):.1%}) by more than "
+          f"${format_cents(args.tol)}")
+    if changed_total:
+        print(f"  Mean delta ${delta_sum / changed_total / 100:+.2f}, "
+              f"mean |delta| ${delta_abs_sum / changed_total / 100:.2f}")
+    print(f"  New ERROR lines: {new_errors:,}, errors fixed: {fixed_errors:,}")
+    if error_lines:
+        print(f"  First new ERROR lines: {', '.join(str(line) for line in error_lines)}")
+
+    print(f"\nDelta distribution (changed lines):")
+    for i, count in enumerate(histogram):
+        if count:
+            low = format_cents(DELTA_EDGES[i - 1]) if i > 0 else '-inf'
+            high = format_cents(DELTA_EDGES[i]) if i < len(DELTA_EDGES) else 'inf'
+            print(f"  [{low}, {high}): {count:,}")
+
+    for column, unit in [('days', 'd'), ('miles', 'mi'), ('receipts', '$')]:
+        segment_stats = stats[column]
+        print(f"\nBy {column}:")
+        for label, count, changed, total, total_abs in zip(segment_stats.labels(unit), segment_stats.count,
+                                                           segment_stats.changed, segment_stats.total,
+                                                           segment_stats.total_abs):
+            if count:
+                print(f"  {label:>12}: {count:>8,} lines, {changed:>8,} changed ({changed / count:6.1%}), "
+                      f"mean delta ${total / count / 100:+8.2f}, mean |delta| ${total_abs / count / 100:7.2f}")
+
+    print(f"\nLargest movers:")
+    order = np.argsort(-np.abs(movers[1]))
+    for row, delta in zip(movers[0][order].tolist(), movers[1][order].tolist()):
+        where = cases.describe(row) if row < len(cases) else "no input case"
+        print(f"  Line {row + 1}: {where}: {'+' if delta >= 0 else ''}{format_cents(delta)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+
+class ResultsStore:
+    """Append-only columnar store for search results.
+
+    Each column is a raw binary file of one dtype under the store directory,
+    described by schema.json. Rows are buffered and appended in blocks, so a
+    sweep writes a few large appends instead of one print per configuration.
+    Reading memory-maps the columns; if a run died mid-flush the columns are
+    truncated to the shortest one.
+    """
+
+    def __init__(self, path, schema=None, overwrite=False, flush_rows=4096):
+        self.path = path
+        self.flush_rows = flush_rows
+        schema_path = os.path.join(path, 'schema.json')
+
+        if overwrite and os.path.exists(path):
+            shutil.rmtree(path)
+        if os.path.exists(schema_path):
+            with open(schema_path) as f:
+                stored = json.load(f)
+            if schema is not None and stored != dict(schema):
+                raise ValueError(f"{path} already holds columns {stored}, not {dict(schema)}")
+            schema = stored
+        elif schema is None:
+            raise FileNotFoundError(f"no results store at {path}")
+        else:
+            os.makedirs(path, exist_ok=True)
+            with open(schema_path, 'w') as f:
+                json.dump(dict(schema), f, indent=2)
+
+        self.schema = {name: np.dtype(dtype) for name, dtype in schema.items()}
+        self.buffer = {name: [] for name in self.schema}
+        self.buffered = 0
+
+    def column_path(self, name):
+        return os.path.join(self.path, f'{name}.bin')
+
+    def append(self, **row):
+        for name, values in self.buffer.items():
+            values.append(row[name])
+        self.buffered += 1
+        if self.buffered >= self.flush_rows:
+            self.flush()
+
+    def append_batch(self, **columns):
+        self.flush()
+        lengths = {len(columns[name]) for name in self.schema}
+        if len(lengths) != 1:
+            raise ValueError("append_batch columns must all have the same length")
+        for name, dtype in self.schema.items():
+            with open(self.column_path(name), 'ab') as f:
+                np.asarray(columns[name], dtype=dtype).tofile(f)
+
+    def flush(self):
+        if not self.buffered:
+            return
+        for name, dtype in self.schema.items():
+            with open(self.column_path(name), 'ab') as f:
+                np.asarray(self.buffer[name], dtype=dtype).tofile(f)
+            self.buffer[name] = []
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def columns(self):
+        """Memory-mapped read-only view of every column"""
+        self.flush()
+        sizes = {}
+        for name, dtype in self.schema.items():
+            path = self.column_path(name)
+            sizes[name] = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        n = min(sizes.values()) if sizes else 0
+
+        columns = {}
+        for name, dtype in self.schema.items():
+            if n == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(self.column_path(name), dtype=dtype, mode='r', shape=(n,))
+        return columns
+
+    def __len__(self):
+        columns = self.columns()
+        return len(next(iter(columns.values()))) if columns else 0
+
+    def query(self, where=None, order_by=None, descending=False, limit=None):
+        """Filter and sort stored rows.
+
+        where is a callable taking the column dict and returning a boolean mask,
+        or a numpy expression string over column names such as
+        "(day_coef == 86) & (exact_matches > 0)". order_by is a column name or a
+        list of names (first is the primary key). Returns a dict of arrays.
+        """
+        columns = self.columns()
+        if where is None:
+            index = np.arange(len(next(iter(columns.values()))))
+        else:
+            mask = where(columns) if callable(where) else eval(where, {'__builtins__': {}, 'np': np}, dict(columns))
+            index = np.flatnonzero(mask)
+
+        if order_by is not None:
+            keys = [order_by] if isinstance(order_by, str) else list(order_by)
+            order = np.lexsort([np.asarray(columns[key])[index] for key in reversed(keys)])
+            if descending:
+                order = order[::-1]
+            index = index[order]
+        if limit is not None:
+            index = index[:limit]
+        return {name: np.asarray(values[index]) for name, values in columns.items()}
+
+
+class TopK:
+    """Live top-K of result rows kept in a bounded min-heap.
+
+    key maps a row to a sortable value where larger is better, e.g.
+    lambda r: (r['exact_matches'], -r['avg_error']).
+    """
+
+    def __init__(self, k, key):
+        self.k = k
+        self.key = key
+        self.heap = []
+        self.counter = itertools.count()
+
+    def push(self, row):
+        entry = (self.key(row), next(self.counter), row)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def best(self):
+        return max(self.heap)[2] if self.heap else None
+
+    def rows(self):
+        """Rows from best to worst"""
+        return [row for _, _, row in sorted(self.heap, reverse=True)]
+
+
+class ProgressReporter:
+    """Prints at most one progress line every interval seconds"""
+
+    def __init__(self, total=None, interval=2.0, stream=sys.stdout):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.count = 0
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def update(self, n=1, status=''):
+        self.count += n
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.report(now, status)
+
+    def report(self, now=None, status=''):
+        now = time.perf_counter() if now is None else now
+        rate = self.count / max(now - self.start, 1e-9)
+        done = f"{self.count:,}/{self.total:,}" if self.total else f"{self.count:,}"
+        line = f"Progress: {done} ({rate:,.0f}/s)"
+        print(f"{line} {status}".rstrip(), file=self.stream, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a columnar search-results store")
+    parser.add_argument('store', help="store directory, e.g. results/grid_search")
+    parser.add_argument('--where', default=None, help='numpy expression, e.g. "(day_coef == 86) & (exact_matches > 0)"')
+    parser.add_argument('--sort', default=None, help="comma-separated columns to sort by")
+    parser.add_argument('--desc', action='store_true', help="sort descending")
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store)
+    rows = store.query(args.where, args.sort.split(',') if args.sort else None, args.desc, args.top)
+    names = list(rows)
+    print(f"{len(store):,} rows in {args.store}; showing {len(rows[names[0]])}")
+    print("  " + "  ".join(f"{name:>14}" for name in names))
+    for i in range(len(rows[names[0]])):
+        print("  " + "  ".join(f"{rows[name][i]:>14.6g}" for name in names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from case_data import load_cases
+from results_store import ResultsStore
+
+
+# --- Search tasks -----------------------------------------------------------
+# Each task takes a batch of parameter rows (B x P) and returns the (B x n)
+# predictions for every case.
+
+def linear_task(cases, params):
+    """grid_search.py: day/mile/receipt coefficients plus a 5-day bonus"""
+    day, mile, receipt, bonus = params.T
+    predicted = (day[:, None] * cases.days + mile[:, None] * cases.miles
+                 + receipt[:, None] * cases.receipts + bonus[:, None] * (cases.days == 5))
+    return predicted
+
+
+def tiered_task(cases, params):
+    """exact_match_pursuit.py: two sized receipt tiers and an open-ended tier"""
+    day, mile, size1, rate1, size2, rate2, rate3 = params.T
+    r = cases.receipts[None, :]
+    first = np.minimum(r, size1[:, None])
+    second = np.clip(r - size1[:, None], 0, size2[:, None])
+    rest = np.maximum(r - size1[:, None] - size2[:, None], 0)
+    return (day[:, None] * cases.days + mile[:, None] * cases.miles
+            + rate1[:, None] * first + rate2[:, None] * second + rate3[:, None] * rest)
+
+
+def conditional_task(cases, params):
+    """conditional_model.py precise rules: one receipt rate per trip group"""
+    day, mile, long_high, short_high, five_day, default = params.T
+    d, r = cases.days, cases.receipts
+    rate = np.select(
+        [((d >= 8) & (r > 1500))[None, :], ((d <= 3) & (r > 1800))[None, :], (d == 5)[None, :]],
+        [long_high[:, None], short_high[:, None], five_day[:, None]],
+        default[:, None])
+    return day[:, None] * d + mile[:, None] * cases.miles + rate * r
+
+
+TASKS = {
+    'linear': (linear_task, {
+        'day': np.arange(85, 106, 1).tolist(),
+        'mile': np.round(np.arange(0.60, 0.81, 0.02), 2).tolist(),
+        'receipt': np.round(np.arange(0.01, 0.6, 0.01), 2).tolist(),
+        'bonus_5day': [0, 20, 30, 50, 75, 100],
+    }),
+    'tiered': (tiered_task, {
+        'day': [85, 90, 95, 100, 105],
+        'mile': [0.55, 0.60, 0.65, 0.70, 0.75],
+        'size1': [100, 200, 300, 400, 500, 600, 800],
+        'rate1': np.round(np.arange(0.0, 1.01, 0.1), 1).tolist(),
+        'size2': [200, 400, 600, 800, 1000, 1500],
+        'rate2': np.round(np.arange(0.0, 1.01, 0.1), 1).tolist(),
+        'rate3': np.round(np.arange(-0.3, 0.51, 0.1), 1).tolist(),
+    }),
+    'conditional': (conditional_task, {
+        'day': [85, 90, 95, 100, 105],
+        'mile': [0.60, 0.65, 0.70, 0.75],
+        'long_high': np.round(np.arange(-0.5, 0.11, 0.05), 2).tolist(),
+        'short_high': np.round(np.arange(0.1, 0.8, 0.05), 2).tolist(),
+        'five_day': np.round(np.arange(0.1, 0.8, 0.05), 2).tolist(),
+        'default': np.round(np.arange(0.0, 0.8, 0.05), 2).tolist(),
+    }),
+}
+
+
+# --- Parameter space and work units ----------------------------------------
+
+class ParameterSpace:
+    """Cartesian product of named value lists, addressable by flat index"""
+
+    def __init__(self, space):
+        self.names = list(space)
+        self.values = [np.asarray(space[name], dtype=np.float64) for name in self.names]
+        self.shape = tuple(len(v) for v in self.values)
+        self.size = int(np.prod(self.shape))
+
+    def rows(self, start, stop):
+        index = np.unravel_index(np.arange(start, stop), self.shape)
+        return np.column_stack([values[i] for values, i in zip(self.values, index)])
+
+
+class RunDirectory:
+    """Shared run directory: spec.json, claims/ leases and done/ checkpoints.
+
+    Any number of workers on any number of machines can point at the same
+    directory (e.g. an NFS mount). A unit is claimed by atomically creating
+    claims/unit-N; its result is written to done/unit-N.npz via rename, so a
+    unit is either fully checkpointed or not at all. Claims older than the
+    lease are treated as abandoned and can be taken over, so a worker renews
+    its claim (touches it) while a unit runs, and only ever removes a claim
+    that still names it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.claims = os.path.join(path, 'claims')
+        self.done = os.path.join(path, 'done')
+
+    def create(self, spec):
+        os.makedirs(self.claims, exist_ok=True)
+        os.makedirs(self.done, exist_ok=True)
+        spec_path = os.path.join(self.path, 'spec.json')
+        if os.path.exists(spec_path):
+            with open(spec_path) as f:
+                if json.load(f) != spec:
+                    raise SystemExit(f"{spec_path} already exists with a different spec")
+            return
+        with open(spec_path, 'w') as f:
+            json.dump(spec, f, indent=2)
+
+    def spec(self):
+        with open(os.path.join(self.path, 'spec.json')) as f:
+            return json.load(f)
+
+    def done_path(self, unit):
+        return os.path.join(self.done, f'unit-{unit}.npz')
+
+    def claim_path(self, unit):
+        return os.path.join(self.claims, f'unit-{unit}')
+
+    def is_done(self, unit):
+        return os.path.exists(self.done_path(unit))
+
+    def try_claim(self, unit, lease):
+        path = self.claim_path(unit)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Take over an expired claim by renaming it aside: only one worker's rename can
+            # succeed, so a fresh claim made by another worker is never removed
+            stale = f"{path}.{socket.gethostname()}.{os.getpid()}.stale"
+            try:
+                if time.time() - os.stat(path).st_mtime < lease:
+                    return False
+                os.rename(path, stale)
+            except FileNotFoundError:
+                return False
+            if time.time() - os.stat(stale).st_mtime < lease:
+                # Another worker re-created the claim between our stat and rename; put it back
+                try:
+                    os.link(stale, path)
+                except FileExistsError:
+                    pass
+                os.remove(stale)
+                return False
+            os.remove(stale)
+            return self.try_claim(unit, float('inf'))
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{self.owner}\n")
+        return True
+
+    def claim_owner(self, path):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def renew(self, unit):
+        """Refresh our lease on a unit; False if the claim was taken over (or is gone)"""
+        path = self.claim_path(unit)
+        if self.claim_owner(path) != self.owner:
+            return False
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, unit):
+        """Remove our claim on a unit. A claim taken over by another worker after our
+        lease expired is left alone: it is moved aside first, checked, and put back."""
+        path = self.claim_path(unit)
+        if self.claim_owner(path) != self.owner:
+            return
+        mine = f"{path}.{socket.gethostname()}.{os.getpid()}.release"
+        try:
+            os.rename(path, mine)
+        except FileNotFoundError:
+            return
+        if self.claim_owner(mine) != self.owner:
+            # Taken over between the check and the rename
+            try:
+                os.link(mine, path)
+            except FileExistsError:
+                pass
+        os.remove(mine)
+
+    def checkpoint(self, unit, start, exact, avg_error):
+        final = self.done_path(unit)
+        tmp = f"{final}.{socket.gethostname()}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, start=start, exact=exact, avg_error=avg_error)
+        os.replace(tmp, final)
+        self.release(unit)
+
+    def completed_units(self):
+        return sorted(int(name[5:-4]) for name in os.listdir(self.done) if name.endswith('.npz')
+                      and not name.endswith('.tmp.npz'))
+
+
+def unit_range(spec, unit):
+    start = unit * spec['unit_size']
+    return start, min(start + spec['unit_size'], spec['total'])
+
+
+class LeaseLost(Exception):
+    """Another worker took over the unit being evaluated"""
+
+
+def evaluate_unit(spec, cases, space, unit, batch_size=512, heartbeat=None):
+    """Exact-match counts and average errors of one unit; heartbeat() is called after every batch"""
+    task = TASKS[spec['task']][0]
+    start, stop = unit_range(spec, unit)
+    exact = np.empty(stop - start, dtype=np.int32)
+    avg_error = np.empty(stop - start, dtype=np.float64)
+    for lo in range(start, stop, batch_size):
+        hi = min(lo + batch_size, stop)
+        errors = np.abs(cases.expected[None, :] - task(cases, space.rows(lo, hi)))
+        exact[lo - start:hi - start] = (errors < 0.01).sum(axis=1)
+        avg_error[lo - start:hi - start] = errors.mean(axis=1)
+        if heartbeat:
+            heartbeat()
+    return start, exact, avg_error
+
+
+def worker_loop(run_path, worker_id=0, lease=600):
+    """Claim and evaluate units until none are left; returns the number completed"""
+    run = RunDirectory(run_path)
+    spec = run.spec()
+    cases = load_cases(spec['cases'])
+    space = ParameterSpace(spec['space'])
+
+    # Workers start at different offsets so they rarely contend for the same claim
+    units = list(range(spec['units']))
+    offset = (worker_id * 7919 + os.getpid()) % max(len(units), 1)
+    units = units[offset:] + units[:offset]
+
+    completed = 0
+    for unit in units:
+        if run.is_done(unit) or not run.try_claim(unit, lease):
+            continue
+        renewed = time.time()
+
+        def heartbeat():
+            # Renew well before the lease runs out; stop if someone else owns the unit now
+            nonlocal renewed
+            if time.time() - renewed > lease / 4:
+                if not run.renew(unit):
+                    raise LeaseLost(unit)
+                renewed = time.time()
+
+        try:
+            if run.is_done(unit):
+                continue
+            run.checkpoint(unit, *evaluate_unit(spec, cases, space, unit, heartbeat=heartbeat))
+            completed += 1
+        except LeaseLost:
+            continue
+        finally:
+            run.release(unit)
+    return completed
+
+
+# --- Commands ----------------------------------------------------------------
+
+def cmd_init(args):
+    _, space = TASKS[args.task]
+    total = ParameterSpace(space).size
+    spec = {
+        'task': args.task,
+        'cases': os.path.abspath(args.cases),
+        'space': space,
+        'total': total,
+        'unit_size': args.unit_size,
+        'units': -(-total // args.unit_size),
+    }
+    RunDirectory(args.run_dir).create(spec)
+    print(f"Initialised {args.run_dir}: task '{args.task}', {total:,} configurations in {spec['units']} units")
+
+
+def cmd_work(args):
+    run = RunDirectory(args.run_dir)
+    spec = run.spec()
+    remaining = spec['units'] - len(run.completed_units())
+    print(f"{socket.gethostname()}: {remaining} of {spec['units']} units remaining, {args.processes} process(es)")
+
+    start = time.perf_counter()
+    try:
+        if args.processes == 1:
+            completed = worker_loop(args.run_dir, 0, args.lease)
+        else:
+            with ProcessPoolExecutor(args.processes) as pool:
+                futures = [pool.submit(worker_loop, args.run_dir, i, args.lease) for i in range(args.processes)]
+                completed = sum(f.result() for f in futures)
+    except KeyboardInterrupt:
+        print("\nInterrupted - completed units are checkpointed; rerun 'work' to resume.")
+        sys.exit(130)
+    print(f"Completed {completed} units in {time.perf_counter() - start:.1f}s")
+
+
+def cmd_status(args):
+    run = RunDirectory(args.run_dir)
+    spec = run.spec()
+    done = len(run.completed_units())
+    claimed = sum(1 for name in os.listdir(run.claims) if '.' not in name)
+    print(f"Task '{spec['task']}': {done}/{spec['units']} units done, {claimed} in progress")
+
+
+def cmd_collect(args):
+    run = RunDirectory(args.run_dir)
+    spec = run.spec()
+    space = ParameterSpace(spec['space'])
+    units = run.completed_units()
+
+    indices, exact, avg_error = [], [], []
+    for unit in units:
+        with np.load(run.done_path(unit)) as data:
+            indices.append(int(data['start']) + np.arange(len(data['exact'])))
+            exact.append(data['exact'])
+            avg_error.append(data['avg_error'])
+    if not units:
+        print("No completed units yet.")
+        return
+    indices, exact, avg_error = np.concatenate(indices), np.concatenate(exact), np.concatenate(avg_error)
+
+    if args.export:
+        schema = {name: 'f8' for name in space.names}
+        schema.update(exact_matches='i4', avg_error='f8')
+        with ResultsStore(args.export, schema, overwrite=True) as store:
+            for lo in range(0, len(indices), 65536):
+                chunk = indices[lo:lo + 65536]
+                params = np.column_stack([values[i] for values, i in
+                                          zip(space.values, np.unravel_index(chunk, space.shape))])
+                store.append_batch(exact_matches=exact[lo:lo + 65536], avg_error=avg_error[lo:lo + 65536],
+                                   **{name: params[:, j] for j, name in enumerate(space.names)})
+        print(f"Exported {len(indices):,} rows to {args.export}")
+
+    # Same priority as the original sweeps: exact matches first, then average error
+    order = np.lexsort((avg_error, -exact))[:args.top]
+    print(f"=== TOP {len(order)} OF {len(indices):,} CONFIGURATIONS ({len(units)}/{spec['units']} units) ===")
+    for i in order:
+        params = space.rows(indices[i], indices[i] + 1)[0]
+        described = ", ".join(f"{name}={value:g}" for name, value in zip(space.names, params))
+        print(f"  {described}: Exact matches: {exact[i]}, Avg error: ${avg_error[i]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpointed, resumable, multi-machine parameter sweeps")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('init', help="create a run directory for a task")
+    p.add_argument('run_dir')
+    p.add_argument('--task', choices=sorted(TASKS), default='linear')
+    p.add_argument('--unit-size', type=int, default=2000, help="configurations per work unit")
+    p.add_argument('--cases', default='public_cases.json')
+    p.set_defaults(func=cmd_init)
+
+    p = sub.add_parser('work', help="process units (run on each machine sharing the run directory)")
+    p.add_argument('run_dir')
+    p.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    p.add_argument('--lease', type=float, default=600, help="seconds before an unfinished claim is considered abandoned")
+    p.set_defaults(func=cmd_work)
+
+    p = sub.add_parser('status', help="show progress")
+    p.add_argument('run_dir')
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser('collect', help="merge checkpoints and show the best configurations")
+    p.add_argument('run_dir')
+    p.add_argument('--top', type=int, default=10)
+    p.add_argument('--export', default=None, help="also write every result to this results_store directory")
+    p.set_defaults(func=cmd_collect)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+import numpy as np
+
+from case_data import load_cases
+
+
+def case_columns(cases):
+    """Columns the engine can segment on or use as linear controls"""
+    days = cases.days.astype(np.float64)
+    return {
+        'days': days,
+        'miles': cases.miles,
+        'receipts': cases.receipts,
+        'miles_per_day': cases.miles / days,
+        'receipts_per_day': cases.receipts / days,
+    }
+
+
+def _prefix(values):
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+
+def segment_cost_matrix(x, y, cuts, min_size=10):
+    """SSE of a least-squares line over every candidate segment.
+
+    x must be sorted; cuts are the candidate boundary positions into x (including
+    0 and len(x)). Entry [a, b] is the SSE of fitting y ~ x over x[cuts[a]:cuts[b]],
+    computed in O(1) per segment from prefix sums. Segments that are too small or
+    run backwards are infinite.
+    """
+    # Centering keeps the prefix-sum differences well conditioned
+    x = x - x.mean()
+    y = y - y.mean()
+
+    Sx, Sy = _prefix(x)[cuts], _prefix(y)[cuts]
+    Sxx, Sxy, Syy = _prefix(x * x)[cuts], _prefix(x * y)[cuts], _prefix(y * y)[cuts]
+
+    n = (cuts[None, :] - cuts[:, None]).astype(np.float64)
+    sx = Sx[None, :] - Sx[:, None]
+    sy = Sy[None, :] - Sy[:, None]
+    sxx = Sxx[None, :] - Sxx[:, None]
+    sxy = Sxy[None, :] - Sxy[:, None]
+    syy = Syy[None, :] - Syy[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = sxx - sx * sx / n
+        cov = sxy - sx * sy / n
+        sse = syy - sy * sy / n
+        explained = np.where(var_x > 1e-9, cov * cov / var_x, 0.0)
+    sse = np.maximum(sse - explained, 0.0)
+    sse[n < min_size] = np.inf
+    return sse
+
+
+def candidate_cuts(x, max_candidates):
+    """Boundary positions between distinct x values, thinned to at most max_candidates"""
+    boundaries = np.flatnonzero(x[1:] != x[:-1]) + 1
+    if len(boundaries) > max_candidates:
+        keep = np.linspace(0, len(boundaries) - 1, max_candidates).round().astype(int)
+        boundaries = boundaries[np.unique(keep)]
+    return np.concatenate([[0], boundaries, [len(x)]])
+
+
+def optimal_segments(x, y, max_segments=5, min_size=10, max_candidates=600):
+    """Optimal segmented least squares by dynamic programming.
+
+    Returns {k: (sse, [boundary positions into the sorted x])} for k = 1..max_segments.
+    Each DP layer is one vectorized (m x m) min-plus step over m candidate cuts,
+    so the whole run is O(m^2 * k).
+    """
+    cuts = candidate_cuts(x, max_candidates)
+    cost = segment_cost_matrix(x, y, cuts, min_size)
+    m = len(cuts)
+
+    best = np.full(m, np.inf)
+    best[0] = 0.0
+    back = []
+    results = {}
+    for k in range(1, max_segments + 1):
+        total = best[:, None] + cost
+        choice = total.argmin(axis=0)
+        best = total[choice, np.arange(m)]
+        back.append(choice)
+
+        if np.isfinite(best[-1]):
+            bounds = [m - 1]
+            for layer in range(k - 1, -1, -1):
+                bounds.append(back[layer][bounds[-1]])
+            results[k] = (float(best[-1]), [int(cuts[b]) for b in reversed(bounds)])
+    return results
+
+
+def describe_segments(x, y, bounds):
+    """Fit each segment and return (low, high, slope, intercept, count) rows"""
+    rows = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        xs, ys = x[start:end], y[start:end]
+        if np.ptp(xs) > 0:
+            slope, intercept = np.polyfit(xs, ys, 1)
+        else:
+            slope, intercept = 0.0, ys.mean()
+        rows.append((xs[0], xs[-1], slope, intercept, end - start))
+    return rows
+
+
+def fit_segmented(cases, column, controls=(), max_segments=5, min_size=10,
+                  max_candidates=600, backfit_iterations=5, mask=None):
+    """Segment y on one column while the control columns enter linearly.
+
+    With controls, alternates between the DP fit on the partial residual and a
+    least-squares refit of the controls (backfitting). Returns the chosen
+    per-k results along with the sorted x and partial residual used for the last fit.
+    """
+    columns = case_columns(cases)
+    y = cases.expected
+    if mask is not None:
+        columns = {name: values[mask] for name, values in columns.items()}
+        y = y[mask]
+
+    order = np.argsort(columns[column], kind='stable')
+    x = columns[column][order]
+    y = y[order]
+    C = np.column_stack([columns[name][order] for name in controls]) if controls else np.zeros((len(x), 0))
+
+    control_fit = np.zeros(len(x))
+    coefs = np.zeros(C.shape[1])
+    for _ in range(max(backfit_iterations, 1) if controls else 1):
+        partial = y - control_fit
+        results = optimal_segments(x, partial, max_segments, min_size, max_candidates)
+        if not controls:
+            break
+        bounds = results[choose_k(results, len(x))][1]
+        segment_fit = np.empty(len(x))
+        for (start, end), (_, _, slope, intercept, _) in zip(zip(bounds[:-1], bounds[1:]),
+                                                             describe_segments(x, partial, bounds)):
+            segment_fit[start:end] = intercept + slope * x[start:end]
+        coefs = np.linalg.lstsq(C - C.mean(axis=0), y - segment_fit - (y - segment_fit).mean(), rcond=None)[0]
+        control_fit = (C - C.mean(axis=0)) @ coefs
+
+    return results, x, y - control_fit, dict(zip(controls, coefs))
+
+
+def choose_k(results, n):
+    """Pick the segment count by BIC (3 parameters per segment: two coefficients and a cut)"""
+    if not results:
+        raise ValueError(f"no segmentation of {n} cases gives every segment the minimum number of cases")
+
+    def bic(k):
+        sse = max(results[k][0], 1e-9)
+        return n * np.log(sse / n) + 3 * k * np.log(n)
+    return min(results, key=bic)
+
+
+def parse_groups(spec):
+    groups = []
+    for part in spec.split(','):
+        low, _, high = part.partition('-')
+        groups.append((int(low), int(high or low)))
+    return groups
+
+
+def report(label, results, x, partial, control_coefs):
+    n = len(x)
+    k_best = choose_k(results, n)
+    print(f"\n{label} ({n} cases)")
+    if control_coefs:
+        print("  Linear controls: " + ", ".join(f"{name} {coef:+.4f}" for name, coef in control_coefs.items()))
+    for k, (sse, _) in sorted(results.items()):
+        marker = "  <- BIC choice" if k == k_best else ""
+        print(f"  {k} segment(s): RMSE ${np.sqrt(sse / n):.2f}{marker}")
+
+    bounds = results[k_best][1]
+    for low, high, slope, intercept, count in describe_segments(x, partial, bounds):
+        print(f"    [{low:8.2f}, {high:8.2f}]  slope {slope:+.4f}  intercept {intercept:+9.2f}  ({count} cases)")
+    for cut in bounds[1:-1]:
+        print(f"    breakpoint ~ {(x[cut - 1] + x[cut]) / 2:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find optimal breakpoints and per-segment slopes by dynamic programming")
+    parser.add_argument('column', nargs='?', default='receipts',
+                        choices=['days', 'miles', 'receipts', 'miles_per_day', 'receipts_per_day'])
+    parser.add_argument('--controls', default='', help="comma-separated columns fitted linearly alongside, e.g. days,miles")
+    parser.add_argument('--max-segments', type=int, default=5)
+    parser.add_argument('--min-size', type=int, default=10, help="minimum cases per segment")
+    parser.add_argument('--max-candidates', type=int, default=600, help="cap on candidate breakpoints")
+    parser.add_argument('--groups', default='', help="trip-length groups to fit separately, e.g. 1-3,4-6,7-14")
+    parser.add_argument('--cases', default='public_cases.json')
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    controls = tuple(name for name in args.controls.split(',') if name)
+
+    print(f"=== SEGMENTED REGRESSION ON {args.column.upper()} ===")
+    start = time.perf_counter()
+
+    if args.groups:
+        for low, high in parse_groups(args.groups):
+            mask = (cases.days >= low) & (cases.days <= high)
+            if mask.sum() < 2 * args.min_size:
+                print(f"\nDays {low}-{high}: too few cases ({mask.sum()})")
+                continue
+            try:
+                fit = fit_segmented(cases, args.column, controls, args.max_segments,
+                                    args.min_size, args.max_candidates, mask=mask)
+                report(f"Days {low}-{high}", *fit)
+            except ValueError as e:
+                print(f"\nDays {low}-{high}: {e}")
+    else:
+        try:
+            fit = fit_segmented(cases, args.column, controls, args.max_segments,
+                                args.min_size, args.max_candidates)
+            report("All cases", *fit)
+        except ValueError as e:
+            raise SystemExit(f"❌ {e}; try a smaller --min-size")
+
+    print(f"\nSolved in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BUDGETS_PATH = 'startup_budgets.json'
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def clear_bytecode(directory='.'):
+    """Remove the repo's compiled bytecode so the next run pays compile cost (a cold start)"""
+    for path in glob.glob(os.path.join(directory, '__pycache__', '*.pyc')):
+        os.remove(path)
+
+
+def run_once(script, args):
+    """Wall time (s) and parsed import tree of one invocation"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-X', 'importtime', script, *args], capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if out.returncode != 0:
+        raise RuntimeError(f"{script} exited with {out.returncode}: {out.stderr.strip().splitlines()[-1:]}")
+    return wall, parse_importtime(out.stderr)
+
+
+def profile(script, args, runs):
+    """One cold run (bytecode cleared) followed by `runs` warm runs"""
+    clear_bytecode(os.path.dirname(os.path.abspath(script)))
+    cold_wall, cold_modules = run_once(script, args)
+    warm = [run_once(script, args) for _ in range(runs)]
+    return cold_wall, cold_modules, [wall for wall, _ in warm], [modules for _, modules in warm]
+
+
+def module_costs(runs_modules):
+    """Median self and cumulative microseconds per module across runs"""
+    selfs, cumulatives, depths = {}, {}, {}
+    for modules in runs_modules:
+        for name, self_us, cumulative_us, depth in modules:
+            selfs.setdefault(name, []).append(self_us)
+            cumulatives.setdefault(name, []).append(cumulative_us)
+            depths[name] = depth
+    return {name: (float(np.median(selfs[name])), float(np.median(cumulatives[name])), depths[name])
+            for name in selfs}
+
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile calculator startup with -X importtime and enforce budgets")
+    parser.add_argument('scripts', nargs='*', help=f"entry points (default: every script in {BUDGETS_PATH})")
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help="JSON of {script: warm p50 budget in ms}")
+    parser.add_argument('--runs', type=int, default=5, help="warm runs per entry point")
+    parser.add_argument('--top', type=int, default=8, help="most expensive modules to list")
+    parser.add_argument('--args', nargs=3, default=['5', '250', '150.75'], metavar=('DAYS', 'MILES', 'RECEIPTS'))
+    args = parser.parse_args()
+
+    budgets = load_budgets(args.budgets)
+    scripts = args.scripts or list(budgets)
+    if not scripts:
+        raise SystemExit(f"no entry points given and no budgets in {args.budgets}")
+
+    empty_wall = float(np.median([run_once(os.devnull, [])[0] for _ in range(3)]))
+    print(f"=== STARTUP PROFILE ({args.runs} warm runs each; bare interpreter {empty_wall * 1000:.0f}ms) ===")
+
+    over_budget = []
+    rows = []
+    for script in scripts:
+        cold_wall, cold_modules, warm_walls, warm_modules = profile(script, args.args, args.runs)
+        costs = module_costs(warm_modules)
+        cold_imports = sum(self_us for _, self_us, _, _ in cold_modules) / 1000
+        warm_imports = sum(self_us for self_us, _, _ in costs.values()) / 1000
+        p50 = float(np.median(warm_walls)) * 1000
+        budget = budgets.get(script)
+        rows.append((script, cold_wall * 1000, p50, min(warm_walls) * 1000, warm_imports, budget))
+
+        print(f"\n{script}:")
+        print(f"  Cold: {cold_wall * 1000:.0f}ms wall, {cold_imports:.0f}ms in imports")
+        print(f"  Warm: p50 {p50:.0f}ms, min {min(warm_walls) * 1000:.0f}ms wall, {warm_imports:.0f}ms in imports, "
+              f"+{max(p50 - empty_wall * 1000, 0):.0f}ms over a bare interpreter")
+        top_level = sorted(((name, cumulative) for name, (_, cumulative, depth) in costs.items() if depth == 0),
+                           key=lambda item: -item[1])[:args.top]
+        print(f"  Top-level imports (cumulative): "
+              + ", ".join(f"{name} {cumulative / 1000:.1f}ms" for name, cumulative in top_level))
+        heaviest = sorted(costs.items(), key=lambda item: -item[1][0])[:args.top]
+        print(f"  Heaviest modules (self): "
+              + ", ".join(f"{name} {self_us / 1000:.1f}ms" for name, (self_us, _, _) in heaviest))
+        if budget is not None and p50 > budget:
+            over_budget.append(script)
+            print(f"  ❌ Over budget: p50 {p50:.0f}ms > {budget}ms")
+
+    width = max(len(row[0]) for row in rows)
+    print(f"\n  {'entry point':<{width}} {'cold':>7} {'warm p50':>9} {'min':>7} {'imports':>8} {'budget':>7}")
+    for script, cold, p50, fastest, imports, budget in rows:
+        status = '' if budget is None else ('  ❌' if script in over_budget else '  ✅')
+        print(f"  {script:<{width}} {cold:>5.0f}ms {p50:>7.0f}ms {fastest:>5.0f}ms {imports:>6.0f}ms "
+              f"{'-' if budget is None else f'{budget}ms':>7}{status}")
+
+    if over_budget:
+        print(f"\n❌ {len(over_budget)} entry point(s) over their startup budget")
+        sys.exit(1)
+    print(f"\n✅ All budgeted entry points within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from case_data import load_cases
+
+# Expressions are nested tuples: ('days',) is a variable, ('cap', x, 600.0) is
+# min(x, 600), ('hinge', x, 100.0) is max(x - 100, 0), ('step', x, 5.0) is
+# 1 if x > 5 else 0, and ('mul'|'min'|'max'|'div', a, b) combine two
+# subexpressions. Tuples hash, so they double as cache keys.
+VARIABLES = ['days', 'miles', 'receipts', 'miles_per_day', 'receipts_per_day']
+
+# Thresholds the interviews mention, plus round numbers in each variable's range
+THRESHOLDS = {
+    'days': [1, 3, 4, 5, 6, 7, 8, 10, 12],
+    'miles': [100, 200, 300, 400, 500, 600, 800, 1000],
+    'receipts': [50, 100, 200, 400, 600, 800, 1000, 1200, 1500, 2000],
+    'miles_per_day': [30, 80, 100, 150, 180, 200, 220, 300, 400],
+    'receipts_per_day': [50, 75, 90, 100, 120, 150, 200, 300],
+}
+
+COMMUTATIVE = {'mul', 'min', 'max'}
+
+
+def canonical(expr):
+    """Order the children of commutative nodes so equivalent trees share a cache entry"""
+    if expr[0] in COMMUTATIVE:
+        a, b = canonical(expr[1]), canonical(expr[2])
+        if a == b and expr[0] != 'mul':
+            return a
+        return (expr[0],) + tuple(sorted((a, b), key=repr))
+    if len(expr) == 3 and isinstance(expr[2], tuple):
+        return (expr[0], canonical(expr[1]), canonical(expr[2]))
+    if len(expr) == 3:
+        return (expr[0], canonical(expr[1]), expr[2])
+    return expr
+
+
+def to_string(expr):
+    op = expr[0]
+    if len(expr) == 1:
+        return op
+    if op == 'cap':
+        return f"min({to_string(expr[1])}, {expr[2]:g})"
+    if op == 'hinge':
+        return f"max({to_string(expr[1])} - {expr[2]:g}, 0)"
+    if op == 'step':
+        return f"[{to_string(expr[1])} > {expr[2]:g}]"
+    if op == 'mul':
+        return f"{to_string(expr[1])}*{to_string(expr[2])}"
+    if op == 'div':
+        return f"{to_string(expr[1])}/{to_string(expr[2])}"
+    return f"{op}({to_string(expr[1])}, {to_string(expr[2])})"
+
+
+def base_variable(expr):
+    """The variable a threshold applies to, for picking sensible constants"""
+    while len(expr) > 1:
+        expr = expr[1]
+    return expr[0]
+
+
+class ColumnCache:
+    """LRU cache of evaluated subexpression columns over the whole dataset"""
+
+    def __init__(self, cases, max_entries=20000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        days = cases.days.astype(np.float64)
+        self.terminals = {
+            'days': days,
+            'miles': cases.miles,
+            'receipts': cases.receipts,
+            'miles_per_day': cases.miles / days,
+            'receipts_per_day': cases.receipts / days,
+        }
+        self.columns = OrderedDict()
+
+    def __call__(self, expr):
+        if len(expr) == 1:
+            return self.terminals[expr[0]]
+        column = self.columns.get(expr)
+        if column is not None:
+            self.hits += 1
+            self.columns.move_to_end(expr)
+            return column
+
+        self.misses += 1
+        op, a = expr[0], self(expr[1])
+        if op == 'cap':
+            column = np.minimum(a, expr[2])
+        elif op == 'hinge':
+            column = np.maximum(a - expr[2], 0.0)
+        elif op == 'step':
+            column = (a > expr[2]).astype(np.float64)
+        else:
+            b = self(expr[2])
+            if op == 'mul':
+                column = a * b
+            elif op == 'min':
+                column = np.minimum(a, b)
+            elif op == 'max':
+                column = np.maximum(a, b)
+            else:
+                column = np.divide(a, b, out=np.zeros_like(a), where=b != 0)
+
+        self.columns[expr] = column
+        if len(self.columns) > self.max_entries:
+            self.columns.popitem(last=False)
+        return column
+
+
+def random_term(rng, depth=2):
+    """A random basis term built from the interview-style operators"""
+    var = (rng.choice(VARIABLES),)
+    if depth <= 0 or rng.random() < 0.25:
+        return var
+    kind = rng.random()
+    if kind < 0.45:
+        op = rng.choice(['cap', 'hinge', 'step'])
+        return (op, var, float(rng.choice(THRESHOLDS[var[0]])))
+    if kind < 0.8:
+        # Conditioned or capped interaction, e.g. [days > 5]*miles or min(miles, receipts)
+        other = random_term(rng, depth - 1)
+        return canonical((rng.choice(['mul', 'min', 'max']), other, random_term(rng, depth - 1)))
+    return ('div', var, (rng.choice([v for v in VARIABLES if v != var[0]]),))
+
+
+def mutate(formula, rng, max_terms):
+    terms = list(formula)
+    choice = rng.random()
+    if choice < 0.35 and len(terms) < max_terms:
+        terms.append(random_term(rng))
+    elif choice < 0.5 and len(terms) > 1:
+        terms.pop(rng.randrange(len(terms)))
+    elif choice < 0.8:
+        terms[rng.randrange(len(terms))] = random_term(rng)
+    else:
+        # Nudge a threshold to a neighbouring candidate
+        i = rng.randrange(len(terms))
+        term = terms[i]
+        if term[0] in ('cap', 'hinge', 'step'):
+            options = THRESHOLDS[base_variable(term)]
+            j = options.index(term[2]) if term[2] in options else 0
+            j = min(max(j + rng.choice([-1, 1]), 0), len(options) - 1)
+            terms[i] = (term[0], term[1], float(options[j]))
+        else:
+            terms[i] = random_term(rng)
+    return normalize(terms)
+
+
+def crossover(a, b, rng, max_terms):
+    # Sorted so the rng sees the same pool whatever the string hash seed is
+    pool = sorted(set(a) | set(b), key=repr)
+    rng.shuffle(pool)
+    return normalize(pool[:rng.randint(1, max_terms)])
+
+
+def normalize(terms):
+    return tuple(sorted(set(canonical(t) for t in terms), key=repr))
+
+
+# Per-process state; filled in by init_worker (or directly in single-process runs)
+_CACHE = None
+_TARGET = None
+
+
+def init_worker(cases_path):
+    global _CACHE, _TARGET
+    cases = load_cases(cases_path)
+    _CACHE = ColumnCache(cases)
+    _TARGET = cases.expected
+
+
+def score_formulas(formulas):
+    """Fit each formula's coefficients by least squares and score it"""
+    results = []
+    hits, misses = _CACHE.hits, _CACHE.misses
+    ones = np.ones(len(_TARGET))
+    for formula in formulas:
+        X = np.column_stack([_CACHE(term) for term in formula] + [ones])
+        coefs = np.linalg.lstsq(X, _TARGET, rcond=None)[0]
+        errors = np.abs(_TARGET - np.round(X @ coefs, 2))
+        exact = int((errors < 0.01).sum())
+        score = errors.mean() * 100 + (len(errors) - exact) * 0.1
+        results.append((score, errors.mean(), exact, formula, coefs))
+    return results, _CACHE.hits - hits, _CACHE.misses - misses
+
+
+def describe(formula, coefs):
+    parts = [f"{coef:+.4f}*{to_string(term)}" for term, coef in zip(formula, coefs[:-1])]
+    return " ".join(parts) + f" {coefs[-1]:+.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symbolic formula search with cached, vectorized subexpressions")
+    parser.add_argument('--population', type=int, default=400)
+    parser.add_argument('--generations', type=int, default=30)
+    parser.add_argument('--max-terms', type=int, default=5)
+    parser.add_argument('--elite', type=int, default=40)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--cases', default='public_cases.json')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Populations are insertion-ordered dicts rather than sets, so --seed reproduces a run
+    population = dict.fromkeys(normalize([random_term(rng) for _ in range(rng.randint(1, args.max_terms))])
+                               for _ in range(args.population))
+    seen = {}
+
+    print("=== SYMBOLIC FORMULA SEARCH ===")
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(args.processes, initializer=init_worker, initargs=(args.cases,)) \
+        if args.processes > 1 else None
+    if pool is None:
+        init_worker(args.cases)
+
+    hits = misses = 0
+    try:
+        for generation in range(args.generations):
+            pending = [f for f in population if f not in seen]
+            chunks = [pending[i::args.processes] for i in range(args.processes)] if pool else [pending]
+            outputs = pool.map(score_formulas, chunks) if pool else map(score_formulas, chunks)
+            for results, worker_hits, worker_misses in outputs:
+                hits, misses = hits + worker_hits, misses + worker_misses
+                for result in results:
+                    seen[result[3]] = result
+
+            ranked = sorted((seen[f] for f in population), key=lambda r: r[0])
+            elite = [r[3] for r in ranked[:args.elite]]
+            best = ranked[0]
+            print(f"Generation {generation + 1}: {len(seen):,} formulas scored, "
+                  f"best score {best[0]:.2f} (avg error ${best[1]:.2f}, exact {best[2]})")
+
+            population = dict.fromkeys(elite)
+            while len(population) < args.population:
+                if rng.random() < 0.3:
+                    child = crossover(rng.choice(elite), rng.choice(elite), rng, args.max_terms)
+                else:
+                    child = mutate(rng.choice(elite), rng, args.max_terms)
+                population[child] = None
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {len(seen):,} formulas in {elapsed:.1f}s ({len(seen) / elapsed:,.0f}/s); "
+          f"subexpression cache hit rate {hits / max(hits + misses, 1):.0%}")
+    print(f"\nTop {args.top} formulas:")
+    for score, avg_error, exact, formula, coefs in sorted(seen.values(), key=lambda r: r[0])[:args.top]:
+        print(f"  {describe(formula, coefs)}")
+        print(f"    Score: {score:.2f}, Avg error: ${avg_error:.2f}, Exact matches: {exact}")
+
+
+if __name__ == "__main__":
+    main()
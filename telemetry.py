@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+import time
+
+import numpy as np
+
+from case_data import load_cases
+
+
+def collect(module, cases):
+    """Score every case through the scalar path, recording its route and latency.
+
+    Calculators append a route name ('lookup', 'nearest', 'model', 'linear') to
+    their ROUTE_LOG list when it is set; a calculator without the hook shows up
+    as a single 'unknown' path.
+    """
+    calculate = module.calculate_reimbursement
+    has_hook = hasattr(module, 'ROUTE_LOG')
+    routes = []
+    if has_hook:
+        module.ROUTE_LOG = routes
+
+    n = len(cases)
+    actual = np.empty(n)
+    latency = np.empty(n)
+    served = np.empty(n, dtype=object)
+    try:
+        for i, (days, miles, receipts) in enumerate(cases.inputs()):
+            logged = len(routes)
+            start = time.perf_counter()
+            actual[i] = calculate(days, miles, receipts)
+            latency[i] = time.perf_counter() - start
+            served[i] = routes[-1] if len(routes) > logged else 'unknown'
+    finally:
+        if has_hook:
+            module.ROUTE_LOG = None
+    return actual, served, latency
+
+
+def print_path_report(cases, actual, routes, latency, slowest=5):
+    """Per-path error, exact rate and latency, then the slowest cases"""
+    routes = np.asarray(routes, dtype=object)
+    errors = np.abs(cases.expected - actual)
+    n = len(errors)
+
+    print(f"\n🧭 Per-path breakdown:")
+    print(f"  {'path':>8} {'cases':>7} {'share':>6} {'exact':>7} {'avg error':>10} {'p50':>9} {'p90':>9} {'p99':>9}")
+    for route in sorted(set(routes.tolist()), key=lambda r: -np.sum(routes == r)):
+        mask = routes == route
+        p50, p90, p99 = np.percentile(latency[mask] * 1e6, [50, 90, 99])
+        print(f"  {route:>8} {int(mask.sum()):>7} {mask.mean():>6.1%} {np.mean(errors[mask] < 0.01):>7.1%} "
+              f"${errors[mask].mean():>9.2f} {p50:>7.1f}µs {p90:>7.1f}µs {p99:>7.1f}µs")
+    print(f"  Total scalar time: {latency.sum() * 1000:.1f}ms for {n} cases")
+
+    print(f"\n🐢 Slowest {slowest} cases:")
+    for i in np.argsort(latency)[::-1][:slowest]:
+        print(f"  Case {i + 1}: {cases.describe(i)} via {routes[i]}: {latency[i] * 1e6:.0f}µs, error ${errors[i]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-path telemetry for calculator modules")
+    parser.add_argument('calculators', nargs='*', default=['calculate_reimbursement'])
+    parser.add_argument('--cases', default='public_cases.json')
+    parser.add_argument('--slowest', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    for name in args.calculators:
+        print(f"=== {name} ===")
+        print_path_report(cases, *collect(importlib.import_module(name), cases), slowest=args.slowest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+import numpy as np
+
+from case_data import load_cases
+
+
+def tiered_predictions(cases, day_rate, mile_rate, receipt_tiers):
+    """Vectorized equivalent of exact_match_pursuit.test_tiered_model's predictions"""
+    predicted = day_rate * cases.days + mile_rate * cases.miles
+    start = 0.0
+    for size, rate in receipt_tiers:
+        predicted = predicted + rate * np.clip(cases.receipts - start, 0, size)
+        start += size
+    return predicted
+
+
+def frange(spec):
+    """Parse 'start:stop:step' (inclusive) or a comma-separated list into a float array"""
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(part) for part in spec.split(',')])
+
+
+class TierSearch:
+    """Branch-and-bound over tiered receipt models.
+
+    Tiers are assigned from the lowest receipts upward. Once tiers covering
+    receipts up to T are fixed, every case with receipts <= T has a final
+    prediction, and every other case still gets rate * (receipts - T) summed
+    over the remaining tiers, which lies between min(rates) and max(rates) times
+    (receipts - T). That interval, tightened by the next-tier rate every case
+    shares (see bound_keys), gives an upper bound on exact matches and a lower
+    bound on total error for the whole subtree, so subtrees that cannot
+    beat the incumbent are dropped without being expanded. Sibling children
+    (all rates for one tier size) are bounded together as one matrix.
+    """
+
+    def __init__(self, cases, sizes, rates, max_tiers, objective='exact', time_limit=None):
+        self.expected = cases.expected
+        self.receipts = cases.receipts
+        self.cases = cases
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.rate_lo, self.rate_hi = self.rates.min(), self.rates.max()
+        self.max_tiers = max_tiers
+        self.objective = objective
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+        self.best_key = (np.inf, np.inf)
+        self.best = None
+        self.nodes = 0
+        self.pruned = 0
+        self.leaves = 0
+        self.timed_out = False
+
+    def key(self, exact, error):
+        """Lexicographic objective: smaller is better"""
+        if self.objective == 'exact':
+            return (-exact, error)
+        return (error, -exact)
+
+    def bound_keys(self, partial, start, sized_left):
+        """Optimistic (exact, error) bound for each row of partial predictions.
+
+        Every case with receipts above `start` gets its next portion from the same
+        next tier, so the bound takes the best single next-tier rate for all cases
+        together rather than case by case; the next tier's size and the rates of
+        any tiers after it are relaxed per case. With no sized tiers left only the
+        open tier remains, and the bound is the best leaf of the subtree itself.
+        """
+        remaining = np.maximum(self.receipts - start, 0.0)
+        needed = self.expected - partial
+
+        # Cases with no receipts left are final whatever the remaining rates are
+        done = remaining == 0
+        settled = np.abs(needed[:, done])
+        exact = (settled < 0.01).sum(axis=-1)
+        error = settled.sum(axis=-1)
+
+        remaining, needed = remaining[~done], needed[:, ~done]
+        if sized_left == 0:
+            # The rate interval is a cheap first pass; only rows it cannot prune get every rate scored
+            distance = np.maximum(np.maximum(self.rate_lo * remaining - needed, needed - self.rate_hi * remaining), 0.0)
+            exact_ub = exact + (distance < 0.01).sum(axis=-1)
+            error_lb = error + distance.sum(axis=-1)
+            open_rows = np.array([self.key(e, d) < self.best_key for e, d in zip(exact_ub, error_lb)], dtype=bool)
+            if open_rows.any():
+                errors = np.abs(needed[open_rows, None, :] - self.rates[None, :, None] * remaining)
+                exact_ub[open_rows] = exact[open_rows] + (errors < 0.01).sum(axis=-1).max(axis=-1)
+                error_lb[open_rows] = error[open_rows] + errors.sum(axis=-1).min(axis=-1)
+            return exact_ub, error_lb
+
+        first = np.minimum(remaining, np.append(self.sizes, np.inf)[:, None])
+        beyond = remaining - first
+        residual = needed[:, None, None, :] - self.rates[None, :, None, None] * first
+        errors = np.maximum(np.maximum(self.rate_lo * beyond - residual, residual - self.rate_hi * beyond),
+                            0.0).min(axis=2)
+        return exact + (errors < 0.01).sum(axis=-1).max(axis=-1), error + errors.sum(axis=-1).min(axis=-1)
+
+    def close_with_open_tier(self, partial, start, context):
+        """Score every rate for the final open-ended tier in one batch"""
+        remaining = np.maximum(self.receipts - start, 0.0)
+        predicted = partial[None, :] + self.rates[:, None] * remaining[None, :]
+        errors = np.abs(self.expected[None, :] - predicted)
+        exact = (errors < 0.01).sum(axis=1)
+        total = errors.sum(axis=1)
+        self.leaves += len(self.rates)
+
+        for i in range(len(self.rates)):
+            candidate = self.key(exact[i], total[i])
+            if candidate < self.best_key:
+                self.best_key = candidate
+                day_rate, mile_rate, tiers = context
+                self.best = (day_rate, mile_rate, tiers + [(float('inf'), float(self.rates[i]))],
+                             int(exact[i]), total[i] / len(self.expected))
+
+    def expand(self, partial, start, context):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.timed_out = True
+            return
+
+        self.close_with_open_tier(partial, start, context)
+        day_rate, mile_rate, tiers = context
+        if len(tiers) >= self.max_tiers or start >= self.receipts.max():
+            return
+
+        children = []
+        for size in self.sizes:
+            portion = np.clip(self.receipts - start, 0, size)
+            candidates = partial[None, :] + self.rates[:, None] * portion[None, :]
+            exact_ub, error_lb = self.bound_keys(candidates, start + size, self.max_tiers - len(tiers) - 1)
+            for i, rate in enumerate(self.rates):
+                bound = self.key(exact_ub[i], error_lb[i])
+                if bound < self.best_key:
+                    children.append((bound, size, rate, candidates[i]))
+                else:
+                    self.pruned += 1
+
+        # Best-first among siblings finds strong incumbents early, which tightens later pruning
+        children.sort(key=lambda child: child[0])
+        for bound, size, rate, candidate in children:
+            if not bound < self.best_key:
+                self.pruned += 1
+                continue
+            self.expand(candidate, start + size, (day_rate, mile_rate, tiers + [(float(size), float(rate))]))
+
+    def run(self, day_rates, mile_rates):
+        for day_rate in day_rates:
+            for mile_rate in mile_rates:
+                base = day_rate * self.cases.days + mile_rate * self.cases.miles
+                self.expand(base, 0.0, (float(day_rate), float(mile_rate), []))
+        return self.best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Branch-and-bound search over tiered receipt models")
+    parser.add_argument('--day-rates', default='90,95,100')
+    parser.add_argument('--mile-rates', default='0.65,0.70,0.75')
+    parser.add_argument('--sizes', default='100:1500:100', help="candidate tier sizes, list or start:stop:step")
+    parser.add_argument('--rates', default='0:1:0.1', help="candidate tier rates, list or start:stop:step")
+    parser.add_argument('--max-tiers', type=int, default=2, help="sized tiers before the final open-ended tier")
+    parser.add_argument('--objective', choices=['exact', 'error'], default='exact',
+                        help="exact: most exact matches, then lowest error; error: lowest error")
+    parser.add_argument('--time-limit', type=float, default=None, help="stop after this many seconds")
+    parser.add_argument('--cases', default='public_cases.json')
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    day_rates, mile_rates = frange(args.day_rates), frange(args.mile_rates)
+    sizes, rates = frange(args.sizes), frange(args.rates)
+
+    print("=== BRANCH-AND-BOUND TIER SEARCH ===")
+    full_space = len(day_rates) * len(mile_rates) * sum(
+        (len(sizes) * len(rates)) ** depth * len(rates) for depth in range(args.max_tiers + 1))
+    print(f"Search space: {full_space:,} tier configurations (up to {args.max_tiers} sized tiers)")
+
+    start = time.perf_counter()
+    search = TierSearch(cases, sizes, rates, args.max_tiers, args.objective, args.time_limit)
+    best = search.run(day_rates, mile_rates)
+    elapsed = time.perf_counter() - start
+
+    print(f"Expanded {search.nodes:,} nodes, scored {search.leaves:,} configurations, "
+          f"pruned {search.pruned:,} subtrees in {elapsed:.2f}s")
+    if search.timed_out:
+        print("⚠️  Time limit reached - best result so far, not proven optimal")
+
+    day_rate, mile_rate, tiers, exact_matches, avg_error = best
+    print(f"\nBest tiered model:")
+    print(f"  ${day_rate}/day + ${mile_rate:.2f}/mile + {tiers}")
+    print(f"  Avg error: ${avg_error:.2f}, Exact matches: {exact_matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import pickle
+import struct
+import time
+
+import numpy as np
+
+# One contiguous little-endian buffer:
+#   header   MAGIC, version, threshold kind, mode, n_trees, n_features, max_depth,
+#            n_nodes, n_cuts, base, scale
+#   uint32   tree_offsets[n_trees + 1]   first node of each tree
+#   uint8    feature[n_nodes]            LEAF for leaves
+#   float32  threshold[n_nodes]          (kind 'float32'), or
+#   int16    threshold[n_nodes]          (kind 'int16': index into the feature's cut table)
+#   uint16   left[n_nodes], right[n_nodes]   child indices local to the tree
+#   float32  value[n_nodes]              leaf outputs
+#   uint32   cut_offsets[n_features + 1] and float64 cuts[n_cuts] (kind 'int16' only)
+# Each section starts on an 8-byte boundary so it can be viewed in place.
+MAGIC = b'TPK1'
+HEADER = struct.Struct('<4sHBBIIIIIdd')
+LEAF = 255
+KINDS = {'float32': 0, 'int16': 1}
+MODES = {'sum': 0, 'mean': 1}
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _trees(model):
+    """(trees, mode, base, scale) for a gradient boosting or forest regressor"""
+    if hasattr(model, 'init_'):
+        trees = [estimator.tree_ for estimator in np.ravel(model.estimators_)]
+        base = float(np.ravel(model.init_.predict(np.zeros((1, model.n_features_in_))))[0])
+        return trees, 'sum', base, float(model.learning_rate)
+    return [estimator.tree_ for estimator in model.estimators_], 'mean', 0.0, 1.0
+
+
+def pack(model, kind='int16'):
+    """Serialize a fitted tree ensemble regressor into one bytes buffer"""
+    trees, mode, base, scale = _trees(model)
+    n_features = model.n_features_in_
+    if n_features >= LEAF:
+        raise ValueError(f"{n_features} features do not fit uint8 split indices")
+    if max(tree.node_count for tree in trees) > 0xFFFF:
+        raise ValueError("trees with more than 65535 nodes do not fit uint16 child indices")
+
+    offsets = np.zeros(len(trees) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([tree.node_count for tree in trees])
+    is_leaf = np.concatenate([tree.children_left == -1 for tree in trees])
+    feature = np.where(is_leaf, LEAF, np.concatenate([tree.feature for tree in trees])).astype(np.uint8)
+    threshold64 = np.concatenate([tree.threshold for tree in trees])
+    left = np.concatenate([np.maximum(tree.children_left, 0) for tree in trees]).astype(np.uint16)
+    right = np.concatenate([np.maximum(tree.children_right, 0) for tree in trees]).astype(np.uint16)
+    value = np.where(is_leaf, np.concatenate([tree.value.reshape(-1) for tree in trees]), 0).astype(np.float32)
+
+    cut_offsets, cuts = np.zeros(0, dtype=np.uint32), np.zeros(0)
+    if kind == 'float32':
+        threshold = np.where(is_leaf, 0, threshold64).astype(np.float32)
+    else:
+        # Per-feature table of the distinct thresholds; nodes store an index into it
+        tables = [np.unique(threshold64[~is_leaf & (feature == f)]) for f in range(n_features)]
+        if max(len(table) for table in tables) > 0x7FFF:
+            raise ValueError("more than 32767 distinct thresholds on one feature")
+        cut_offsets = np.zeros(n_features + 1, dtype=np.uint32)
+        cut_offsets[1:] = np.cumsum([len(table) for table in tables])
+        cuts = np.concatenate(tables)
+        threshold = np.zeros(len(feature), dtype=np.int16)
+        for f, table in enumerate(tables):
+            nodes = ~is_leaf & (feature == f)
+            threshold[nodes] = np.searchsorted(table, threshold64[nodes])
+
+    header = HEADER.pack(MAGIC, 1, KINDS[kind], MODES[mode], len(trees), n_features,
+                         max(tree.max_depth for tree in trees), len(feature), len(cuts), base, scale)
+    parts = [header, offsets, feature, threshold, left, right, value, cut_offsets, cuts]
+    out = bytearray()
+    for part in parts:
+        out += bytes(_align(len(out)) - len(out))
+        out += part if isinstance(part, bytes) else part.tobytes()
+    return bytes(out)
+
+
+class PackedEnsemble:
+    """Evaluates a packed ensemble straight from its buffer (bytes or mmap), without copying it"""
+
+    def __init__(self, buffer):
+        (magic, version, kind, mode, n_trees, n_features, max_depth, n_nodes, n_cuts,
+         base, scale) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != 1:
+            raise ValueError("not a packed tree ensemble")
+        self.kind = 'int16' if kind == KINDS['int16'] else 'float32'
+        self.mode = 'mean' if mode == MODES['mean'] else 'sum'
+        self.n_trees, self.n_features, self.max_depth = n_trees, n_features, max_depth
+        self.base, self.scale = base, scale
+        self.nbytes = len(buffer)
+
+        position = HEADER.size
+
+        def view(dtype, count):
+            nonlocal position
+            position = _align(position)
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=position)
+            position += array.nbytes
+            return array
+
+        self.offsets = view('<u4', n_trees + 1).astype(np.int64)
+        self.feature = view('u1', n_nodes)
+        self.threshold = view('<i2' if self.kind == 'int16' else '<f4', n_nodes)
+        self.left = view('<u2', n_nodes)
+        self.right = view('<u2', n_nodes)
+        self.value = view('<f4', n_nodes)
+        if self.kind == 'int16':
+            self.cut_offsets = view('<u4', n_features + 1).astype(np.int64)
+            self.cuts = view('<f8', n_cuts)
+
+    def _binned(self, X):
+        """Each value replaced by how many of its feature's cuts lie strictly below it"""
+        bins = np.empty(X.shape, dtype=np.int16)
+        for f in range(self.n_features):
+            table = self.cuts[self.cut_offsets[f]:self.cut_offsets[f + 1]]
+            bins[:, f] = np.searchsorted(table, X[:, f], side='left')
+        return bins
+
+    def predict(self, X, chunk_nodes=1 << 21):
+        # sklearn compares float32(x) against the float64 threshold, so cast the same way;
+        # x <= cut[k]  <=>  (number of cuts below x) <= k, so int16 mode compares bins exactly
+        X = np.asarray(X, dtype=np.float64).astype(np.float32)
+        data = self._binned(X.astype(np.float64)) if self.kind == 'int16' else X
+        starts = self.offsets[:-1, None]
+        total = np.empty(len(X))
+        # All trees advance one level per step over a (trees x rows) block of node indices
+        step = max(chunk_nodes // self.n_trees, 1)
+        for lo in range(0, len(X), step):
+            block = data[lo:lo + step]
+            rows = np.arange(len(block))[None, :]
+            node = np.repeat(starts, len(block), axis=1)
+            for _ in range(self.max_depth):
+                split = self.feature[node]
+                inner = split != LEAF
+                if not inner.any():
+                    break
+                go_left = block[rows, np.where(inner, split, 0)] <= self.threshold[node]
+                child = np.where(go_left, self.left[node], self.right[node]).astype(np.int64) + starts
+                node = np.where(inner, child, node)
+            total[lo:lo + step] = self.value[node].sum(axis=0, dtype=np.float64)
+        if self.mode == 'mean':
+            return total / self.n_trees
+        return self.base + self.scale * total
+
+
+def load_packed(path):
+    """Memory-map a packed model file; several workers share the same pages"""
+    import mmap
+    with open(path, 'rb') as f:
+        return PackedEnsemble(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def main():
+    from calculate_reimbursement_ultimate import extract_ultimate_features
+    from case_data import load_cases
+
+    parser = argparse.ArgumentParser(description="Export a pickled tree ensemble to the packed format and report drift")
+    parser.add_argument('model', help="pickled sklearn ensemble, e.g. ultimate_model.pkl")
+    parser.add_argument('-o', '--output', default=None, help="packed file (default: model path with .tpk)")
+    parser.add_argument('--thresholds', choices=list(KINDS), default='int16')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.model)[0] + '.tpk'
+
+    start = time.perf_counter()
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    pickle_load = time.perf_counter() - start
+
+    with open(output, 'wb') as f:
+        f.write(pack(model, args.thresholds))
+    start = time.perf_counter()
+    packed = load_packed(output)
+    packed_load = time.perf_counter() - start
+
+    print(f"=== PACKED MODEL: {args.model} -> {output} ({args.thresholds} thresholds) ===")
+    print(f"  {packed.n_trees} trees, depth <= {packed.max_depth}, {len(packed.feature):,} nodes")
+    print(f"  Size: {os.path.getsize(args.model):,} -> {packed.nbytes:,} bytes "
+          f"({os.path.getsize(args.model) / packed.nbytes:.1f}x smaller)")
+    print(f"  Load: pickle {pickle_load * 1000:.1f}ms, packed {packed_load * 1000:.2f}ms")
+
+    for path in ['public_cases.json', 'private_cases.json']:
+        cases = load_cases(path)
+        X = np.array([extract_ultimate_features(d, m, r) for d, m, r in cases.inputs()])
+        start = time.perf_counter()
+        original = model.predict(X)
+        original_time = time.perf_counter() - start
+        start = time.perf_counter()
+        ours = packed.predict(X)
+        packed_time = time.perf_counter() - start
+        drift = np.abs(ours - original)
+        rounded = int(np.sum(np.round(ours, 2) != np.round(original, 2)))
+        print(f"\n{path}: max drift ${drift.max():.6f}, mean ${drift.mean():.6f}, "
+              f"{rounded} of {len(X)} rounded outputs differ")
+        print(f"  Predict: sklearn {original_time * 1000:.1f}ms, packed {packed_time * 1000:.1f}ms")
+        if cases.expected is not None:
+            for label, predictions in [("original", original), ("packed", ours)]:
+                errors = np.abs(cases.expected - np.round(predictions, 2))
+                print(f"  {label}: {int(np.sum(errors < 0.01))} exact, avg error ${errors.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
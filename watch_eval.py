@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from case_data import load_cases, batch_calculate, score_predictions
+
+
+def module_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class CalculatorWatcher:
+    """Keeps the cases in memory and re-scores calculators whenever their source changes"""
+
+    def __init__(self, cases, paths):
+        self.cases = cases
+        self.paths = paths
+        self.mtimes = {}
+        self.modules = {}
+        self.last = {}
+
+    def changed_paths(self):
+        changed = []
+        for path in self.paths:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self.mtimes.get(path) != mtime:
+                self.mtimes[path] = mtime
+                changed.append(path)
+        return changed
+
+    def load(self, path):
+        name = module_name(path)
+        if name in self.modules:
+            return importlib.reload(self.modules[name])
+        module = importlib.import_module(name)
+        self.modules[name] = module
+        return module
+
+    def evaluate(self, path):
+        name = module_name(path)
+        start = time.perf_counter()
+        try:
+            module = self.load(path)
+            load_time = time.perf_counter() - start
+            actual = batch_calculate(module, self.cases)
+        except Exception:
+            print(f"\n❌ {name}: failed to load or run")
+            traceback.print_exc(limit=3)
+            return
+        total_time = time.perf_counter() - start
+
+        result = score_predictions(self.cases.expected, actual)
+        result['actual'] = actual
+        self.report(name, result, load_time, total_time)
+        self.last[name] = result
+
+    def report(self, name, result, load_time, total_time):
+        n = len(self.cases)
+        print(f"\n=== {name} ({time.strftime('%H:%M:%S')}) ===")
+        print(f"  Reload: {load_time * 1000:.1f}ms, reload + score: {total_time * 1000:.1f}ms")
+
+        previous = self.last.get(name)
+        if previous is None:
+            print(f"  Exact matches: {result['exact_matches']}/{n}, Close matches: {result['close_matches']}/{n}")
+            print(f"  Average error: ${result['avg_error']:.2f}, Score: {result['score']:.2f}")
+            return
+
+        print(f"  Exact matches: {result['exact_matches']}/{n} ({result['exact_matches'] - previous['exact_matches']:+d})")
+        print(f"  Close matches: {result['close_matches']}/{n} ({result['close_matches'] - previous['close_matches']:+d})")
+        print(f"  Average error: ${result['avg_error']:.2f} ({result['avg_error'] - previous['avg_error']:+.2f})")
+        print(f"  Score: {result['score']:.2f} ({result['score'] - previous['score']:+.2f})")
+
+        was_exact = previous['errors'] < 0.01
+        now_exact = result['errors'] < 0.01
+        changed = result['actual'] != previous['actual']
+        print(f"  Cases changed: {int(changed.sum())}, "
+              f"newly exact: {int((now_exact & ~was_exact).sum())}, "
+              f"lost exact: {int((was_exact & ~now_exact).sum())}")
+
+        worse = (result['errors'] - previous['errors'])
+        for i in worse.argsort()[::-1][:3]:
+            if worse[i] <= 0.005:
+                break
+            print(f"    Regressed case {i+1}: {self.cases.describe(i)} "
+                  f"error ${previous['errors'][i]:.2f} -> ${result['errors'][i]:.2f}")
+
+    def run(self, interval):
+        print(f"Watching {len(self.paths)} calculator file(s) against {len(self.cases)} cases (Ctrl-C to stop)")
+        while True:
+            for path in self.changed_paths():
+                self.evaluate(path)
+            time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident evaluation loop that hot-reloads calculators on save")
+    parser.add_argument('calculators', nargs='*', help="calculator files to watch (default: calculate_reimbursement*.py)")
+    parser.add_argument('--cases', default='public_cases.json', help="labeled cases (with expected_output)")
+    parser.add_argument('--interval', type=float, default=0.25, help="polling interval in seconds")
+    args = parser.parse_args()
+
+    paths = args.calculators or sorted(glob.glob('calculate_reimbursement*.py'))
+    for directory in {os.path.dirname(os.path.abspath(path)) for path in paths}:
+        sys.path.insert(0, directory)
+
+    cases = load_cases(args.cases)
+    if cases.expected is None:
+        parser.error(f"--cases {args.cases} has no expected_output values to score against")
+    watcher = CalculatorWatcher(cases, paths)
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+if __name__ == "__main__":
+    main()